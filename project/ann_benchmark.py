@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ann_index import DEFAULT_RERANK, IVFIndex, default_nlist
+from catalog import load_catalog
+from embedding_cache import HashingEmbedder, program_text
+from relevance_benchmark import percentile
+from semantic_search import normalize_rows
+from synthetic_catalog import write_catalog
+
+DEFAULT_SIZES = [10000, 100000]
+DEFAULT_NPROBES = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+# ✅ 가짜 카탈로그(synthetic_catalog) + 해싱 임베딩: 앞쪽 n 개는 인덱스, 뒤쪽 queries 개는 질의로 쓴다
+def catalog_embeddings(n, queries, seed=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        programs = load_catalog([write_catalog(os.path.join(tmp, "synthetic.json"), n + queries, seed)])
+    matrix = normalize_rows(HashingEmbedder().embed_documents([program_text(program) for program in programs]))
+    return matrix[:n], matrix[n:]
+
+
+# ✅ 군집이 있는 무작위 벡터 (OpenAI 임베딩 차원으로 돌려볼 때): 중심 주변에 잡음을 더한다
+def clustered_embeddings(n, queries, dim, noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 50), dim), dtype=np.float32)
+    points = centers[rng.integers(0, centers.shape[0], n + queries)]
+    points += noise * rng.standard_normal(points.shape, dtype=np.float32)
+    matrix = normalize_rows(points)
+    return matrix[:n], matrix[n:]
+
+
+def exact_search(matrix, query, k):
+    scores = matrix @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])], scores
+
+
+# 📌 같은 점수(같은 제목의 프로그램)가 많으므로 id 대신 "정확 검색 k 번째 점수 이상인 결과 비율"로 recall 을 센다
+def recall_at_k(rows, exact_scores, exact_top):
+    threshold = exact_scores[exact_top[-1]] - 1e-5
+    return float(np.mean(exact_scores[rows] >= threshold)) if rows.size else 0.0
+
+
+def _latency_summary(latencies):
+    return {"p50_ms": round(percentile(latencies, 50), 3), "p95_ms": round(percentile(latencies, 95), 3)}
+
+
+def measure(index, matrix, queries, k, nprobe, rerank, reference):
+    latencies = []
+    recalls = []
+    for query, (exact_top, exact_scores) in zip(queries, reference):
+        start = time.perf_counter()
+        # 📌 rerank=0 이면 int8 근사 점수 순위를 그대로 쓴다
+        rows, _ = index.search(query, k, nprobe=nprobe, rerank=rerank, vectors=matrix if rerank else None)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall_at_k(rows, exact_scores, exact_top))
+    return {"nprobe": nprobe, "rerank": rerank, f"recall@{k}": round(float(np.mean(recalls)), 4), **_latency_summary(latencies)}
+
+
+# ✅ 크기 하나: 정확 검색 기준값 → 인덱스 만들기 → nprobe / rerank 조합별 recall·지연시간 → 증분 추가
+def run_size(n, args):
+    if args.data == "catalog":
+        matrix, queries = catalog_embeddings(n, args.queries, args.seed)
+    else:
+        matrix, queries = clustered_embeddings(n, args.queries, args.dim, args.noise, args.seed)
+    ids = [f"p{row}" for row in range(n)]
+    k = args.k
+
+    latencies = []
+    reference = []
+    for query in queries:
+        start = time.perf_counter()
+        exact_top, exact_scores = exact_search(matrix, query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        reference.append((exact_top, exact_scores))
+    result = {"n": n, "dim": int(matrix.shape[1]), "nlist": default_nlist(n), "exact": _latency_summary(latencies)}
+
+    start = time.perf_counter()
+    index = IVFIndex.build(ids, matrix)
+    result["build_s"] = round(time.perf_counter() - start, 3)
+    result["index_mb"] = round(index.nbytes / 1024 / 1024, 2)
+    result["float32_mb"] = round(matrix.nbytes / 1024 / 1024, 2)
+    result["runs"] = [
+        measure(index, matrix, queries, k, nprobe, rerank, reference)
+        for nprobe in args.nprobes
+        for rerank in (0, args.rerank)
+    ]
+
+    # 📌 증분 추가: 90% 로 군집을 학습하고 나머지 10% 는 add() 로 붙였을 때 recall 이 유지되는지
+    split = int(n * 0.9)
+    partial = IVFIndex.build(ids[:split], matrix[:split])
+    start = time.perf_counter()
+    partial.add(ids[split:], matrix[split:])
+    result["incremental"] = {
+        "added": n - split,
+        "add_s": round(time.perf_counter() - start, 3),
+        **measure(partial, matrix, queries, k, args.incremental_nprobe, args.rerank, reference),
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF 근사 검색(ann_index) recall@k ↔ 지연시간 리포트 (정확 검색 대비)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--data", choices=["catalog", "clustered"], default="catalog",
+                        help="catalog: 가짜 카탈로그 + 해싱 임베딩(256차원), clustered: 군집 있는 무작위 벡터(--dim)")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--noise", type=float, default=1.0, help="clustered: 군집 중심 대비 잡음 크기 (클수록 군집이 흐려서 어려움)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobes", type=int, nargs="+", default=DEFAULT_NPROBES)
+    parser.add_argument("--rerank", type=int, default=DEFAULT_RERANK, help="정확한 점수로 다시 정렬할 근사 후보 수")
+    parser.add_argument("--incremental-nprobe", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = {"data": args.data, "k": args.k, "results": [run_size(n, args) for n in args.sizes]}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import numpy as np
+
+from embedding_store import quantize_int8
+from semantic_search import normalize_rows
+
+DEFAULT_NPROBE = 8
+DEFAULT_RERANK = 64
+# 📌 k-means 학습에 쓰는 군집당 표본 수 (전체를 다 쓰지 않아도 중심점 품질은 거의 같다)
+TRAIN_POINTS_PER_LIST = 64
+# 📌 add() 로 들어온 행이 이만큼 쌓이면 역색인(CSR)을 다시 정렬한다
+COMPACT_MIN_PENDING = 1024
+COMPACT_RATIO = 0.1
+BLOCK_ROWS = 4096
+# 📌 int8 → float32 로 풀어 점수를 계산하는 버퍼 행 수 (embedding_store 와 같은 이유로 CPU 캐시 크기)
+SCORE_BLOCK_ROWS = 512
+
+
+# 📌 군집 수 기본값: √N (N=10만이면 316개, 군집당 ~300행)
+def default_nlist(n):
+    return max(1, int(round(np.sqrt(n))))
+
+
+def _blocks(matrix):
+    for start in range(0, matrix.shape[0], BLOCK_ROWS):
+        yield start, normalize_rows(matrix[start:start + BLOCK_ROWS])
+
+
+# 📌 행마다 가장 가까운(내적이 가장 큰) 중심점 번호
+def _nearest(matrix, centroids):
+    assignments = np.empty(matrix.shape[0], dtype=np.int32)
+    for start, block in _blocks(matrix):
+        assignments[start:start + block.shape[0]] = (block @ centroids.T).argmax(axis=1)
+    return assignments
+
+
+# ✅ 구면(spherical) k-means: 코사인 기준으로 묶고 중심점도 단위 벡터로 유지
+#    빈 군집은 무작위 표본으로 다시 채운다 (같은 제목의 프로그램이 많아 초기 중심점이 겹칠 때).
+def train_centroids(matrix, nlist, iterations=10, seed=0):
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+    nlist = min(nlist, n)
+    sample = np.sort(rng.choice(n, min(n, nlist * TRAIN_POINTS_PER_LIST), replace=False))
+    data = normalize_rows(matrix[sample])
+    centroids = data[rng.choice(data.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _nearest(data, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        present = np.flatnonzero(counts)
+        sums[present] = np.add.reduceat(data[order], np.concatenate(([0], np.cumsum(counts)[:-1]))[present])
+        empty = counts == 0
+        sums[empty] = data[rng.choice(data.shape[0], int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+# ✅ IVF(역파일) 근사 최근접 이웃 인덱스
+#    - 임베딩을 nlist 개 군집으로 나누고, 질의와 가까운 nprobe 개 군집의 행만 본다.
+#    - 행은 int8(행마다 scale)로 군집 순서대로 붙여 저장해서 군집 하나가 연속된 메모리 한 덩어리다.
+#      (근사 점수 계산이 float32 의 1/4 만 읽고, 흩어진 행을 모으는 복사가 없다)
+#    - 근사 점수 상위 rerank 개는 원래 float32 벡터로 다시 점수를 매긴다 (search(vectors=...)).
+#    - nprobe / rerank 가 recall ↔ 지연시간 조절 손잡이 (nprobe=nlist 면 전체를 보는 것과 같다).
+#    - add() 는 중심점을 다시 학습하지 않고 가까운 군집에 붙이기만 한다 (뒤에 쌓아 두었다가 compact()).
+#      검색과 동시에 부르지 않는다 (다시 읽기는 copy() 한 다음 추가해서 새 snapshot 에 넣는다).
+#    - 행 번호는 추가한 순서(ids 의 위치)이고 저장 위치(slot)가 바뀌어도 그대로다.
+class IVFIndex:
+    def __init__(self, centroids, nprobe=DEFAULT_NPROBE, rerank=DEFAULT_RERANK):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+        self.rerank = rerank
+        self.ids = []
+        self.positions = {}
+        dim = self.centroids.shape[1]
+        # 📌 slot 단위 저장소: 앞쪽 _offsets[-1] 개는 군집 순서 (CSR: _offsets[l]:_offsets[l+1]), 뒤쪽은 add() 순서
+        self._codes = np.empty((0, dim), dtype=np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._slot_lists = np.empty(0, dtype=np.int32)
+        self._slot_rows = np.empty(0, dtype=np.int64)
+        self._slots = 0
+        self._offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        # 📌 행 단위: 살아 있는지 / 어느 slot 에 있는지
+        self._alive = np.empty(0, dtype=bool)
+        self._row_slots = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def build(cls, ids, matrix, nlist=None, nprobe=DEFAULT_NPROBE, rerank=DEFAULT_RERANK, iterations=10, seed=0):
+        nlist = nlist or default_nlist(len(ids))
+        index = cls(train_centroids(matrix, nlist, iterations, seed), nprobe, rerank)
+        index.add(ids, matrix)
+        index.compact()
+        return index
+
+    @property
+    def nlist(self):
+        return self.centroids.shape[0]
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def nbytes(self):
+        return self._codes[:self._slots].nbytes + self._scales[:self._slots].nbytes + self.centroids.nbytes
+
+    def copy(self):
+        index = IVFIndex(self.centroids, self.nprobe, self.rerank)
+        index.ids = list(self.ids)
+        index.positions = dict(self.positions)
+        index._slots = self._slots
+        for name in ("_codes", "_scales", "_slot_lists", "_slot_rows", "_offsets", "_alive", "_row_slots"):
+            setattr(index, name, getattr(self, name).copy())
+        return index
+
+    @staticmethod
+    def _grown(array, size):
+        if size <= array.shape[0]:
+            return array
+        grown = np.zeros((max(size, array.shape[0] * 2, 64),) + array.shape[1:], dtype=array.dtype)
+        grown[:array.shape[0]] = array
+        return grown
+
+    # ✅ 새 프로그램 추가 (이미 있는 id 면 새 벡터로 바꾼다)
+    def add(self, ids, matrix):
+        ids = list(ids)
+        if not ids:
+            return
+        first_row, first_slot = len(self.ids), self._slots
+        for name in ("_codes", "_scales", "_slot_lists", "_slot_rows"):
+            setattr(self, name, self._grown(getattr(self, name), first_slot + len(ids)))
+        for name in ("_alive", "_row_slots"):
+            setattr(self, name, self._grown(getattr(self, name), first_row + len(ids)))
+        for offset, block in _blocks(matrix):
+            slots = slice(first_slot + offset, first_slot + offset + block.shape[0])
+            self._codes[slots], self._scales[slots] = quantize_int8(block)
+            self._slot_lists[slots] = (block @ self.centroids.T).argmax(axis=1)
+        rows = np.arange(first_row, first_row + len(ids))
+        self._slot_rows[first_slot:first_slot + len(ids)] = rows
+        self._row_slots[rows] = np.arange(first_slot, first_slot + len(ids))
+        self._alive[rows] = True
+        for row, program_id in zip(rows.tolist(), ids):
+            old = self.positions.get(program_id)
+            if old is not None:
+                self._alive[old] = False
+            self.positions[program_id] = row
+        self.ids.extend(ids)
+        self._slots += len(ids)
+        pending = self._slots - self._offsets[-1]
+        if pending > max(COMPACT_MIN_PENDING, COMPACT_RATIO * self._slots):
+            self.compact()
+
+    def remove(self, ids):
+        for program_id in ids:
+            row = self.positions.pop(program_id, None)
+            if row is not None:
+                self._alive[row] = False
+
+    # ✅ 카탈로그 전체 → 바뀐/새 프로그램만 add, 없어진 프로그램은 remove (바뀐 행 수를 돌려준다)
+    #    (양자화한 코드가 같으면 같은 벡터로 본다)
+    def sync(self, ids, matrix):
+        ids = list(ids)
+        changed = []
+        for start, block in _blocks(matrix):
+            codes, _ = quantize_int8(block)
+            for offset, program_id in enumerate(ids[start:start + block.shape[0]]):
+                row = self.positions.get(program_id)
+                if row is None or not np.array_equal(self._codes[self._row_slots[row]], codes[offset]):
+                    changed.append(start + offset)
+        self.remove(set(self.positions) - set(ids))
+        if changed:
+            self.add([ids[row] for row in changed], matrix[np.array(changed)])
+        return len(changed)
+
+    # ✅ 살아 있는 행을 군집 순서로 다시 붙여 저장 (지워지거나 바뀐 행의 옛 slot 은 여기서 빠진다)
+    def compact(self):
+        slot_rows = self._slot_rows[:self._slots]
+        live = np.flatnonzero(self._alive[slot_rows] & (self._row_slots[slot_rows] == np.arange(self._slots)))
+        order = live[np.argsort(self._slot_lists[live], kind="stable")]
+        self._codes = self._codes[order]
+        self._scales = self._scales[order]
+        self._slot_lists = self._slot_lists[order]
+        self._slot_rows = self._slot_rows[order]
+        self._slots = order.size
+        self._row_slots[self._slot_rows] = np.arange(order.size)
+        counts = np.bincount(self._slot_lists, minlength=self.nlist)
+        self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    # 📌 질의와 가까운 군집들 → 볼 slot 구간 목록 [(시작, 끝), ...] + add() 뒤 아직 정렬 안 된 slot
+    def _probe_ranges(self, query, nprobe):
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        ranges = [(int(self._offsets[probe]), int(self._offsets[probe + 1])) for probe in probes]
+        pending = np.arange(self._offsets[-1], self._slots)
+        return ranges, pending[np.isin(self._slot_lists[pending], probes)]
+
+    # ✅ 질의 벡터 → 근사 점수 상위 limit 개 (행 번호, int8 근사 점수), 점수 내림차순
+    def candidates(self, query_vector, nprobe=None, limit=None):
+        query = normalize_rows(query_vector)[0]
+        ranges, pending = self._probe_ranges(query, nprobe or self.nprobe)
+        slots = np.concatenate([np.arange(start, end) for start, end in ranges] + [pending])
+        scores = np.empty(slots.size, dtype=np.float32)
+        buffer = np.empty((SCORE_BLOCK_ROWS, self.centroids.shape[1]), dtype=np.float32)
+        filled = 0
+        for start, end in ranges:
+            for block_start in range(start, end, SCORE_BLOCK_ROWS):
+                block = self._codes[block_start:min(end, block_start + SCORE_BLOCK_ROWS)]
+                np.copyto(buffer[:block.shape[0]], block, casting="unsafe")
+                scores[filled:filled + block.shape[0]] = buffer[:block.shape[0]] @ query
+                filled += block.shape[0]
+        if pending.size:
+            scores[filled:] = self._codes[pending].astype(np.float32) @ query
+        scores *= self._scales[slots]
+        rows = self._slot_rows[slots]
+        alive = self._alive[rows] & (self._row_slots[rows] == slots)
+        rows, scores = rows[alive], scores[alive]
+        limit = min(limit or self.rerank, rows.size)
+        if limit <= 0:
+            return rows[:0], scores[:0]
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
+
+    # ✅ 질의 벡터 → 상위 k 개 (행 번호, 점수)
+    #    vectors(행 번호 순서의 원래 임베딩 행렬)를 주면 근사 후보 rerank 개를 정확한 코사인으로 다시 정렬한다.
+    def search(self, query_vector, k=5, nprobe=None, rerank=None, vectors=None):
+        if vectors is None:
+            return self.candidates(query_vector, nprobe, k)
+        rows, scores = self.candidates(query_vector, nprobe, max(k, self.rerank if rerank is None else rerank))
+        if rows.size:
+            scores = normalize_rows(vectors[rows]) @ normalize_rows(query_vector)[0]
+            order = np.argsort(-scores, kind="stable")
+            rows, scores = rows[order], scores[order]
+        return rows[:k], scores[:k]
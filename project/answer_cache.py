@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from instrumentation import METRICS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_cache.sqlite3")
+
+
+# ✅ 질문 정규화 (대소문자 / 공백 / 끝 문장부호 차이는 같은 질문으로 취급)
+def normalize_query(query):
+    query = re.sub(r"\s+", " ", (query or "").lower()).strip()
+    return query.rstrip("?!.~ ")
+
+
+def _ids_key(program_ids):
+    return ",".join(sorted(program_ids))
+
+
+# ✅ LLM 응답 캐시 (SQLite)
+#    키 = 정규화된 질문 + 검색된 프로그램 id 집합 + 카탈로그 버전
+#    1) 키가 정확히 같은 응답을 먼저 찾고
+#    2) 질문 벡터(query_vector, 없으면 embedder 로 임베딩)가 있으면 같은 카탈로그 버전 / 프로그램 집합에 대해
+#       질문 임베딩 유사도가 threshold 이상인 응답을 찾는다.
+#    - 카탈로그 버전은 응답마다 저장한다. 여러 앱 / 서버가 같은 파일을 같이 써도 서로의 응답을 지우지 않고,
+#      다른 버전의 응답은 조회되지 않다가 ttl / LRU 로 정리된다.
+#    - ttl_seconds 가 지난 응답은 버리고, max_entries 를 넘으면 오래 안 쓴 응답부터 지운다(LRU).
+class AnswerCache:
+    def __init__(self, catalog_version, path=DEFAULT_CACHE_PATH, max_entries=1000, ttl_seconds=24 * 60 * 60,
+                 embedder=None, similarity_threshold=0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # 📌 카탈로그 버전을 파일 전체에 하나만 두던 예전 형식이면 (캐시이므로) 테이블을 새로 만든다
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(answers)")]
+        if columns and "catalog_version" not in columns:
+            self._conn.executescript("DROP TABLE answers; DROP TABLE IF EXISTS meta;")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY, query TEXT NOT NULL, program_ids TEXT NOT NULL, catalog_version TEXT NOT NULL,"
+            " answer TEXT NOT NULL, embedding BLOB, created_at REAL NOT NULL, last_access REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS answers_program_ids ON answers (program_ids, catalog_version);"
+            "CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access);"
+        )
+        self._conn.commit()
+        self.catalog_version = catalog_version
+
+    # ✅ 이후 조회 / 저장에 쓸 카탈로그 버전 (이전 버전 응답은 더 이상 조회되지 않는다)
+    def set_catalog_version(self, catalog_version):
+        self.catalog_version = catalog_version
+
+    def _key(self, normalized, ids_key, catalog_version):
+        payload = f"{normalized}\x1f{ids_key}\x1f{catalog_version}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # 📌 검색 때 이미 만든 질문 벡터가 있으면 그걸 쓰고, 없을 때만 embedder 로 임베딩 (둘 다 없으면 None)
+    def _query_vector(self, normalized, query_vector):
+        if query_vector is None:
+            if self.embedder is None:
+                return None
+            query_vector = self.embedder.embed_query(normalized)
+        vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    # ✅ 캐시 조회 (없으면 None)
+    #    query_vector: 검색 단계에서 만든 질문 임베딩 (넘기면 유사 질문 조회에 임베딩 호출을 다시 하지 않는다)
+    def get(self, query, program_ids, query_vector=None):
+        normalized = normalize_query(query)
+        ids_key = _ids_key(program_ids)
+        now = time.time()
+        expired_before = now - self.ttl_seconds
+        catalog_version = self.catalog_version
+
+        with self._lock:
+            key = self._key(normalized, ids_key, catalog_version)
+            row = self._conn.execute(
+                "SELECT answer FROM answers WHERE key = ? AND created_at >= ?", (key, expired_before)
+            ).fetchone()
+            if row is not None:
+                self._touch(key, now)
+                self.hits += 1
+                METRICS.inc("answer_cache_hits", kind="exact")
+                return row[0]
+
+            if query_vector is not None or self.embedder is not None:
+                rows = self._conn.execute(
+                    "SELECT key, answer, embedding FROM answers"
+                    " WHERE program_ids = ? AND catalog_version = ? AND created_at >= ? AND embedding IS NOT NULL",
+                    (ids_key, catalog_version, expired_before),
+                ).fetchall()
+                if rows:
+                    query_vector = self._query_vector(normalized, query_vector)
+                    # 📌 같은 파일을 다른 임베딩 모델로 쓰는 앱이 있어도 차원이 같은 벡터끼리만 비교
+                    rows = [row for row in rows if len(row[2]) == query_vector.nbytes]
+                if rows:
+                    matrix = np.vstack([np.frombuffer(blob, dtype=np.float32) for _, _, blob in rows])
+                    similarities = matrix @ query_vector
+                    best = int(np.argmax(similarities))
+                    if similarities[best] >= self.similarity_threshold:
+                        self._touch(rows[best][0], now)
+                        self.hits += 1
+                        self.semantic_hits += 1
+                        METRICS.inc("answer_cache_hits", kind="semantic")
+                        return rows[best][1]
+
+            self.misses += 1
+            METRICS.inc("answer_cache_misses")
+            return None
+
+    # ✅ 응답 저장 (저장 후 만료/용량 초과분 정리)
+    def put(self, query, program_ids, answer, query_vector=None):
+        normalized = normalize_query(query)
+        ids_key = _ids_key(program_ids)
+        now = time.time()
+        catalog_version = self.catalog_version
+        vector = self._query_vector(normalized, query_vector)
+        embedding = vector.tobytes() if vector is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers"
+                " (key, query, program_ids, catalog_version, answer, embedding, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._key(normalized, ids_key, catalog_version), normalized, ids_key, catalog_version, answer,
+                 embedding, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _touch(self, key, now):
+        self._conn.execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,31 @@
+import json
+import urllib.request
+
+DEFAULT_TIMEOUT = 30
+
+
+# ✅ 챗봇 API 서버(api_server.py) 호출용 클라이언트
+class ChatbotClient:
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.base_url}{path}",
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def search(self, query, k=5):
+        return self._request("POST", "/search", {"query": query, "k": k})["results"]
+
+    def answer(self, query):
+        return self._request("POST", "/answer", {"query": query})
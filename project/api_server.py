@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from http import HTTPStatus
+
+from catalog import DEFAULT_SOURCES
+from catalog_registry import parse_shard_specs
+from embedding_cache import HashingEmbedder
+from engine import ChatbotEngine, serialize_results
+from index_artifact import DEFAULT_ARTIFACT_PATH
+from instrumentation import METRICS
+from intent_router import load_intent_router
+from lazy import LazyObject
+from pipeline import AnswerPipeline
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_K = 50
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+# 📌 클라이언트 입력이 잘못된 경우 (handle_connection 에서 500 대신 400 으로 응답)
+class BadRequest(ValueError):
+    pass
+
+
+# ✅ 요청 본문 검사: JSON 객체만 받고, query 는 문자열, k 는 1 ~ MAX_K 정수 (숫자 문자열 "5" 도 허용)
+def _payload_object(payload):
+    if not isinstance(payload, dict):
+        raise BadRequest("JSON body must be an object")
+    return payload
+
+
+def _parse_query(payload):
+    query = payload.get("query", "")
+    if not isinstance(query, str):
+        raise BadRequest("query must be a string")
+    return query
+
+
+def _parse_k(payload, default=5):
+    value = payload.get("k", default)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise BadRequest(f"k must be an integer between 1 and {MAX_K}")
+    try:
+        k = int(value)
+    except ValueError:
+        raise BadRequest(f"k must be an integer between 1 and {MAX_K}")
+    if not 1 <= k <= MAX_K:
+        raise BadRequest(f"k must be an integer between 1 and {MAX_K}")
+    return k
+
+
+def _content_length(headers):
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest("invalid Content-Length")
+    if length < 0:
+        raise BadRequest("invalid Content-Length")
+    return length
+
+
+# ✅ 표준 라이브러리 asyncio 만으로 만든 작은 HTTP/JSON 서버
+#    GET  /health               → {"status": "ok", "programs": N, "catalog_version": ..., "catalog_reloads": N, ("shards")}
+#    POST /search {"query", "k"} → {"results": [{"id", "score", "program"}, ...]}
+#    POST /answer {"query"}      → {"answer", "program_ids", "cached", "route", "fallbacks", "timings"}
+#                                  ("profile": true 면 그 질문의 cProfile 결과 텍스트도 "profile" 로)
+#    GET  /metrics              → 단계별 지연시간 히스토그램 / 캐시·토큰 카운터 (Prometheus 텍스트 형식)
+#    GET  /debug/requests       → 최근 질문들의 단계별 소요시간 (JSON)
+#    잘못된 요청(JSON 객체가 아닌 본문, 1 ~ MAX_K 밖의 k, 잘못된 Content-Length 등)은 400 으로 응답한다.
+#    엔진 호출은 스레드 풀에서 실행해서 이벤트 루프가 막히지 않게 한다.
+#    /answer 는 AnswerPipeline 으로 임베딩/키워드 검색을 동시에 돌리고 단계별 시간 제한을 둔다.
+class ChatbotServer:
+    def __init__(self, engine, pipeline=None):
+        self.engine = engine
+        self.pipeline = pipeline or AnswerPipeline(engine)
+
+    async def handle_search(self, payload):
+        query = _parse_query(payload)
+        k = _parse_k(payload)
+        results = await asyncio.to_thread(self.engine.search, query, k)
+        return {"results": serialize_results(results)}
+
+    async def handle_answer(self, payload):
+        query = _parse_query(payload)
+        k = _parse_k(payload)
+        return await self.pipeline.run(query, k, profile="cprofile" if payload.get("profile") else None)
+
+    async def handle_health(self, payload):
+        snapshot = self.engine.snapshot
+        health = {
+            "status": "ok",
+            "programs": len(snapshot.programs),
+            "catalog_version": snapshot.version,
+            "catalog_reloads": self.engine.catalog.reloads,
+        }
+        # 📌 부서별 샤드로 띄웠으면 샤드마다 프로그램 수
+        if getattr(snapshot, "shards", None):
+            health["shards"] = {name: len(shard.programs) for name, shard in snapshot.shards.items()}
+        return health
+
+    async def handle_metrics(self, payload):
+        return METRICS.to_prometheus()
+
+    async def handle_debug_requests(self, payload):
+        return METRICS.to_json(recent=METRICS.recent.maxlen)
+
+    def route(self, method, path):
+        routes = {
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/metrics"): self.handle_metrics,
+            ("GET", "/debug/requests"): self.handle_debug_requests,
+            ("POST", "/search"): self.handle_search,
+            ("POST", "/answer"): self.handle_answer,
+        }
+        return routes.get((method, path))
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            try:
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            except ValueError:
+                raise BadRequest("malformed request line")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = _content_length(headers)
+            if length > MAX_BODY_BYTES:
+                await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"})
+                return
+            try:
+                body = await reader.readexactly(length) if length else b""
+            except asyncio.IncompleteReadError:
+                raise BadRequest("body shorter than Content-Length")
+
+            handler = self.route(method, path.split("?", 1)[0])
+            if handler is None:
+                await self.respond(writer, HTTPStatus.NOT_FOUND, {"error": f"{method} {path} not found"})
+                return
+            try:
+                payload = _payload_object(json.loads(body) if body else {})
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "invalid JSON body"})
+                return
+            await self.respond(writer, HTTPStatus.OK, await handler(payload))
+        except BadRequest as e:
+            await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            logger.exception("request failed")
+            await self.respond(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+        finally:
+            writer.close()
+
+    # 📌 dict 는 JSON, 문자열은 그대로 텍스트(/metrics)로 보낸다
+    async def respond(self, writer, status, payload):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info("chatbot API listening on http://%s:%d", host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def _openai_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+def _openai_chat_model():
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model_name="gpt-4o", temperature=0.1)
+
+
+# ✅ 채팅/임베딩 모델 만들기 (--offline 이면 네트워크 없이 결정적 임베딩 + 템플릿 응답)
+#    OpenAI 클라이언트는 첫 질의 임베딩 / 첫 LLM 호출 때 만들어지므로 langchain import 가 시작 시간에 들어가지 않는다.
+#    artifact_path 에 최신 index_artifact 파일이 있으면 카탈로그 / 인덱스 / 임베딩 행렬을 바로 연다.
+#    embedding_store_path 를 주면 여러 서버 프로세스가 임베딩 행렬 한 벌(메모리 맵 파일)을 같이 쓴다.
+#    ann_nprobe 를 주면 벡터 검색에 IVF 근사 인덱스를 쓴다 (클수록 정확하고 느림).
+#    shards({부서 이름: [JSON 파일, ...]})를 주면 부서별 샤드 인덱스(catalog_registry)로 검색한다.
+#    route_intents 가 켜져 있으면 목록/필터 질문은 의도 분류기(intent_router)가 LLM 없이 템플릿으로 보낸다.
+def build_engine(offline=False, sources=DEFAULT_SOURCES, artifact_path=DEFAULT_ARTIFACT_PATH, embedding_store_path=None,
+                 ann_nprobe=None, route_intents=True, shards=None):
+    intent_router = load_intent_router() if route_intents else None
+    if offline:
+        return ChatbotEngine(
+            sources, embedder=HashingEmbedder(), artifact_path=artifact_path, embedding_store_path=embedding_store_path,
+            ann_nprobe=ann_nprobe, intent_router=intent_router, shards=shards,
+        )
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return ChatbotEngine(
+        sources,
+        embedder=LazyObject(_openai_embeddings),
+        chat_model=LazyObject(_openai_chat_model),
+        artifact_path=artifact_path,
+        embedding_model=EMBEDDING_MODEL,
+        embedding_store_path=embedding_store_path,
+        ann_nprobe=ann_nprobe,
+        intent_router=intent_router,
+        shards=shards,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전주대학교 비교과 챗봇 검색/응답 API 서버")
+    parser.add_argument("--host", default=os.getenv("CHATBOT_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("CHATBOT_API_PORT", "8000")))
+    parser.add_argument("--offline", action="store_true", help="OpenAI 없이 로컬 임베딩 + 템플릿 응답으로 실행")
+    parser.add_argument("--artifact", default=DEFAULT_ARTIFACT_PATH, help="index_artifact.py 로 미리 만든 인덱스 파일")
+    parser.add_argument("--embedding-store", help="embedding_store.py 로 만든 메모리 맵 임베딩 파일 (워커끼리 공유)")
+    parser.add_argument("--ann-nprobe", type=int, help="벡터 검색에 IVF 근사 인덱스 사용, 질의마다 볼 군집 수 (ann_benchmark.py 참고)")
+    parser.add_argument("--shard", action="append", default=[], metavar="NAME=FILE[,FILE]",
+                        help="부서별 카탈로그 샤드 (여러 번 지정, 부서마다 따로 인덱스를 만들고 질의는 동시에 검색)")
+    parser.add_argument("--no-intent-router", action="store_true", help="목록/필터 질문도 모두 LLM 으로 답하기")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="카탈로그 JSON 파일을 SECONDS 초마다 확인해서 바뀌면 다시 읽기")
+    parser.add_argument("--embed-timeout", type=float, default=2.0, help="질의 임베딩 시간 제한(초), 넘으면 키워드 검색만 사용")
+    parser.add_argument("--llm-timeout", type=float, default=15.0, help="응답 생성 시간 제한(초), 넘으면 템플릿 응답")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = build_engine(
+        offline=args.offline, artifact_path=args.artifact, embedding_store_path=args.embedding_store,
+        ann_nprobe=args.ann_nprobe, route_intents=not args.no_intent_router,
+        shards=parse_shard_specs(args.shard) or None,
+    )
+    if args.watch:
+        engine.catalog.start(args.watch)
+    pipeline = AnswerPipeline(engine, embed_timeout=args.embed_timeout, llm_timeout=args.llm_timeout)
+    server = ChatbotServer(engine, pipeline)
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
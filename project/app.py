@@ -0,0 +1,49 @@
+import os
+import streamlit as st
+from api_client import ChatbotClient
+
+# ✅ 챗봇 API 서버 주소 (api_server.py 로 띄운 서버)
+API_URL = os.getenv("CHATBOT_API_URL", "http://127.0.0.1:8000")
+
+# ✅ Streamlit UI 설정
+st.set_page_config(page_title="전주대학교 비교과 챗봇", page_icon="🎓", layout="centered")
+st.title("🎓 전주대학교 비교과 챗봇")
+st.write("전주대학교 비교과 프로그램에 대해 질문하세요!")
+
+# ✅ API 클라이언트 (검색 인덱스 / 임베딩 / 모델은 서버 프로세스에만 존재)
+@st.cache_resource
+def load_client():
+    return ChatbotClient(API_URL)
+
+client = load_client()
+
+# ✅ 세션 상태 초기화
+if "messages" not in st.session_state:
+    st.session_state["messages"] = []
+
+# ✅ 채팅 UI
+chat_container = st.container()
+
+for role, content in st.session_state["messages"]:
+    with chat_container:
+        with st.chat_message(role):
+            st.write(content)
+
+# ✅ 사용자 입력
+user_input = st.chat_input("비교과 프로그램에 대해 질문하세요!")
+
+if user_input:
+    st.session_state["messages"].append(("user", user_input))
+
+    try:
+        response_content = client.answer(user_input)["answer"]
+    except OSError as e:
+        response_content = f"❌ 챗봇 서버({API_URL})에 연결할 수 없습니다: {str(e)}"
+
+    st.session_state["messages"].append(("assistant", response_content))
+
+    with chat_container:
+        with st.chat_message("user"):
+            st.write(user_input)
+        with st.chat_message("assistant"):
+            st.write(response_content)
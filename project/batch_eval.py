@@ -0,0 +1,119 @@
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_server import build_engine
+from catalog import DEFAULT_SOURCES
+from instrumentation import METRICS
+from relevance_benchmark import percentile
+
+logger = logging.getLogger(__name__)
+
+# ✅ 질문 본문으로 쓸 수 있는 필드 (앞에 있는 것부터 사용)
+QUESTION_FIELDS = ("question", "query", "title", "body")
+STAGES = ("filter_ms", "retrieve_ms", "generate_ms", "total_ms")
+
+
+# ✅ JSONL 파일 → [(질문 id, 질문), ...]
+#    한 줄은 {"question": ...} / {"query": ...} / {"title", "body"} 형태의 JSON 이거나 그냥 문자열
+def read_questions(path):
+    questions = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                questions.append((str(line_number), record))
+                continue
+            text = next((record[field] for field in QUESTION_FIELDS if record.get(field)), None)
+            if text is None:
+                logger.warning("%s:%d 질문 필드가 없어 건너뜀", path, line_number)
+                continue
+            question_id = record.get("id") or record.get("request_id") or str(line_number)
+            questions.append((str(question_id), text))
+    return questions
+
+
+# ✅ 질문 하나 처리 → 결과 JSONL 한 줄에 들어갈 dict
+def run_question(engine, question_id, query, k):
+    timings = {}
+    start = time.perf_counter()
+    record = {"id": question_id, "query": query}
+    try:
+        record.update(engine.answer(query, k=k, timings=timings))
+    except Exception as e:
+        logger.exception("question %s failed", question_id)
+        record["error"] = str(e)
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+    record["timings"] = {name: round(value, 3) for name, value in timings.items()}
+    return record
+
+
+# ✅ 처리량(qps) / 단계별 p50·p95·p99 지연시간 요약
+def summarize(records, elapsed):
+    summary = {
+        "questions": len(records),
+        "errors": sum(1 for record in records if "error" in record),
+        "cached": sum(1 for record in records if record.get("cached")),
+        "elapsed_s": round(elapsed, 3),
+        "qps": round(len(records) / elapsed, 2) if elapsed else 0.0,
+    }
+    for stage in STAGES:
+        values = [record["timings"][stage] for record in records if stage in record["timings"]]
+        if values:
+            summary[stage] = {f"p{pct}": round(percentile(values, pct), 3) for pct in (50, 95, 99)}
+
+    # 📌 의도 분류기가 템플릿으로 보낸 비율(LLM 호출을 건너뛴 질문)과 응답 방식별 응답 생성 시간
+    routes = {}
+    for record in records:
+        if record.get("route"):
+            routes.setdefault(record["route"], []).append(record["timings"].get("generate_ms", 0.0))
+    if routes:
+        summary["routes"] = {
+            route: {"questions": len(values), "share": round(len(values) / len(records), 3),
+                    "generate_ms_p50": round(percentile(values, 50), 3)}
+            for route, values in sorted(routes.items())
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL 질문 목록을 한 번에 돌려 응답/단계별 소요시간을 기록하는 배치 평가")
+    parser.add_argument("input", help="질문 JSONL 파일")
+    parser.add_argument("--output", default="batch_results.jsonl", help="결과 JSONL 파일")
+    parser.add_argument("--summary", help="요약(qps, p50/p95/p99)을 JSON 파일로 저장")
+    parser.add_argument("--sources", nargs="+", default=list(DEFAULT_SOURCES), help="사용할 카탈로그 JSON 파일")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--metrics", help="단계별 히스토그램 / 캐시·토큰 카운터 저장 (.prom 이면 Prometheus 텍스트, 아니면 JSON)")
+    parser.add_argument("--offline", action="store_true", help="OpenAI 없이 로컬 임베딩 + 템플릿 응답으로 실행")
+    parser.add_argument("--no-intent-router", action="store_true", help="목록/필터 질문도 모두 LLM 으로 답하기")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    questions = read_questions(args.input)
+    engine = build_engine(offline=args.offline, sources=args.sources, route_intents=not args.no_intent_router)
+
+    start = time.perf_counter()
+    # 📌 결과는 입력 순서대로 쓰고, 처리는 워커 스레드 여러 개로 동시에
+    with ThreadPoolExecutor(max_workers=args.workers) as pool, open(args.output, "w", encoding="utf-8") as output:
+        records = []
+        for record in pool.map(lambda item: run_question(engine, item[0], item[1], args.k), questions):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            records.append(record)
+    summary = summarize(records, time.perf_counter() - start)
+
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2, ensure_ascii=False)
+    if args.metrics:
+        METRICS.write(args.metrics)
+
+
+if __name__ == "__main__":
+    main()
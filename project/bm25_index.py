@@ -0,0 +1,140 @@
+import copy
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+# ✅ 검색 대상 필드 (제목은 두 번 넣어서 가중치를 높인다)
+TITLE_WEIGHT = 2
+
+# ✅ 인덱스를 이루는 numpy 배열 (파일로 저장/복원할 때 사용)
+ARRAY_NAMES = ("offsets", "doc_ids", "term_freqs", "doc_lengths", "idf", "length_norm")
+
+
+# ✅ 한국어 형태소 분석기 없이 쓰는 토크나이저
+#    - 한글 덩어리는 글자 bigram 으로 쪼갠다 ("멘토링" → "멘토", "토링") (한 글자면 그대로)
+#    - 영문/숫자 덩어리는 단어 그대로 ("ncs", "2025")
+def tokenize(text):
+    tokens = []
+    for chunk in TOKEN_PATTERN.findall((text or "").lower()):
+        if "가" <= chunk[0] <= "힣":
+            if len(chunk) == 1:
+                tokens.append(chunk)
+            else:
+                tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+        else:
+            tokens.append(chunk)
+    return tokens
+
+
+def program_document(program):
+    parts = [program.title] * TITLE_WEIGHT
+    for value in program.to_dict().values():
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        else:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+# ✅ BM25 전문 검색 인덱스
+#    posting list 를 CSR 형태의 numpy 배열(offsets / doc_ids / term_freqs)로 저장해서
+#    질의 토큰마다 배열 조각을 잘라 점수를 더하는 방식으로 네트워크 없이 바로 순위를 매긴다.
+class BM25Index:
+    def __init__(self, program_index, k1=1.5, b=0.75):
+        self.index = program_index
+        self.k1 = k1
+        self.b = b
+
+        postings = {}
+        doc_lengths = []
+        for pid, program in enumerate(program_index.programs):
+            tokens = tokenize(program_document(program))
+            doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((pid, count))
+
+        self.vocabulary = {token: term_id for term_id, token in enumerate(sorted(postings))}
+        offsets = [0]
+        doc_ids = []
+        term_freqs = []
+        for token in sorted(postings):
+            for pid, count in postings[token]:
+                doc_ids.append(pid)
+                term_freqs.append(count)
+            offsets.append(len(doc_ids))
+
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self.term_freqs = np.asarray(term_freqs, dtype=np.float32)
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+
+        doc_count, doc_freqs, total_length = self.statistics()
+        self._set_statistics(doc_count, doc_freqs, total_length / doc_count if doc_count else 0.0)
+
+    # 📌 idf 와 문서 길이 정규화 항은 질의와 무관하므로 미리 계산
+    def _set_statistics(self, doc_count, doc_freqs, average_length):
+        self.idf = np.log1p((doc_count - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        self.length_norm = (self.k1 * (1 - self.b + self.b * self.doc_lengths / (average_length or 1.0))).astype(np.float32)
+
+    # ✅ (문서 수, 용어별 문서 빈도 배열(vocabulary 순서), 전체 문서 길이 합)
+    def statistics(self):
+        return len(self.doc_lengths), np.diff(self.offsets).astype(np.float64), float(self.doc_lengths.sum(dtype=np.float64))
+
+    # ✅ 다른 샤드까지 합친 통계(문서 수 / 용어 → 문서 빈도 / 평균 길이)로 idf 와 길이 정규화만 다시 계산한 사본
+    #    샤드마다 자기 통계로 매긴 BM25 점수는 서로 비교할 수 없으므로 catalog_registry 가 합치기 전에 맞춘다.
+    #    (posting 배열은 원본과 같이 쓴다)
+    def with_statistics(self, doc_count, doc_freqs, average_length):
+        index = copy.copy(self)
+        freqs = np.fromiter((doc_freqs[token] for token in self.vocabulary), dtype=np.float64, count=len(self.vocabulary))
+        index._set_statistics(doc_count, freqs, average_length)
+        return index
+
+    # ✅ 미리 만들어 둔 배열(index_artifact)로 다시 계산 없이 인덱스 만들기
+    @classmethod
+    def from_arrays(cls, program_index, vocabulary, arrays, k1=1.5, b=0.75):
+        index = cls.__new__(cls)
+        index.index = program_index
+        index.k1 = k1
+        index.b = b
+        index.vocabulary = {token: term_id for term_id, token in enumerate(vocabulary)}
+        for name in ARRAY_NAMES:
+            setattr(index, name, arrays[name])
+        return index
+
+    # ✅ 질의 → 프로그램 전체에 대한 BM25 점수 배열
+    def scores(self, query):
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+        return scores
+
+    # ✅ 질의 → [(프로그램, 점수), ...] (점수가 0보다 큰 프로그램만, 최대 k개)
+    #    filters 는 SemanticSearchEngine.search 와 같은 형식
+    def search(self, query, k=10, filters=None):
+        scores = self.scores(query)
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        if filters:
+            mask = np.zeros(scores.shape[0], dtype=bool)
+            mask[self.index.search_positions(**filters)] = True
+            scores[~mask] = 0.0
+        hits = np.flatnonzero(scores > 0)
+        if not hits.size:
+            return []
+        k = min(k, hits.size)
+        # 📌 점수가 같으면 카탈로그 순서 (k 번째와 같은 점수인 프로그램까지 후보로 두고 자른다)
+        #    → 샤드로 나눈 카탈로그(catalog_registry)에서도 같은 순위가 나온다
+        kth = np.partition(scores[hits], hits.size - k)[hits.size - k]
+        top = hits[scores[hits] >= kth]
+        top = top[np.lexsort((top, -scores[top]))][:k]
+        return [(self.index.programs[pid], float(scores[pid])) for pid in top]
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ✅ 기본으로 합치는 JSON 파일 (앞에 있는 파일이 우선)
+DEFAULT_SOURCES = [
+    os.path.join(PROJECT_DIR, "programs.json"),
+    os.path.join(PROJECT_DIR, "programs_fixed.json"),
+    os.path.join(PROJECT_DIR, "education_programs.json"),
+]
+
+# ✅ JSON 최상위에서 프로그램 목록이 들어 있을 수 있는 키
+POSSIBLE_KEYS = ["프로그램_정보", "비교과_프로그램", "프로그램"]
+
+# ✅ JSON 필드 이름 → Program 속성 이름
+FIELD_NAMES = {
+    "제목": "title",
+    "설명": "description",
+    "신청기간": "apply_period",
+    "기간": "period",
+    "장소": "place",
+    "혜택": "benefits",
+    "신청대상": "target",
+    "문의처": "contact",
+}
+
+# ✅ 파일마다 다르게 쓰는 필드 이름 (education_programs.json 은 "신청대상" 대신 "대상")
+FIELD_ALIASES = {
+    "대상": "신청대상",
+}
+
+
+# ✅ 비교 전에 공백을 모두 지우고 소문자로 바꾼다 ("3차(면접" 과 "3차 (면접" 을 같은 값으로 취급)
+def _normalize(text):
+    return re.sub(r"\s+", "", text or "").lower()
+
+
+# ✅ 제목 + 기간 + 장소로 만드는 고정 id (같은 프로그램은 어느 파일에서 읽어도 같은 id)
+def program_id(title, period, place):
+    key = "\x1f".join(_normalize(part) for part in (title, period, place))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+# ✅ 비교과 프로그램 한 건
+#    자주 쓰는 필드는 속성으로, 나머지 필드(운영시간/추가사항/강사 등)는 extra에 원래 이름 그대로 보관한다.
+#    program["제목"], program.get("신청대상", "") 처럼 기존 dict 방식으로도 접근할 수 있다.
+@dataclass(slots=True)
+class Program:
+    id: str
+    title: str = ""
+    description: str = ""
+    apply_period: str = ""
+    period: str = ""
+    place: str = ""
+    benefits: str = ""
+    target: str = ""
+    contact: str = ""
+    source: str = ""
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data, source=""):
+        values = {}
+        extra = {}
+        for key, value in data.items():
+            key = FIELD_ALIASES.get(key, key)
+            attr = FIELD_NAMES.get(key)
+            if attr is None:
+                extra[key] = value
+            elif attr not in values:
+                values[attr] = value if isinstance(value, str) else str(value)
+        pid = program_id(values.get("title", ""), values.get("period", ""), values.get("place", ""))
+        return cls(id=pid, source=source, extra=extra, **values)
+
+    def __getitem__(self, key):
+        key = FIELD_ALIASES.get(key, key)
+        attr = FIELD_NAMES.get(key)
+        if attr is not None:
+            return getattr(self, attr)
+        return self.extra[key]
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value == "" else value
+
+    # ✅ JSON과 같은 모양의 dict (비어 있는 필드는 제외)
+    def to_dict(self):
+        data = {}
+        for key, attr in FIELD_NAMES.items():
+            value = getattr(self, attr)
+            if value:
+                data[key] = value
+        data.update(self.extra)
+        return data
+
+    # ✅ 비어 있는 필드를 같은 프로그램의 다른 레코드 값으로 채운다
+    def fill_missing(self, other):
+        for attr in FIELD_NAMES.values():
+            if not getattr(self, attr) and getattr(other, attr):
+                setattr(self, attr, getattr(other, attr))
+        for key, value in other.extra.items():
+            self.extra.setdefault(key, value)
+
+
+# ✅ 프로그램 내용 해시 (필드 순서와 무관하게 같은 내용이면 같은 값)
+def content_hash(program):
+    payload = json.dumps(program.to_dict(), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ✅ 카탈로그 전체 버전 (프로그램 하나라도 바뀌면 값이 바뀜)
+def catalog_version(programs):
+    digest = hashlib.sha256()
+    for program in programs:
+        digest.update(content_hash(program).encode("ascii"))
+    return digest.hexdigest()
+
+
+# ✅ JSON 파일 하나에서 프로그램 dict 목록 읽기 (최상위가 목록이거나 POSSIBLE_KEYS 중 하나)
+def read_program_file(file_path):
+    with open(file_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, list):
+        return data
+    for key in POSSIBLE_KEYS:
+        if key in data:
+            return data[key]
+    return []
+
+
+# ✅ 여러 JSON 파일을 하나의 카탈로그로 합치기
+#    같은 id의 프로그램은 먼저 읽은 레코드를 유지하고, 비어 있는 필드만 뒤의 레코드로 채운다.
+def load_catalog(paths=DEFAULT_SOURCES):
+    catalog = {}
+    for path in paths:
+        source = os.path.basename(path)
+        for item in read_program_file(path):
+            program = Program.from_dict(item, source=source)
+            if program.id in catalog:
+                catalog[program.id].fill_missing(program)
+            else:
+                catalog[program.id] = program
+    return list(catalog.values())
@@ -0,0 +1,319 @@
+import hashlib
+import heapq
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from catalog import PROJECT_DIR
+from catalog_reloader import DEFAULT_POLL_INTERVAL, CatalogReloader
+from hybrid_retriever import HybridRetriever
+from instrumentation import METRICS
+from notice_ingest import NOTICE_CATALOG_PATH
+from semantic_search import FILTER_NAMES
+
+logger = logging.getLogger(__name__)
+
+# ✅ 기본 샤드: 부서(학과/본부 부서)별 카탈로그 파일 (샤드 안에서는 앞에 있는 파일이 우선)
+DEFAULT_SHARDS = {
+    # 📌 대학 본부 진로·취업 / 점프업 포인트 프로그램
+    "central": [os.path.join(PROJECT_DIR, "programs.json"), os.path.join(PROJECT_DIR, "programs_fixed.json")],
+    # 📌 학과 교원임용 특강 (대상 / 강사 필드)
+    "education": [os.path.join(PROJECT_DIR, "education_programs.json")],
+}
+# ✅ 파일이 생기면 붙는 샤드 (notice_ingest 가 공지 HTML 에서 만든 카탈로그)
+OPTIONAL_SHARDS = {
+    "notices": [NOTICE_CATALOG_PATH],
+}
+
+
+# ✅ 샤드별 BM25 인덱스 → 카탈로그 전체 통계(문서 수 / 문서 빈도 / 평균 길이)로 점수를 매기는 사본 목록
+#    샤드마다 자기 idf / 평균 길이로 매긴 점수는 비교할 수 없어서, 작은 샤드(notices 등)의 점수가 부풀거나
+#    같은 카탈로그라도 샤드를 나누는 방식에 따라 상위 k개가 달라진다. 통계를 합쳐 두면 샤드 없이 만든
+#    BM25 인덱스와 같은 점수가 나오므로 merge_results 가 점수 그대로 합칠 수 있다.
+def global_bm25_indexes(indexes):
+    doc_count = 0
+    total_length = 0.0
+    doc_freqs = {}
+    for index in indexes:
+        count, freqs, length = index.statistics()
+        doc_count += count
+        total_length += length
+        for token, freq in zip(index.vocabulary, freqs.tolist()):
+            doc_freqs[token] = doc_freqs.get(token, 0.0) + freq
+    average_length = total_length / doc_count if doc_count else 0.0
+    return [index.with_statistics(doc_count, doc_freqs, average_length) for index in indexes]
+
+
+# ✅ 샤드별 검색 결과 → 점수 내림차순 상위 k개 (여러 샤드에 같은 프로그램이 있으면 높은 점수 하나만)
+#    BM25 는 global_bm25_indexes 로 통계를 맞춘 점수, 벡터 검색은 코사인 유사도라 샤드끼리 그대로 비교할 수 있다.
+def merge_results(result_lists, k):
+    best = {}
+    for results in result_lists:
+        for program, score in results:
+            if program.id not in best or score > best[program.id][1]:
+                best[program.id] = (program, score)
+    return heapq.nlargest(k, best.values(), key=lambda item: item[1])
+
+
+def _active_filters(filters):
+    filters = {name: value for name, value in (filters or {}).items() if value}
+    unknown = set(filters) - set(FILTER_NAMES)
+    if unknown:
+        raise ValueError(f"알 수 없는 필터: {', '.join(sorted(unknown))}")
+    return filters
+
+
+# ✅ 샤드마다 있는 검색기(BM25 / 벡터)에 같은 질의를 동시에 보내고 결과를 합치는 검색기
+#    필터가 있으면 그 필터에 맞는 프로그램이 하나도 없는 샤드에는 보내지 않는다.
+class ShardedSearch:
+    def __init__(self, snapshots, searchers, pool):
+        self.snapshots = snapshots
+        self.searchers = searchers
+        self.pool = pool
+
+    def _targets(self, filters):
+        filters = _active_filters(filters)
+        if not filters:
+            return list(self.searchers)
+        return [
+            searcher for snapshot, searcher in zip(self.snapshots, self.searchers)
+            if snapshot.program_index.search_positions(**filters)
+        ]
+
+    def _fan_out(self, targets, call):
+        METRICS.inc("shard_searches", len(targets))
+        if len(targets) <= 1:
+            return [call(searcher) for searcher in targets]
+        return list(self.pool.map(call, targets))
+
+    def search(self, query, k=10, filters=None):
+        return merge_results(self._fan_out(self._targets(filters), lambda searcher: searcher.search(query, k, filters)), k)
+
+
+# ✅ 샤드별 SemanticSearchEngine 묶음 (질의 임베딩은 한 번만 하고 벡터를 샤드마다 나눠 준다)
+class ShardedSemanticSearch(ShardedSearch):
+    def __init__(self, snapshots, searchers, pool):
+        super().__init__(snapshots, searchers, pool)
+        self.embedding_cache = searchers[0].embedding_cache if searchers else None
+
+    def search(self, query, k=5, filters=None):
+        targets = self._targets(filters)
+        if not targets:
+            return []
+        query_vector = self.embedding_cache.embed_query(query)
+        return merge_results(self._fan_out(targets, lambda searcher: searcher.search_vector(query_vector, k, filters)), k)
+
+    def search_vector(self, query_vector, k=5, filters=None):
+        return merge_results(
+            self._fan_out(self._targets(filters), lambda searcher: searcher.search_vector(query_vector, k, filters)), k
+        )
+
+    def search_batch(self, queries, k=5, filters=None):
+        targets = self._targets(filters)
+        if not targets or not queries:
+            return [[] for _ in queries]
+        query_vectors = self.embedding_cache.embedder.embed_documents(list(queries))
+        per_shard = self._fan_out(targets, lambda searcher: searcher.search_vectors(query_vectors, k, filters))
+        return [merge_results(results, k) for results in zip(*per_shard)]
+
+
+# ✅ 샤드별 ProgramIndex 묶음 (필터 검색 결과는 샤드 순서 → 샤드 안 카탈로그 순서, 같은 id 는 한 번만)
+class ShardedProgramIndex:
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self.programs = []
+        self.positions = {}
+        for index in indexes:
+            for program in index.programs:
+                if program.id not in self.positions:
+                    self.positions[program.id] = len(self.programs)
+                    self.programs.append(program)
+        self.ids = [program.id for program in self.programs]
+
+    def search(self, *args, **kwargs):
+        seen = set()
+        results = []
+        for index in self.indexes:
+            for program in index.search(*args, **kwargs):
+                if program.id not in seen:
+                    seen.add(program.id)
+                    results.append(program)
+        return results
+
+    def search_ids(self, *args, **kwargs):
+        return [program.id for program in self.search(*args, **kwargs)]
+
+    def get(self, program_id):
+        return self.programs[self.positions[program_id]]
+
+
+# ✅ 샤드 snapshot 들을 CatalogSnapshot 과 같은 모양으로 묶은 것
+#    (programs / version / program_index / bm25_index / semantic / retriever 를 그대로 쓸 수 있다)
+@dataclass(slots=True)
+class ShardedSnapshot:
+    programs: list
+    version: str
+    program_index: ShardedProgramIndex
+    bm25_index: ShardedSearch
+    semantic: object = None
+    retriever: object = None
+    shards: dict = None
+
+
+# 📌 샤드 이름 + 샤드 버전으로 만드는 전체 버전 (샤드 하나라도 바뀌면 값이 바뀜)
+def sharded_version(shards):
+    digest = hashlib.sha256()
+    for name, snapshot in sorted(shards.items()):
+        digest.update(f"{name}\x1f{snapshot.version}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_sharded_snapshot(shards, pool):
+    snapshots = list(shards.values())
+    program_index = ShardedProgramIndex([snapshot.program_index for snapshot in snapshots])
+    bm25_index = ShardedSearch(snapshots, global_bm25_indexes([snapshot.bm25_index for snapshot in snapshots]), pool)
+    semantic = None
+    retriever = bm25_index
+    if snapshots and all(snapshot.semantic is not None for snapshot in snapshots):
+        semantic = ShardedSemanticSearch(snapshots, [snapshot.semantic for snapshot in snapshots], pool)
+        retriever = HybridRetriever(bm25_index, semantic)
+    return ShardedSnapshot(
+        program_index.programs, sharded_version(shards), program_index, bm25_index, semantic, retriever, dict(shards)
+    )
+
+
+# ✅ 부서별 카탈로그 샤드 레지스트리
+#    - 샤드마다 CatalogReloader 하나 (자기 파일만 읽고 자기 키워드 / 날짜 / BM25 / 벡터 인덱스를 가진다)
+#    - 질의는 관련 있는 샤드들에 동시에 보내고 점수 순으로 합친다 (ShardedSnapshot, BM25 는 전체 통계로 맞춘 점수)
+#    - 샤드를 추가하거나 한 부서 파일이 바뀌면 그 샤드만 다시 만들고, 나머지 샤드 인덱스는 그대로 둔 채
+#      묶음(snapshot)만 새로 만들어 참조 하나를 바꾼다.
+#    CatalogReloader 와 같은 snapshot / add_listener / check / start / stop 을 제공한다.
+class CatalogRegistry:
+    def __init__(self, shards=None, embedding_cache=None, embedding_store=None, ann_nprobe=None, max_workers=None):
+        # 📌 샤드를 주지 않으면 기본 샤드 + 파일이 있는 선택 샤드 (없는 선택 샤드는 check() 때 파일이 생기면 붙인다)
+        self._pending = {}
+        if shards is None:
+            shards = dict(DEFAULT_SHARDS)
+            for name, sources in OPTIONAL_SHARDS.items():
+                if all(os.path.exists(path) for path in sources):
+                    shards[name] = sources
+                else:
+                    self._pending[name] = sources
+        self.embedding_cache = embedding_cache
+        self.embedding_store = embedding_store
+        self.ann_nprobe = ann_nprobe
+        self.reloads = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or min(8, max(len(shards), 1)), thread_name_prefix="catalog-shard"
+        )
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # 📌 처음에는 샤드들을 동시에 만든다
+        names = list(shards)
+        self._reloaders = dict(zip(names, self._pool.map(lambda name: self._new_reloader(shards[name]), names)))
+        self._snapshot = build_sharded_snapshot(self._shard_snapshots(), self._pool)
+
+    def _new_reloader(self, sources):
+        return CatalogReloader(
+            sources, self.embedding_cache, embedding_store=self.embedding_store, ann_nprobe=self.ann_nprobe
+        )
+
+    def _shard_snapshots(self):
+        return {name: reloader.snapshot for name, reloader in self._reloaders.items()}
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def shard_names(self):
+        return list(self._reloaders)
+
+    @property
+    def failures(self):
+        return sum(reloader.failures for reloader in self._reloaders.values())
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    # 📌 샤드가 바뀐 뒤 묶음만 새로 만들어 교체하고 리스너에 알린다 (_lock 안에서 호출)
+    def _publish(self):
+        snapshot = build_sharded_snapshot(self._shard_snapshots(), self._pool)
+        if snapshot.version == self._snapshot.version:
+            return None
+        self._snapshot = snapshot
+        self.reloads += 1
+        logger.info("catalog shards: %s, %d programs, version %s",
+                    ", ".join(self._reloaders), len(snapshot.programs), snapshot.version[:12])
+        return snapshot
+
+    def _notify(self, snapshot):
+        if snapshot is not None:
+            for callback in self._listeners:
+                callback(snapshot)
+        return snapshot is not None
+
+    # ✅ 부서 샤드 추가 (같은 이름이 있으면 그 샤드만 새 파일로 교체) → 다른 샤드는 다시 만들지 않는다
+    def add_shard(self, name, sources):
+        reloader = self._new_reloader(sources)
+        with self._lock:
+            self._reloaders[name] = reloader
+            snapshot = self._publish()
+        return self._notify(snapshot)
+
+    def remove_shard(self, name):
+        with self._lock:
+            if self._reloaders.pop(name, None) is None:
+                return False
+            snapshot = self._publish()
+        return self._notify(snapshot)
+
+    # ✅ 파일이 바뀐 샤드만 다시 만들어서 교체 (교체했으면 True, 새로 생긴 선택 샤드도 여기서 붙는다)
+    def check(self):
+        with self._lock:
+            changed = [name for name, reloader in self._reloaders.items() if reloader.check()]
+            for name, sources in list(self._pending.items()):
+                if all(os.path.exists(path) for path in sources):
+                    self._reloaders[name] = self._new_reloader(self._pending.pop(name))
+                    changed.append(name)
+            snapshot = self._publish() if changed else None
+        if changed:
+            logger.info("catalog shards reloaded: %s", ", ".join(changed))
+        return self._notify(snapshot)
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("catalog reload listener failed")
+
+    # ✅ 백그라운드 감시 시작 (이미 돌고 있으면 그대로)
+    def start(self, interval=DEFAULT_POLL_INTERVAL):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="catalog-registry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+# ✅ "이름=파일[,파일...]" 목록 → {이름: [파일, ...]} (api_server --shard 옵션)
+def parse_shard_specs(specs):
+    shards = {}
+    for spec in specs:
+        name, _, paths = spec.partition("=")
+        if not name or not paths:
+            raise ValueError(f"샤드 형식은 이름=파일[,파일...] 이어야 합니다: {spec}")
+        shards[name] = [path for path in paths.split(",") if path]
+    return shards
@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+from bm25_index import BM25Index
+from catalog import DEFAULT_SOURCES, catalog_version, load_catalog
+from hybrid_retriever import HybridRetriever
+from instrumentation import METRICS
+from program_index import ProgramIndex
+from semantic_search import SemanticSearchEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+# ✅ 한 시점의 카탈로그와 그걸로 만든 인덱스 묶음
+#    질의는 시작할 때 snapshot 하나를 잡고 끝날 때까지 그것만 쓴다.
+#    (다시 읽기는 새 snapshot 을 끝까지 만든 뒤 참조 하나만 바꾸므로 반쯤 만든 인덱스가 보일 일이 없다)
+@dataclass(slots=True)
+class CatalogSnapshot:
+    programs: list
+    version: str
+    program_index: ProgramIndex
+    bm25_index: BM25Index
+    semantic: object = None
+    retriever: object = None
+    mtimes: dict = None
+
+
+# 📌 파일별 수정 시각 (없는 파일은 None)
+def source_mtimes(sources):
+    mtimes = {}
+    for path in sources:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+# ✅ 카탈로그 파일 → snapshot
+#    embedding_cache 가 있으면 벡터 검색 + 하이브리드 검색기까지 만든다.
+#    임베딩 캐시는 내용 해시로 저장되므로 바뀐/새 프로그램만 임베딩 API 를 호출한다.
+#    embedding_store(MmapEmbeddingStore)가 카탈로그 전체를 같은 모델로 담고 있으면 행렬 대신 그 파일을 쓴다.
+#    ann_nprobe 를 주면 벡터 검색에 IVF 근사 인덱스를 붙이고, previous snapshot 의 인덱스가 있으면 이어서 쓴다.
+def build_snapshot(sources=DEFAULT_SOURCES, embedding_cache=None, embedding_store=None, ann_nprobe=None, previous=None):
+    mtimes = source_mtimes(sources)
+    with METRICS.span("catalog_load"):
+        programs = load_catalog(sources)
+    with METRICS.span("index_build"):
+        program_index = ProgramIndex(programs)
+        bm25_index = BM25Index(program_index)
+    semantic = None
+    retriever = bm25_index
+    if embedding_cache is not None:
+        store = None
+        if embedding_store is not None:
+            if embedding_store.model_name == embedding_cache.model_name and embedding_store.covers(program_index.ids):
+                store = embedding_store
+            else:
+                logger.warning("embedding store %s does not match the catalog, using in-process matrix", embedding_store.path)
+        previous_ann = previous.semantic.ann if previous is not None and previous.semantic is not None else None
+        semantic = SemanticSearchEngine(
+            program_index, embedding_cache, store=store, ann_nprobe=ann_nprobe, previous_ann=previous_ann
+        )
+        retriever = HybridRetriever(bm25_index, semantic)
+    return CatalogSnapshot(programs, catalog_version(programs), program_index, bm25_index, semantic, retriever, mtimes)
+
+
+# ✅ JSON 파일이 바뀌면 백그라운드에서 인덱스를 다시 만들고 통째로 바꿔 끼우는 카탈로그 로더
+#    - 파일 수정 시각(mtime)을 interval 초마다 확인 (표준 라이브러리만 사용, inotify 없음)
+#    - 다시 만들다 실패하면(저장 중인 JSON 등) 로그만 남기고 이전 snapshot 을 계속 쓴다.
+#    - 내용이 같으면(버전이 같으면) 바꾸지 않는다.
+#    - 바꾼 뒤에는 add_listener 로 등록한 함수에 새 snapshot 을 넘겨준다 (응답 캐시 버전 갱신 등).
+#    - snapshot 을 넘기면(예: index_artifact 에서 연 것) 처음 한 번은 JSON 을 읽지 않고 그걸 쓴다.
+class CatalogReloader:
+    def __init__(self, sources=DEFAULT_SOURCES, embedding_cache=None, snapshot=None, embedding_store=None, ann_nprobe=None):
+        self.sources = list(sources)
+        self.embedding_cache = embedding_cache
+        self.embedding_store = embedding_store
+        self.ann_nprobe = ann_nprobe
+        self.reloads = 0
+        self.failures = 0
+        self._snapshot = snapshot or build_snapshot(self.sources, embedding_cache, embedding_store, ann_nprobe)
+        self._seen_mtimes = self._snapshot.mtimes
+        self._listeners = []
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    # ✅ 파일이 바뀌었으면 다시 만들어서 교체 (교체했으면 True)
+    def check(self):
+        with self._build_lock:
+            mtimes = source_mtimes(self.sources)
+            if mtimes == self._seen_mtimes:
+                return False
+            # 📌 실패해도 같은 파일 상태로 계속 재시도하지 않도록 먼저 기록 (다음 저장 때 다시 시도)
+            self._seen_mtimes = mtimes
+            try:
+                snapshot = build_snapshot(
+                    self.sources, self.embedding_cache, self.embedding_store, self.ann_nprobe, previous=self._snapshot
+                )
+            except Exception:
+                self.failures += 1
+                logger.exception("catalog reload failed, keeping version %s", self._snapshot.version[:12])
+                return False
+            if snapshot.version == self._snapshot.version:
+                return False
+            self._snapshot = snapshot
+            self.reloads += 1
+            logger.info("catalog reloaded: %d programs, version %s", len(snapshot.programs), snapshot.version[:12])
+        for callback in self._listeners:
+            callback(snapshot)
+        return True
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("catalog reload listener failed")
+
+    # ✅ 백그라운드 감시 시작 (이미 돌고 있으면 그대로)
+    def start(self, interval=DEFAULT_POLL_INTERVAL):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="catalog-reloader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
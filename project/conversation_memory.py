@@ -0,0 +1,83 @@
+from collections import deque
+
+from prompt_context import estimate_tokens
+
+ROLE_LABELS = {"human": "🙋 사용자", "ai": "🤖 챗봇"}
+
+
+# ✅ 기본 요약기 (LLM 호출 없이 동작)
+#    이전 요약 뒤에 밀려난 질문들의 첫 줄을 붙이고, 너무 길어지면 앞쪽(오래된 내용)부터 버린다.
+def extractive_summary(previous_summary, messages, max_tokens=300):
+    lines = [line for line in previous_summary.split("\n") if line] if previous_summary else []
+    for role, content in messages:
+        if role != "human":
+            continue
+        first_line = content.strip().split("\n")[0][:80]
+        if first_line:
+            lines.append(f"- 사용자 질문: {first_line}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def render_markdown(role, content):
+    return f"**{ROLE_LABELS.get(role, role)}**\n\n{content}"
+
+
+# ✅ 대화 기록 관리자
+#    - 최근 window 개 메시지만 원문으로 유지하고, 밀려난 메시지는 summarizer 로 누적 요약한다.
+#    - 모델에 넘기는 기록은 [요약] + 최근 메시지를 max_history_tokens 안으로 자른 것이다.
+#    - 밀려난 메시지는 추가될 때 한 번만 markdown 으로 만들어 두고, rerun 때는 그 문자열을 그대로 출력한다.
+#    - 화면용 보관 기록도 최근 max_archived 개 메시지까지만 두고, 그보다 오래된 대화는 요약에만 남긴다.
+class ConversationMemory:
+    def __init__(self, window=6, max_history_tokens=1500, summarizer=extractive_summary, max_archived=40):
+        self.window = window
+        self.max_history_tokens = max_history_tokens
+        self.summarizer = summarizer
+        self.max_archived = max_archived
+        self.recent = []
+        self.summary = ""
+        self.archived = deque(maxlen=max_archived)
+        self.archived_markdown = ""
+        self.archived_count = 0
+
+    def __len__(self):
+        return self.archived_count + len(self.recent)
+
+    def add(self, role, content):
+        self.recent.append((role, content))
+        if len(self.recent) > self.window:
+            overflow = self.recent[:-self.window]
+            self.recent = self.recent[-self.window:]
+            self.summary = self.summarizer(self.summary, overflow)
+            self.archived.extend(render_markdown(r, c) for r, c in overflow)
+            self.archived_count += len(overflow)
+            dropped = self.archived_count - len(self.archived)
+            note = [f"_더 오래된 대화 {dropped}개는 요약으로만 남아 있습니다._"] if dropped else []
+            self.archived_markdown = "\n\n---\n\n".join(note + list(self.archived))
+
+    def add_user(self, content):
+        self.add("human", content)
+
+    def add_ai(self, content):
+        self.add("ai", content)
+
+    # ✅ 모델에 넘길 기록 [(role, content), ...] (ChatOpenAI 에 그대로 전달 가능)
+    def messages_for_model(self, system_prompt=None):
+        messages = []
+        if system_prompt:
+            messages.append(("system", system_prompt))
+        if self.summary:
+            messages.append(("system", f"이전 대화 요약:\n{self.summary}"))
+        budget = self.max_history_tokens - sum(estimate_tokens(content) for _, content in messages)
+
+        # 📌 최근 메시지부터 거꾸로 채워서 예산을 넘는 오래된 메시지는 뺀다
+        kept = []
+        for role, content in reversed(self.recent):
+            cost = estimate_tokens(content)
+            if kept and cost > budget:
+                break
+            kept.append((role, content))
+            budget -= cost
+        messages.extend(reversed(kept))
+        return messages
@@ -0,0 +1,62 @@
+import os
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+from instrumentation import METRICS
+
+PROFILE_KEY = "debug_profile"
+TRACES_KEY = "debug_traces"
+SESSION_TRACES = 50
+# ✅ 디버그 패널은 CHATBOT_DEBUG_PANEL=1 일 때만 보인다
+#    (Streamlit 은 모든 사용자 세션을 한 프로세스에서 돌리므로 기본으로 켜 두면 누구나 프로파일링을 켤 수 있다)
+DEBUG_ENV = "CHATBOT_DEBUG_PANEL"
+
+
+def debug_enabled():
+    return os.getenv(DEBUG_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+# 📌 체크되어 있으면 이번 질문을 cProfile 로 프로파일링 (METRICS.trace(profile=...) 에 그대로 넘긴다)
+def profile_requested():
+    return "cprofile" if debug_enabled() and st.session_state.get(PROFILE_KEY) else None
+
+
+# ✅ 질문 하나를 METRICS.trace 로 재고, 그 trace 를 이 세션의 목록에만 남긴다
+#    (METRICS.recent 는 프로세스 전체 목록이라 다른 사용자의 질문이 섞이므로 패널에서는 쓰지 않는다)
+@contextmanager
+def session_trace(query):
+    traces = st.session_state.setdefault(TRACES_KEY, deque(maxlen=SESSION_TRACES))
+    with METRICS.trace(query, profile=profile_requested()) as trace:
+        try:
+            yield trace
+        finally:
+            traces.append(trace)
+
+
+# ✅ 사이드바 디버그 패널: 이 세션의 최근 N개 질문 단계별 소요시간(ms) / 캐시·토큰 카운터 / 마지막 프로파일
+#    스크립트 맨 끝에서 호출해야 방금 처리한 질문까지 표에 들어간다.
+#    프로세스 전체 히스토그램 / 카운터는 api_server 의 /metrics 로만 내보낸다.
+def render_debug_panel(default_limit=10):
+    if not debug_enabled():
+        return
+    with st.sidebar.expander("🛠 성능 디버그", expanded=False):
+        st.checkbox("질문마다 cProfile 프로파일링", key=PROFILE_KEY)
+        traces = list(st.session_state.get(TRACES_KEY, ()))
+        if not traces:
+            st.caption("아직 처리한 질문이 없습니다.")
+            return
+        limit = st.slider("최근 질문 수", 1, SESSION_TRACES, min(default_limit, SESSION_TRACES))
+        traces = traces[-limit:]
+
+        rows = [trace.to_row() for trace in reversed(traces)]
+        st.dataframe(rows, use_container_width=True)
+        stages = sorted({name for row in rows for name in row if name.endswith("_ms") and name != "total_ms"})
+        if stages:
+            st.bar_chart({name: [row.get(name, 0.0) for row in rows] for name in stages})
+
+        latest = traces[-1]
+        st.caption(f"마지막 질문 단계 순서: {' → '.join(f'{name} {ms:.0f}ms' for name, ms in latest.stages)}")
+        if latest.profile:
+            st.code(latest.profile, language="text")
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from instrumentation import METRICS
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+
+
+# ✅ 프로그램 한 건을 임베딩할 때 사용하는 텍스트 (제목 + 설명 + 신청대상 + 혜택)
+def program_text(program):
+    return f"{program.get('제목', '')} {program.get('설명', '')} {program.get('신청대상', '')} {program.get('혜택', '')}"
+
+
+# ✅ 캐시 키: 모델 이름 + 임베딩한 텍스트의 해시
+def embedding_key(model_name, text):
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+# ✅ 네트워크 없이 쓰는 결정적(deterministic) 임베딩 모델
+#    글자 bigram을 해시해 고정 차원 벡터에 더한 뒤 정규화한다.
+#    OpenAIEmbeddings와 같은 embed_documents / embed_query 인터페이스를 가진다.
+class HashingEmbedder:
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        text = (text or "").lower()
+        grams = [text[i:i + 2] for i in range(max(len(text) - 1, 1))]
+        for gram in grams:
+            digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+# ✅ 디스크에 저장되는 임베딩 캐시 (SQLite, float32 blob)
+#    텍스트 + 모델 이름의 해시로 저장하므로 새로 추가되거나 내용이 바뀐 프로그램만 임베딩 API를 호출한다.
+class EmbeddingCache:
+    def __init__(self, embedder, path=DEFAULT_CACHE_PATH, model_name=None):
+        self.embedder = embedder
+        self.model_name = model_name or getattr(embedder, "model", type(embedder).__name__)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, keys):
+        found = {}
+        # 📌 SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    # ✅ 문서 목록 임베딩 → (문서 수, 차원) float32 배열
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [embedding_key(self.model_name, text) for text in texts]
+
+        with self._lock:
+            found = self._lookup(list(set(keys)))
+
+            # 📌 캐시에 없는 텍스트만 한 번의 배치 호출로 임베딩
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in found and key not in missing:
+                    missing[key] = text
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            METRICS.inc("embedding_cache_hits", len(texts) - len(missing))
+            METRICS.inc("embedding_cache_misses", len(missing))
+
+            if missing:
+                vectors = self.embedder.embed_documents(list(missing.values()))
+                rows = []
+                for key, vector in zip(missing, vectors):
+                    vector = np.asarray(vector, dtype=np.float32)
+                    found[key] = vector
+                    rows.append((key, self.model_name, vector.shape[0], vector.tobytes()))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.commit()
+
+        return np.vstack([found[key] for key in keys])
+
+    def embed_programs(self, programs):
+        return self.embed_documents([program_text(program) for program in programs])
+
+    # ✅ 질의 임베딩은 매번 달라지므로 캐시하지 않고 그대로 전달
+    def embed_query(self, text):
+        with METRICS.span("embed_query"):
+            return np.asarray(self.embedder.embed_query(text), dtype=np.float32)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import uuid
+
+import numpy as np
+
+from semantic_search import normalize_rows
+
+DTYPES = ("float32", "float16", "int8")
+# 📌 float16 / int8 는 BLAS 를 못 쓰므로 이 행 수만큼씩 float32 버퍼에 풀어 가며 계산
+#    (버퍼가 CPU 캐시에 들어가는 크기일 때 가장 빠름, 512 x 1536 float32 = 3MB)
+BLOCK_ROWS = 512
+
+
+# 📌 읽을 때 다른 버전을 가리키는 파일을 잠깐 볼 수 있어서(쓰기와 겹친 경우) 다시 읽어 보는 횟수
+OPEN_RETRIES = 3
+
+
+def _sidecar_path(path):
+    return f"{path}.ids.json"
+
+
+def _scales_path(path):
+    return f"{path}.scales.npy"
+
+
+# 📌 버전별 행렬 / scale 파일 (sidecar 가 가리키는 버전만 유효, 버전이 없는 예전 형식은 path 그대로)
+def _matrix_path(path, version):
+    return f"{path}.{version}.npy" if version else path
+
+
+def _version_scales_path(path, version):
+    return f"{path}.{version}.scales.npy" if version else _scales_path(path)
+
+
+def _read_sidecar(path):
+    try:
+        with open(_sidecar_path(path), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+# ✅ 행마다 scale 을 따로 두는 int8 양자화 (원래 값 ≈ codes * scales[:, None])
+def quantize_int8(matrix):
+    scales = np.abs(matrix).max(axis=1) / 127.0 if matrix.shape[0] else np.zeros(0, np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.round(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+# ✅ 정규화된 임베딩 행렬 → 버전별 .npy 파일 + 그 버전을 가리키는 id 표(.ids.json)
+#    - float16: 절반 크기, int8: 행마다 scale 을 따로 저장하는 1/4 크기 (코사인 점수 오차 ~1e-2)
+#    - 행렬 / scale 은 매번 새 버전 이름으로 쓰고, 마지막에 id 표 하나만 os.replace 로 바꾼다.
+#      → 여는 워커는 항상 같은 버전의 행렬 / scale / id 표를 보고, 쓰는 도중 파일이 섞이지 않는다.
+#    - 바꾼 뒤 이전 버전 파일은 지운다 (이미 mmap 으로 연 워커는 POSIX 에서는 계속 읽을 수 있다).
+def write_embedding_store(path, ids, matrix, dtype="float32", model_name=None):
+    if dtype not in DTYPES:
+        raise ValueError(f"지원하지 않는 dtype: {dtype} ({', '.join(DTYPES)})")
+    matrix = normalize_rows(matrix) if len(ids) else np.zeros((0, 0), np.float32)
+    scales = None
+    if dtype == "int8":
+        stored, scales = quantize_int8(matrix)
+    else:
+        stored = matrix.astype(dtype)
+
+    previous = _read_sidecar(path)
+    version = uuid.uuid4().hex[:12]
+    np.save(_matrix_path(path, version), stored)
+    if scales is not None:
+        np.save(_version_scales_path(path, version), scales)
+
+    sidecar = {
+        "ids": list(ids), "dtype": dtype, "dim": int(stored.shape[1]) if stored.ndim == 2 else 0, "model": model_name,
+        "version": version,
+    }
+    tmp_path = f"{_sidecar_path(path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(sidecar, file, ensure_ascii=False)
+    os.replace(tmp_path, _sidecar_path(path))
+
+    if previous is not None:
+        old_version = previous.get("version")
+        for old_path in (_matrix_path(path, old_version), _version_scales_path(path, old_version)):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+    return path
+
+
+# ✅ 메모리 맵으로 여는 임베딩 저장소
+#    파일을 mmap 으로 열기 때문에 같은 파일을 여는 워커 프로세스들은 OS 페이지 캐시의 한 벌을 같이 쓰고,
+#    검색은 행렬을 프로세스 메모리로 복사하지 않고 매핑된 페이지를 바로 읽는다.
+#    id 표가 가리키는 버전의 파일만 열고, 행렬 모양이 id 표와 다르면 ValueError 로 거부한다.
+class MmapEmbeddingStore:
+    def __init__(self, path):
+        self.path = path
+        for attempt in range(OPEN_RETRIES):
+            sidecar = _read_sidecar(path)
+            if sidecar is None:
+                raise FileNotFoundError(_sidecar_path(path))
+            try:
+                self._open(sidecar)
+                break
+            except FileNotFoundError:
+                # 📌 id 표를 읽은 직후 새 버전으로 바뀌면서 이전 파일이 지워진 경우 → 새 id 표로 다시 연다
+                if attempt == OPEN_RETRIES - 1:
+                    raise
+        self.positions = {program_id: row for row, program_id in enumerate(self.ids)}
+
+    def _open(self, sidecar):
+        self.ids = sidecar["ids"]
+        self.dtype = sidecar["dtype"]
+        self.model_name = sidecar.get("model")
+        self.version = sidecar.get("version")
+        # 📌 np.asarray 는 memmap 을 같은 버퍼를 가리키는 일반 ndarray view 로 바꿀 뿐 복사하지 않는다
+        self.matrix = np.asarray(np.load(_matrix_path(self.path, self.version), mmap_mode="r"))
+        self.scales = (
+            np.asarray(np.load(_version_scales_path(self.path, self.version), mmap_mode="r")) if self.dtype == "int8" else None
+        )
+        expected = (len(self.ids), sidecar.get("dim", 0)) if self.ids else (0, 0)
+        if self.matrix.shape != expected or (self.scales is not None and self.scales.shape != (len(self.ids),)):
+            raise ValueError(f"임베딩 저장소 파일이 id 표와 맞지 않습니다: {self.path} (행렬 {self.matrix.shape}, id 표 {expected})")
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def covers(self, program_ids):
+        return all(program_id in self.positions for program_id in program_ids)
+
+    # 📌 주어진 프로그램 순서 → 저장소 행 번호 (저장소 순서와 같으면 None → 재배열 생략)
+    def rows_for(self, program_ids):
+        rows = np.fromiter((self.positions[program_id] for program_id in program_ids), dtype=np.int64, count=len(program_ids))
+        if rows.size == len(self.ids) and np.array_equal(rows, np.arange(rows.size)):
+            return None
+        return rows
+
+    # ✅ 질의 행렬(정규화된 float32, [질의 수, dim]) → 점수 행렬 [질의 수, 저장된 행 수]
+    def scores_batch(self, query_matrix):
+        query_matrix = np.ascontiguousarray(query_matrix, dtype=np.float32)
+        if self.dtype == "float32":
+            return query_matrix @ self.matrix.T
+        scores = np.empty((query_matrix.shape[0], len(self.ids)), dtype=np.float32)
+        buffer = np.empty((min(BLOCK_ROWS, len(self.ids)), self.matrix.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.ids), BLOCK_ROWS):
+            block = self.matrix[start:start + BLOCK_ROWS]
+            rows = block.shape[0]
+            np.copyto(buffer[:rows], block, casting="unsafe")
+            scores[:, start:start + rows] = query_matrix @ buffer[:rows].T
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    # 📌 행 몇 개만 점수 계산 (근사 검색 후보 다시 정렬용)
+    def scores_rows(self, query_vector, rows):
+        scores = self.matrix[rows].astype(np.float32) @ normalize_rows(query_vector)[0]
+        return scores * self.scales[rows] if self.scales is not None else scores
+
+    def scores(self, query_vector):
+        return self.scores_batch(normalize_rows(query_vector))[0]
+
+
+# ✅ 카탈로그 전체를 임베딩 캐시로 임베딩해서 저장소 파일 만들기
+def build_embedding_store(path, programs, embedding_cache, dtype="float32"):
+    matrix = embedding_cache.embed_programs(programs)
+    return write_embedding_store(path, [program.id for program in programs], matrix, dtype, embedding_cache.model_name)
+
+
+def main():
+    from catalog import DEFAULT_SOURCES, PROJECT_DIR, load_catalog
+    from embedding_cache import EmbeddingCache, HashingEmbedder
+
+    parser = argparse.ArgumentParser(description="워커 프로세스들이 같이 쓰는 메모리 맵 임베딩 저장소 만들기")
+    parser.add_argument("--output", default=os.path.join(PROJECT_DIR, "embeddings.npy"))
+    parser.add_argument("--dtype", choices=DTYPES, default="float32")
+    parser.add_argument("--sources", nargs="+", default=list(DEFAULT_SOURCES))
+    parser.add_argument("--offline", action="store_true", help="OpenAI 대신 로컬 해싱 임베딩 사용")
+    parser.add_argument("--model", default="text-embedding-3-small", help="OpenAI 임베딩 모델 (앱/서버와 같아야 함)")
+    args = parser.parse_args()
+
+    if args.offline:
+        embedder = HashingEmbedder()
+    else:
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAIEmbeddings
+
+        load_dotenv()
+        embedder = OpenAIEmbeddings(model=args.model)
+    embedding_cache = EmbeddingCache(embedder, model_name=getattr(embedder, "model", args.model))
+    programs = load_catalog(args.sources)
+    build_embedding_store(args.output, programs, embedding_cache, args.dtype)
+    store = MmapEmbeddingStore(args.output)
+    print(f"✅ {len(store)}개 임베딩 ({store.dtype}) → {args.output} ({store.nbytes / 1024 / 1024:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from embedding_store import DTYPES, MmapEmbeddingStore, write_embedding_store
+from relevance_benchmark import percentile
+from semantic_search import normalize_rows
+
+
+# 📌 현재 프로세스 메모리 (KB): RSS 와 PSS(공유 페이지를 나눠 가진 만큼만 센 값)
+#    /proc 이 없는 OS 에서는 최대 RSS 만 돌려준다.
+def memory_usage_kb():
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss", "Pss_Anon", "Pss_File"):
+                    usage[name.lower()] = int(value.split()[0])
+    except OSError:
+        import resource
+
+        usage["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
+
+
+def _top_k(scores, k):
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+# ✅ 워커 하나: 행렬을 준비하고 질의를 돌린 뒤, 모든 워커가 준비된 상태에서 메모리를 잰다
+def worker(mode, path, queries, k, barrier, results):
+    before = memory_usage_kb()
+    if mode == "in-process":
+        # 📌 기존 방식: 워커마다 행렬 전체를 자기 메모리에 올린다
+        matrix = normalize_rows(np.load(path))
+
+        def search(query):
+            return _top_k(matrix @ query, k)
+    else:
+        store = MmapEmbeddingStore(path)
+
+        def search(query):
+            return _top_k(store.scores(query), k)
+
+    latencies = []
+    hits = []
+    for query in queries:
+        start = time.perf_counter()
+        hits.append(search(query).tolist())
+        latencies.append((time.perf_counter() - start) * 1000)
+    barrier.wait()
+    results.put({"mode": mode, "before": before, "after": memory_usage_kb(), "latencies": latencies, "hits": hits})
+    barrier.wait()
+
+
+def run_workers(mode, path, queries, k, workers):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, path, queries, k, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+
+def summarize(reports):
+    latencies = [value for report in reports for value in report["latencies"]]
+    summary = {
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p95_ms": round(percentile(latencies, 95), 3),
+    }
+    for key in reports[0]["after"]:
+        growth = [(report["after"][key] - report["before"].get(key, 0)) / 1024 for report in reports]
+        summary[f"{key}_growth_mb_per_worker"] = round(sum(growth) / len(growth), 2)
+    if "pss" in reports[0]["after"]:
+        summary["total_pss_mb"] = round(sum(report["after"]["pss"] for report in reports) / 1024, 2)
+    return summary
+
+
+def recall(reports, reference):
+    hits = reports[0]["hits"]
+    overlaps = [len(set(a) & set(b)) / len(b) for a, b in zip(hits, reference)]
+    return round(sum(overlaps) / len(overlaps), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워커별 임베딩 행렬 복사본 vs 메모리 맵 공유 저장소 RSS / 검색 지연시간 비교")
+    parser.add_argument("--rows", type=int, default=20000, help="임베딩 개수 (가짜 무작위 벡터)")
+    parser.add_argument("--dim", type=int, default=1536, help="임베딩 차원 (text-embedding-3-small = 1536)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = normalize_rows(rng.standard_normal((args.rows, args.dim), dtype=np.float32))
+    queries = normalize_rows(rng.standard_normal((args.queries, args.dim), dtype=np.float32))
+    ids = [f"p{row}" for row in range(args.rows)]
+
+    report = {"rows": args.rows, "dim": args.dim, "workers": args.workers, "results": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_path = os.path.join(tmp, "matrix.npy")
+        np.save(baseline_path, matrix)
+        baseline = run_workers("in-process", baseline_path, queries, args.k, args.workers)
+        report["results"]["in-process"] = summarize(baseline)
+        reference = baseline[0]["hits"]
+
+        for dtype in DTYPES:
+            path = os.path.join(tmp, f"store_{dtype}.npy")
+            write_embedding_store(path, ids, matrix, dtype)
+            reports = run_workers("mmap", path, queries, args.k, args.workers)
+            result = summarize(reports)
+            result["file_mb"] = round(MmapEmbeddingStore(path).nbytes / 1024 / 1024, 2)
+            result[f"recall@{args.k}_vs_float32"] = recall(reports, reference)
+            report["results"][f"mmap-{dtype}"] = result
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
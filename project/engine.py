@@ -0,0 +1,164 @@
+import os
+
+from answer_cache import AnswerCache
+from catalog import DEFAULT_SOURCES, PROJECT_DIR
+from catalog_registry import CatalogRegistry
+from catalog_reloader import CatalogReloader
+from embedding_cache import EmbeddingCache, HashingEmbedder
+from embedding_store import MmapEmbeddingStore
+from index_artifact import load_artifact_snapshot
+from instrumentation import METRICS, record_token_usage
+from intent_router import LLM, TEMPLATE
+from prompt_context import build_rag_prompt
+from query_parser import month_label, parse_query, target_label
+
+RAG_INSTRUCTION = "위 정보를 바탕으로 사용자에게 적절한 답변을 만들어줘."
+NOT_FOUND_MESSAGE = "⚠️ 해당 조건에 맞는 비교과 프로그램을 찾을 수 없습니다. 다른 키워드로 검색해보세요!"
+
+
+# ✅ 질문에서 검색 필터 추출 (chatbot.py / test7.py 의 extract_filters 를 합친 것)
+#    반환값은 ProgramIndex.search_positions / SemanticSearchEngine.search 에 그대로 넘길 수 있는 dict
+#    분석은 query_parser 가 하므로 질문 하나에 여러 단계가 필요하면 parse_query 결과를 같이 쓴다.
+def extract_filters(query):
+    return parse_query(query).filters()
+
+
+# ✅ 검색 결과 템플릿 응답 (chatbot.py 의 generate_response 와 같은 형식)
+def render_template(filters, programs):
+    keywords = filters.get("keywords")
+    if keywords:
+        response_title = f"**📌 {' '.join(keywords)} 관련 프로그램입니다:**"
+    elif filters.get("target_filter"):
+        response_title = f"**📌 {target_label(filters['target_filter'])} 대상 추천 비교과 프로그램입니다:**"
+    elif filters.get("month_filter"):
+        response_title = f"**📌 {month_label(filters['month_filter'])} 진행되는 비교과 프로그램입니다:**"
+    else:
+        response_title = "**📌 추천 비교과 프로그램입니다:**"
+
+    if not programs:
+        return NOT_FOUND_MESSAGE
+    return response_title + "\n\n" + "\n\n".join(
+        f"🔹 **{p['제목']}**\n📌 설명: {p['설명']}\n📅 기간: {p['기간']}\n📍 장소: {p['장소']}\n🎁 혜택: {p['혜택']}\n🎯 신청대상: {p['신청대상']}\n📞 문의처: {p['문의처']}"
+        for p in programs
+    )
+
+
+# ✅ Streamlit 과 분리된 검색/응답 엔진
+#    카탈로그, 인덱스, 임베딩 행렬, 응답 캐시, 채팅 모델을 한 프로세스에서 한 번만 만들어 두고
+#    여러 UI 워커(HTTP API)가 같이 쓴다.
+#    카탈로그/인덱스는 CatalogReloader 의 snapshot 으로 들고 있어서 catalog.start() 로
+#    JSON 파일 감시를 켜면 재시작 없이 새 카탈로그로 바뀐다.
+#    artifact_path 에 최신 index_artifact 파일이 있으면 JSON 파싱 / 인덱스 생성 없이 바로 연다.
+#    embedding_store_path 를 주면 임베딩 행렬을 워커끼리 공유하는 메모리 맵 파일(embedding_store)에서 읽는다.
+#    ann_nprobe 를 주면 벡터 검색을 전체 비교 대신 IVF 근사 검색(ann_index)으로 한다 (큰 카탈로그용).
+#    shards({부서 이름: [JSON 파일, ...]})를 주면 부서마다 따로 인덱스를 만들고 질의를 샤드들에 동시에 보낸다
+#    (catalog_registry.CatalogRegistry, 한 부서 파일이 바뀌면 그 샤드만 다시 만든다).
+#    intent_router(intent_router.IntentRouter)를 주면 인덱스로 정확히 답할 수 있는 목록/필터 질문은
+#    채팅 모델이 있어도 LLM 을 부르지 않고 템플릿으로 답한다.
+class ChatbotEngine:
+    def __init__(self, sources=DEFAULT_SOURCES, embedder=None, chat_model=None, cache_dir=PROJECT_DIR,
+                 artifact_path=None, embedding_model=None, embedding_store_path=None, ann_nprobe=None,
+                 intent_router=None, shards=None):
+        embedder = embedder or HashingEmbedder()
+        self.embedding_cache = EmbeddingCache(
+            embedder, path=os.path.join(cache_dir, "embedding_cache.sqlite3"), model_name=embedding_model
+        )
+        embedding_store = MmapEmbeddingStore(embedding_store_path) if embedding_store_path else None
+        if shards:
+            # 📌 index_artifact 는 카탈로그 하나짜리 파일이라 샤드 구성에서는 JSON 으로 샤드마다 만든다
+            self.catalog = CatalogRegistry(
+                shards, self.embedding_cache, embedding_store=embedding_store, ann_nprobe=ann_nprobe
+            )
+        else:
+            # 📌 임베딩 저장소를 쓰면 행렬은 저장소 파일에서 읽으므로 artifact 대신 JSON 으로 snapshot 을 만든다
+            snapshot = None if embedding_store else load_artifact_snapshot(artifact_path, sources, self.embedding_cache, ann_nprobe)
+            self.catalog = CatalogReloader(
+                sources, self.embedding_cache, snapshot=snapshot, embedding_store=embedding_store, ann_nprobe=ann_nprobe
+            )
+        self.answer_cache = AnswerCache(
+            self._answer_cache_version(self.snapshot),
+            path=os.path.join(cache_dir, "answer_cache.sqlite3"),
+        )
+        self.catalog.add_listener(lambda snapshot: self.answer_cache.set_catalog_version(self._answer_cache_version(snapshot)))
+        self.chat_model = chat_model
+        self.intent_router = intent_router
+
+    # 📌 임베딩 모델이 바뀌면 저장된 질문 벡터와 차원이 달라지므로 모델 이름도 버전에 포함
+    def _answer_cache_version(self, snapshot):
+        return f"{snapshot.version}:{self.embedding_cache.model_name}"
+
+    # ✅ 현재 카탈로그 snapshot (질의 하나는 처음 잡은 snapshot 만 사용)
+    @property
+    def snapshot(self):
+        return self.catalog.snapshot
+
+    @property
+    def programs(self):
+        return self.snapshot.programs
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    # ✅ 질문 → [(프로그램, 점수), ...]
+    def search(self, query, k=5, filters=None, snapshot=None, query_vector=None):
+        if filters is None:
+            filters = extract_filters(query)
+        snapshot = snapshot or self.snapshot
+        if query_vector is not None and snapshot.semantic is not None:
+            return snapshot.retriever.search(query, k=k, filters=filters, query_vector=query_vector)
+        return snapshot.retriever.search(query, k=k, filters=filters)
+
+    # ✅ ParsedQuery → 응답 방식 (TEMPLATE / LLM, 분류기가 없으면 항상 LLM)
+    def route(self, parsed):
+        return LLM if self.intent_router is None else self.intent_router.route(parsed)
+
+    # ✅ 질문 → {"answer", "program_ids", "cached", "route"}
+    #    채팅 모델이 없거나 분류기가 템플릿으로 보낸 질문은 템플릿 응답, 나머지는 RAG 응답(응답 캐시 사용)
+    #    timings dict 를 넘기면 단계별 소요시간(ms)을 filter_ms / retrieve_ms / generate_ms 로 채운다.
+    #    단계별 시간과 캐시 적중 / 토큰 수는 instrumentation.METRICS 에도 남는다.
+    def answer(self, query, k=5, timings=None, profile=None):
+        with METRICS.trace(query, profile=profile):
+            return self._answer(query, k, {} if timings is None else timings)
+
+    def _answer(self, query, k, timings):
+        snapshot = self.snapshot
+        # 📌 질문은 한 번만 분석하고 검색 필터 / 템플릿 제목 / 프롬프트 필드 선택에 같이 쓴다
+        with METRICS.span("filter", timings):
+            parsed = parse_query(query)
+            filters = parsed.filters()
+            route = self.route(parsed)
+
+        with METRICS.span("retrieve", timings):
+            # 📌 질문 임베딩은 한 번만 하고 벡터 검색과 응답 캐시의 유사 질문 조회 / 저장에 같이 쓴다
+            query_vector = self.embedding_cache.embed_query(query) if snapshot.semantic is not None else None
+            programs = [
+                program for program, _ in self.search(query, k=k, filters=filters, snapshot=snapshot, query_vector=query_vector)
+            ]
+        program_ids = [program.id for program in programs]
+
+        with METRICS.span("generate", timings):
+            if self.chat_model is None or not programs or route == TEMPLATE:
+                if self.chat_model is not None and programs:
+                    METRICS.inc("llm_calls_avoided")
+                return {"answer": render_template(filters, programs), "program_ids": program_ids, "cached": False,
+                        "route": route}
+
+            cached = self.answer_cache.get(query, program_ids, query_vector)
+            if cached is not None:
+                return {"answer": cached, "program_ids": program_ids, "cached": True, "route": route}
+
+            prompt = build_rag_prompt(query, programs, RAG_INSTRUCTION, ranked=True, parsed=parsed)
+            with METRICS.span("llm"):
+                response = self.chat_model.invoke(prompt)
+            record_token_usage(response)
+            answer = response.content
+            # 📌 생성 도중 카탈로그가 바뀌었으면 새 버전 캐시에 이전 검색 결과 기반 응답을 넣지 않는다
+            if snapshot is self.snapshot:
+                self.answer_cache.put(query, program_ids, answer, query_vector)
+            return {"answer": answer, "program_ids": program_ids, "cached": False, "route": route}
+
+
+# ✅ 검색 결과를 JSON 으로 보낼 수 있는 dict 로 변환
+def serialize_results(results):
+    return [{"id": program.id, "score": score, "program": program.to_dict()} for program, score in results]
@@ -0,0 +1,58 @@
+from instrumentation import METRICS
+
+RRF_K = 60
+
+
+# ✅ 키워드 필터 검색기
+#    ProgramIndex 필터 결과를 제목에 키워드가 들어간 프로그램 → 나머지 순으로 돌려준다.
+#    필터가 하나도 없으면 순위를 매길 근거가 없으므로 빈 목록을 돌려준다.
+class KeywordRetriever:
+    def __init__(self, program_index):
+        self.index = program_index
+
+    def search(self, query, k=10, filters=None):
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        if not filters:
+            return []
+        keywords = filters.get("keywords") or []
+        ranked = []
+        for pid in self.index.search_positions(**filters):
+            title_hits = sum(1 for kw in keywords if kw in self.index.titles[pid])
+            ranked.append((-title_hits, pid))
+        ranked.sort()
+        return [(self.index.programs[pid], float(-hits)) for hits, pid in ranked[:k]]
+
+
+# ✅ Reciprocal Rank Fusion: 각 검색 결과의 순위 r 에 대해 1 / (RRF_K + r) 를 더한다
+#    같은 프로그램은 id 기준으로 한 번만 남는다.
+def reciprocal_rank_fusion(result_lists, limit=10, rrf_k=RRF_K):
+    scores = {}
+    programs = {}
+    for results in result_lists:
+        for rank, (program, _) in enumerate(results, start=1):
+            scores[program.id] = scores.get(program.id, 0.0) + 1.0 / (rrf_k + rank)
+            programs.setdefault(program.id, program)
+    fused = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return [(programs[program_id], score) for program_id, score in fused[:limit]]
+
+
+# ✅ 키워드(lexical) 검색 + 벡터 검색 결과를 RRF 로 합치는 하이브리드 검색기
+class HybridRetriever:
+    def __init__(self, lexical, semantic, candidates=20, rrf_k=RRF_K):
+        self.lexical = lexical
+        self.semantic = semantic
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    # ✅ 질의 → [(프로그램, 점수), ...] (중복 없이 최대 k개, 점수 내림차순)
+    #    query_vector 를 넘기면 질의를 다시 임베딩하지 않고 그 벡터로 벡터 검색한다 (응답 캐시와 같이 쓰는 경우)
+    def search(self, query, k=5, filters=None, query_vector=None):
+        depth = max(k, self.candidates)
+        with METRICS.span("keyword_search"):
+            lexical_results = self.lexical.search(query, k=depth, filters=filters)
+        with METRICS.span("vector_search"):
+            if query_vector is None:
+                semantic_results = self.semantic.search(query, k=depth, filters=filters)
+            else:
+                semantic_results = self.semantic.search_vector(query_vector, depth, filters)
+        return reciprocal_rank_fusion([lexical_results, semantic_results], limit=k, rrf_k=self.rrf_k)
@@ -0,0 +1,179 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from dataclasses import fields
+
+import numpy as np
+
+from bm25_index import ARRAY_NAMES, BM25Index
+from catalog import DEFAULT_SOURCES, PROJECT_DIR, Program
+from catalog_reloader import CatalogSnapshot, build_snapshot, source_mtimes
+from hybrid_retriever import HybridRetriever
+from program_index import ProgramIndex
+from semantic_search import SemanticSearchEngine
+
+logger = logging.getLogger(__name__)
+
+# ✅ 파일 구조: MAGIC(8) | 헤더 길이(uint64) | 헤더 JSON | 64바이트 정렬된 numpy 배열들
+#    헤더에는 카탈로그(프로그램 필드 값), BM25 어휘, 배열 위치(offset/dtype/shape)가 들어 있고
+#    배열은 mmap 위에서 np.frombuffer 로 복사 없이 바로 쓴다.
+MAGIC = b"JJUIDX01"
+ALIGNMENT = 64
+DEFAULT_ARTIFACT_PATH = os.path.join(PROJECT_DIR, "catalog_index.bin")
+PROGRAM_FIELDS = [f.name for f in fields(Program)]
+
+
+# 📌 파일 이름 기준 수정 시각 (폴더를 옮겨도 같은 파일이면 같은 값)
+def _source_stamp(sources):
+    return {os.path.basename(path): mtime for path, mtime in source_mtimes(sources).items()}
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# ✅ snapshot → 파일 하나 (임시 파일에 쓰고 os.replace 로 바꿔서 읽는 쪽이 반쯤 쓴 파일을 보지 않게)
+def write_artifact(path, snapshot, sources, embedding_model=None):
+    arrays = {f"bm25.{name}": getattr(snapshot.bm25_index, name) for name in ARRAY_NAMES}
+    # 📌 임베딩 저장소(embedding_store)를 쓰는 snapshot 은 행렬을 그 파일에 두고 여기에는 넣지 않는다
+    if snapshot.semantic is not None and snapshot.semantic.store is None and snapshot.semantic.matrix.size:
+        arrays["embeddings"] = snapshot.semantic.matrix
+
+    vocabulary = [None] * len(snapshot.bm25_index.vocabulary)
+    for token, term_id in snapshot.bm25_index.vocabulary.items():
+        vocabulary[term_id] = token
+    header = {
+        "catalog_version": snapshot.version,
+        "created_at": time.time(),
+        "sources": _source_stamp(sources),
+        "embedding_model": embedding_model if "embeddings" in arrays else None,
+        "programs": [[getattr(program, name) for name in PROGRAM_FIELDS] for program in snapshot.programs],
+        "bm25": {"k1": snapshot.bm25_index.k1, "b": snapshot.bm25_index.b, "vocabulary": vocabulary},
+        "arrays": {},
+    }
+
+    # 📌 헤더 길이가 배열 offset 에 따라 달라지므로 offset 은 헤더 끝과 무관하게 "데이터 영역" 기준으로 기록
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<Q", len(header_bytes)))
+        file.write(header_bytes)
+        for name, array in arrays.items():
+            file.seek(data_start + header["arrays"][name]["offset"])
+            file.write(array.tobytes())
+        file.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ✅ 읽기 전용으로 연 artifact (배열은 mmap 을 그대로 가리키는 numpy view)
+class IndexArtifact:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"인덱스 파일 형식이 아닙니다: {path}")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+        self._data_start = _aligned(header_start + header_length)
+
+    @property
+    def version(self):
+        return self.header["catalog_version"]
+
+    def array(self, name):
+        spec = self.header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=self._data_start + spec["offset"])
+        return array.reshape(spec["shape"])
+
+    def programs(self):
+        return [Program(*row) for row in self.header["programs"]]
+
+    # 📌 JSON 파일이 artifact 를 만든 뒤로 바뀌지 않았고, 임베딩 모델도 같은지
+    def is_fresh(self, sources, embedding_model=None):
+        if self.header["sources"] != _source_stamp(sources):
+            return False
+        return embedding_model is None or self.header["embedding_model"] == embedding_model
+
+    # ✅ artifact → CatalogSnapshot (ProgramIndex 만 새로 만들고 BM25 / 임베딩 행렬은 mmap 그대로)
+    def snapshot(self, sources, embedding_cache=None, ann_nprobe=None):
+        programs = self.programs()
+        program_index = ProgramIndex(programs)
+        bm25 = self.header["bm25"]
+        arrays = {name: self.array(f"bm25.{name}") for name in ARRAY_NAMES}
+        bm25_index = BM25Index.from_arrays(program_index, bm25["vocabulary"], arrays, k1=bm25["k1"], b=bm25["b"])
+        semantic = None
+        retriever = bm25_index
+        if embedding_cache is not None and "embeddings" in self.header["arrays"]:
+            semantic = SemanticSearchEngine(
+                program_index, embedding_cache, matrix=self.array("embeddings"), normalized=True, ann_nprobe=ann_nprobe
+            )
+            retriever = HybridRetriever(bm25_index, semantic)
+        return CatalogSnapshot(programs, self.version, program_index, bm25_index, semantic, retriever, source_mtimes(sources))
+
+
+# ✅ artifact 가 있고 최신이면 snapshot 을, 아니면 None (호출한 쪽은 JSON 에서 새로 만든다)
+def load_artifact_snapshot(path, sources=DEFAULT_SOURCES, embedding_cache=None, ann_nprobe=None):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        artifact = IndexArtifact(path)
+    except (OSError, ValueError) as e:
+        logger.warning("index artifact %s unusable: %s", path, e)
+        return None
+    model_name = embedding_cache.model_name if embedding_cache is not None else None
+    if not artifact.is_fresh(sources, model_name):
+        logger.warning("index artifact %s is stale, rebuilding from JSON", path)
+        return None
+    return artifact.snapshot(sources, embedding_cache, ann_nprobe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카탈로그 + BM25 인덱스 + 임베딩 행렬을 mmap 으로 바로 여는 파일 하나로 미리 만들기")
+    parser.add_argument("--output", default=DEFAULT_ARTIFACT_PATH)
+    parser.add_argument("--sources", nargs="+", default=list(DEFAULT_SOURCES))
+    parser.add_argument("--offline", action="store_true", help="OpenAI 대신 로컬 해싱 임베딩 사용")
+    parser.add_argument("--model", default="text-embedding-3-small", help="OpenAI 임베딩 모델 (앱/서버와 같아야 함)")
+    args = parser.parse_args()
+
+    from embedding_cache import EmbeddingCache, HashingEmbedder
+
+    if args.offline:
+        embedder = HashingEmbedder()
+    else:
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAIEmbeddings
+
+        load_dotenv()
+        embedder = OpenAIEmbeddings(model=args.model)
+    embedding_cache = EmbeddingCache(embedder, model_name=getattr(embedder, "model", args.model))
+
+    start = time.perf_counter()
+    snapshot = build_snapshot(args.sources, embedding_cache)
+    write_artifact(args.output, snapshot, args.sources, embedding_cache.model_name)
+    print(
+        f"✅ {len(snapshot.programs)}개 프로그램 → {args.output} "
+        f"({os.path.getsize(args.output) / 1024 / 1024:.2f} MB, {time.perf_counter() - start:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
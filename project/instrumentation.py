@@ -0,0 +1,300 @@
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 📌 지연시간 히스토그램 구간 (ms, Prometheus 의 le 값)
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+RECENT_TRACES = 50
+METRIC_PREFIX = "chatbot_"
+PROFILE_LINES = 30
+
+# 📌 지금 처리 중인 질문의 trace (asyncio 태스크 / asyncio.to_thread 로 넘어가도 같은 trace 를 가리킨다)
+_current_trace = contextvars.ContextVar("request_trace", default=None)
+# 📌 cProfile 은 한 번에 하나만 켤 수 있으므로 동시에 들어온 프로파일 요청은 건너뛴다
+_profile_lock = threading.Lock()
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def _format_le(bound):
+    return f"{bound:g}"
+
+
+# ✅ 누적 히스토그램 하나 (구간별 개수 + 합계 + 개수)
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        cumulative = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            cumulative.append([_format_le(bound), total])
+        return {"buckets": cumulative, "sum": round(self.sum, 3), "count": self.count}
+
+
+# ✅ 질문 하나의 단계별 기록
+#    stages: [(단계 이름, ms), ...] 실행된 순서대로 (같은 단계가 여러 번 나오면 여러 줄)
+#    counters: 이 질문에서 센 캐시 적중 / 토큰 수 등
+class RequestTrace:
+    def __init__(self, query):
+        self.query = query
+        self.started_at = time.time()
+        self.stages = []
+        self.counters = {}
+        self.total_ms = None
+        self.error = None
+        self.profile = None
+
+    def add_stage(self, name, ms):
+        self.stages.append((name, ms))
+
+    def stage_totals(self):
+        totals = {}
+        for name, ms in self.stages:
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    # 📌 표 한 줄 (사이드바 디버그 패널 / JSON 내보내기)
+    def to_row(self):
+        row = {"query": self.query, "total_ms": round(self.total_ms or 0.0, 1)}
+        row.update({f"{name}_ms": round(ms, 1) for name, ms in self.stage_totals().items()})
+        row.update(self.counters)
+        if self.error:
+            row["error"] = self.error
+        return row
+
+    def to_dict(self):
+        return {
+            "query": self.query,
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "stages": [[name, round(ms, 3)] for name, ms in self.stages],
+            "counters": self.counters,
+            "error": self.error,
+        }
+
+
+def _start_profiler(kind):
+    if kind == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _stop_profiler(profiler):
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return output.getvalue()
+    profiler.stop()
+    return profiler.output_text()
+
+
+# ✅ 프로세스 안에서 쓰는 가벼운 계측 저장소 (표준 라이브러리만 사용, 외부 서비스 없음)
+#    - span(단계): 소요시간을 단계별 히스토그램에 넣고, 처리 중인 질문의 trace 에도 남긴다.
+#    - inc(이름): 카운터 (캐시 적중, 토큰 수 등), 처리 중인 질문의 trace 에도 더한다.
+#    - trace(질문): 질문 하나를 감싸서 최근 N개 trace 로 보관 (profile=True 면 그 질문만 프로파일링).
+#    - to_prometheus() / to_json() / write(path): 로컬 파일이나 /metrics 로 내보내기
+#      export_path 를 주면 질문이 끝날 때마다 그 파일을 새로 쓴다 (.prom 이면 Prometheus 텍스트, 아니면 JSON).
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS, recent=RECENT_TRACES, export_path=None):
+        self.buckets = tuple(buckets)
+        self.export_path = export_path
+        self.counters = {}
+        self.histograms = {}
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        if not value:
+            return
+        with self._lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+        trace = _current_trace.get()
+        if trace is not None:
+            counter = name if not labels else f"{name}[{','.join(str(v) for _, v in _label_key(labels))}]"
+            trace.counters[counter] = trace.counters.get(counter, 0) + value
+
+    def observe(self, name, value, **labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    # 📌 이미 잰 단계 시간 기록 (첫 토큰까지 시간처럼 with 블록으로 감쌀 수 없는 경우)
+    def record_stage(self, stage, ms):
+        self.observe("stage_duration_ms", ms, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(stage, ms)
+
+    # ✅ 단계 하나의 소요시간 (timings dict 를 넘기면 "<단계>_ms" 키로도 채운다)
+    @contextmanager
+    def span(self, stage, timings=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.record_stage(stage, ms)
+            if timings is not None:
+                timings[f"{stage}_ms"] = ms
+
+    # ✅ 질문 하나 (이미 trace 안이면 바깥 trace 를 그대로 쓴다)
+    #    profile="cprofile" / "pyinstrument" 이면 이 질문만 프로파일링해서 trace.profile 에 텍스트로 남긴다.
+    #    (현재 스레드만 잡힌다: asyncio.to_thread / 스레드 풀에서 도는 부분은 보이지 않음)
+    @contextmanager
+    def trace(self, query, profile=None):
+        current = _current_trace.get()
+        if current is not None:
+            yield current
+            return
+        trace = RequestTrace(query)
+        token = _current_trace.set(trace)
+        profiler = None
+        if profile and _profile_lock.acquire(blocking=False):
+            try:
+                profiler = _start_profiler(profile)
+            except Exception as e:
+                _profile_lock.release()
+                trace.profile = f"profiler unavailable: {e}"
+        elif profile:
+            trace.profile = "profiler busy (다른 질문을 프로파일링하는 중)"
+        start = time.perf_counter()
+        try:
+            yield trace
+        except Exception as e:
+            trace.error = repr(e)
+            self.inc("request_errors")
+            raise
+        finally:
+            trace.total_ms = (time.perf_counter() - start) * 1000
+            if profiler is not None:
+                try:
+                    trace.profile = _stop_profiler(profiler)
+                finally:
+                    _profile_lock.release()
+            _current_trace.reset(token)
+            self.inc("requests")
+            self.observe("request_duration_ms", trace.total_ms)
+            with self._lock:
+                self.recent.append(trace)
+            if self.export_path:
+                self.write(self.export_path)
+
+    # ✅ 최근 n개 질문 trace (오래된 것부터)
+    def last(self, n=10):
+        with self._lock:
+            traces = list(self.recent)
+        return traces[-n:]
+
+    # ✅ Prometheus 텍스트 형식 (카운터는 _total, 히스토그램은 _bucket / _sum / _count)
+    def to_prometheus(self):
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, histogram.to_dict()) for key, histogram in self.histograms.items())
+        lines = []
+        seen = set()
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+        for (name, labels), data in histograms:
+            metric = f"{METRIC_PREFIX}{name}"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} histogram")
+                seen.add(metric)
+            for le, count in data["buckets"]:
+                le = "+Inf" if le == "inf" else le
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', le)])} {count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {data['sum']:g}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {data['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self, recent=10):
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self.counters.items()]
+            histograms = [
+                {"name": name, "labels": dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "recent": [trace.to_dict() for trace in self.last(recent)],
+        }
+
+    # ✅ 파일로 내보내기 (임시 파일에 쓰고 os.replace 로 바꿔서 수집기가 반쯤 쓴 파일을 읽지 않게)
+    def write(self, path):
+        if path.endswith(".prom"):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_json(), ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.recent.clear()
+
+
+# ✅ LLM 응답(또는 스트리밍 chunk)의 토큰 사용량을 카운터로 (usage_metadata 가 없으면 False)
+def record_token_usage(message, metrics=None):
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return False
+    metrics = metrics or METRICS
+    metrics.inc("llm_tokens", usage.get("input_tokens", 0), kind="input")
+    metrics.inc("llm_tokens", usage.get("output_tokens", 0), kind="output")
+    return True
+
+
+# ✅ 프로세스 전체에서 같이 쓰는 기본 저장소 (CHATBOT_METRICS_FILE 을 주면 질문마다 그 파일로 내보냄)
+METRICS = Metrics(export_path=os.getenv("CHATBOT_METRICS_FILE"))
@@ -0,0 +1,24 @@
+import threading
+
+
+# ✅ 처음 쓸 때 만들어지는 객체 (ChatOpenAI / OpenAIEmbeddings 등)
+#    factory 안에서 무거운 라이브러리를 import 하면 키워드 검색만 하는 동안에는 import 비용도 들지 않는다.
+#    속성 접근은 모두 실제 객체로 넘긴다. (감싼 객체의 속성과 겹치지 않도록 자체 메서드는 _ 로 시작)
+class LazyObject:
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
@@ -0,0 +1,375 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from html.parser import HTMLParser
+
+from catalog import PROJECT_DIR, Program, load_catalog, read_program_file
+from instrumentation import METRICS
+
+# ✅ 공지에서 만든 프로그램을 모아 두는 카탈로그 파일 (catalog_registry 의 "notices" 샤드)
+NOTICE_CATALOG_PATH = os.path.join(PROJECT_DIR, "notice_programs.json")
+NOTICE_EXTENSIONS = (".html", ".htm")
+
+# ✅ 공지 페이지 항목 이름 → 카탈로그 필드 이름 (공백을 뺀 이름으로 비교)
+NOTICE_LABELS = {
+    "제목": ["제목", "프로그램명", "행사명", "교육명", "특강명"],
+    "설명": ["설명", "내용", "개요", "프로그램소개", "교육내용", "주요내용", "행사내용"],
+    "신청기간": ["신청기간", "접수기간", "모집기간", "신청일정"],
+    "기간": ["기간", "운영기간", "교육기간", "행사기간", "일시", "교육일시", "운영일시", "행사일시", "일정"],
+    "장소": ["장소", "교육장소", "운영장소", "행사장소"],
+    "혜택": ["혜택", "특전", "포인트", "인센티브"],
+    "신청대상": ["대상", "신청대상", "모집대상", "참여대상", "교육대상"],
+    "문의처": ["문의", "문의처", "담당", "연락처"],
+    "운영시간": ["운영시간", "시간", "교육시간"],
+    "강사": ["강사", "연사"],
+    "신청방법": ["신청방법", "접수방법"],
+    # 📌 게시일은 연도가 빠진 날짜("2. 21.(금)")의 연도를 채우는 데만 쓰고 카탈로그에는 넣지 않는다
+    "작성일": ["작성일", "등록일", "게시일"],
+}
+LABEL_FIELDS = {label: name for name, labels in NOTICE_LABELS.items() for label in labels}
+PERIOD_FIELDS = ("신청기간", "기간")
+CATALOG_FIELDS = [name for name in NOTICE_LABELS if name != "작성일"]
+
+# 📌 "□ 일시 : ...", "1. 장소: ...", "- 대상 : ..." 처럼 글머리 + 항목 이름 + 콜론으로 된 본문 줄
+LABEL_LINE_PATTERN = re.compile(r"^(?:[^\w]|\d+[.)])*\s*(\w[\w ]{0,11}?)\s*[:：]\s*(.+)$")
+# 📌 "2025.01.24", "2025-01-24", "2025. 1. 24.(금)", "2025년 1월 24일", 연도를 생략한 "2. 21."
+NOTICE_DATE_PATTERN = re.compile(r"(?:(\d{4})\s*[.\-/년]\s*)?(\d{1,2})\s*[.\-/월]\s*(\d{1,2})(?!\d)\s*일?")
+TIME_PATTERN = re.compile(r"\d{1,2}:\d{2}")
+CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+TITLE_SUFFIX_PATTERN = re.compile(r"\s+[|:\-]\s+.*$")
+TITLE_CLASS_WORDS = ("title", "subject", "tit")
+HEADINGS = ("h1", "h2", "h3")
+BLOCK_TAGS = {
+    "p", "div", "li", "br", "tr", "td", "th", "dt", "dd", "table", "ul", "ol", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+}
+SKIP_TAGS = {"script", "style", "noscript"}
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _label_field(label):
+    return LABEL_FIELDS.get(re.sub(r"\s+", "", label))
+
+
+# ✅ 공지 페이지 HTML → 제목 후보 / 표·정의 목록의 (항목, 값) / 본문 줄
+#    표준 라이브러리 html.parser 만 사용 (bs4 없이, 프로세스마다 가볍게 돈다)
+class NoticePageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.titles = {}
+        self.pairs = []
+        self.lines = []
+        self._skip = 0
+        self._line = []
+        self._row = None
+        self._cell = None
+        self._term = None
+        self._capture = None
+
+    def _flush(self):
+        line = _clean("".join(self._line))
+        if line:
+            self.lines.append(line)
+        self._line = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag == "tr":
+            self._row = []
+        elif tag in ("th", "td", "dt", "dd"):
+            self._cell = (tag, [])
+        # 📌 제목은 class 에 title/subject 가 들어간 태그 > h1~h3 > <title> 순으로 고른다
+        if self._capture is None:
+            css = (dict(attrs).get("class") or "").lower()
+            if any(word in css for word in TITLE_CLASS_WORDS):
+                self._capture = ("class", tag, 1, [])
+            elif tag in HEADINGS or tag == "title":
+                self._capture = (tag, tag, 1, [])
+        elif tag == self._capture[1]:
+            kind, name, depth, parts = self._capture
+            self._capture = (kind, name, depth + 1, parts)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._capture is not None and tag == self._capture[1]:
+            kind, name, depth, parts = self._capture
+            if depth > 1:
+                self._capture = (kind, name, depth - 1, parts)
+            else:
+                self.titles.setdefault(kind, _clean("".join(parts)))
+                self._capture = None
+        if self._cell is not None and tag == self._cell[0]:
+            cell_tag, parts = self._cell
+            text = _clean("".join(parts))
+            self._cell = None
+            if cell_tag == "dt":
+                self._term = text
+            elif cell_tag == "dd":
+                if self._term:
+                    self.pairs.append((self._term, text))
+                self._term = None
+            elif self._row is not None:
+                self._row.append((cell_tag, text))
+        if tag == "tr" and self._row is not None:
+            self._add_row(self._row)
+            self._row = None
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    # 📌 <th>항목</th><td>값</td> 이 한 줄에 여러 쌍 있을 수 있고, th 없이 td 두 칸짜리 표도 있다
+    def _add_row(self, cells):
+        if len(cells) == 2 and cells[0][0] == "td":
+            self.pairs.append((cells[0][1], cells[1][1]))
+            return
+        for (tag, label), (next_tag, value) in zip(cells, cells[1:]):
+            if tag == "th" and next_tag == "td":
+                self.pairs.append((label, value))
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self._line.append(data)
+        if self._cell is not None:
+            self._cell[1].append(data)
+        if self._capture is not None:
+            self._capture[3].append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+# ✅ 공지 날짜 표기 → "2025.01.24" / "2025.01.24 ~ 2025.02.21" (programs.json 과 같은 형식)
+#    연도가 없는 날짜는 앞 날짜(없으면 default_year)의 연도를 쓰고, 앞 날짜보다 이르면 다음 해로 본다.
+#    날짜를 하나도 못 읽으면 공백만 정리한 원문을 그대로 돌려준다.
+def normalize_period(text, default_year=None):
+    days = []
+    for match in NOTICE_DATE_PATTERN.finditer(text or ""):
+        year, month, day = match.groups()
+        if year is None and not days and default_year is None:
+            continue
+        try:
+            value = date(int(year) if year else (days[-1].year if days else default_year), int(month), int(day))
+        except ValueError:
+            continue
+        if year is None and days and value < days[-1]:
+            value = value.replace(year=value.year + 1)
+        days.append(value)
+    if not days:
+        return _clean(text)
+    start, end = days[0].strftime("%Y.%m.%d"), days[-1].strftime("%Y.%m.%d")
+    return start if start == end else f"{start} ~ {end}"
+
+
+def _decode(raw):
+    match = CHARSET_PATTERN.search(raw[:4096])
+    encodings = [match.group(1).decode("ascii").lower()] if match else []
+    # 📌 학교 게시판은 EUC-KR 페이지가 아직 많아서 utf-8 로 안 읽히면 cp949 로 읽는다
+    encodings += ["utf-8", "cp949"]
+    for encoding in encodings:
+        try:
+            return raw.decode("cp949" if encoding in ("euc-kr", "ks_c_5601-1987") else encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return raw.decode("utf-8", errors="replace")
+
+
+# ✅ 공지 HTML 문자열 → programs.json 형식 dict
+#    필수 항목(제목, 신청기간 / 기간 중 하나)이 없으면 ValueError
+def parse_notice(page):
+    parser = NoticePageParser()
+    parser.feed(page)
+    parser.close()
+
+    fields = {}
+    # 📌 표 / 정의 목록 칸도 본문 줄로 잡히므로 설명 후보에서 빼기 위해 같이 모은다
+    labeled_lines = {text for pair in parser.pairs for text in pair}
+    for label, value in parser.pairs:
+        name = _label_field(label)
+        if name and value:
+            fields.setdefault(name, value)
+    for line in parser.lines:
+        match = LABEL_LINE_PATTERN.match(line)
+        name = _label_field(match.group(1)) if match else None
+        if name:
+            labeled_lines.add(line)
+            fields.setdefault(name, _clean(match.group(2)))
+
+    if "제목" not in fields:
+        title = parser.titles.get("class") or next((parser.titles[tag] for tag in HEADINGS if parser.titles.get(tag)), "")
+        if not title and parser.titles.get("title"):
+            title = TITLE_SUFFIX_PATTERN.sub("", parser.titles["title"])
+        if title:
+            fields["제목"] = title
+    if "제목" not in fields:
+        raise ValueError("no_title")
+    # 📌 설명 항목이 없으면 항목 줄도 아니고 제목이 들어 있지도 않은 첫 본문 문단
+    if "설명" not in fields:
+        description = next(
+            (line for line in parser.lines
+             if len(line) >= 15 and line not in labeled_lines and fields["제목"] not in line),
+            None,
+        )
+        if description:
+            fields["설명"] = description
+
+    posted = normalize_period(fields.get("작성일", ""))
+    default_year = int(posted[:4]) if posted[:4].isdigit() else None
+    for name in PERIOD_FIELDS:
+        if name in fields:
+            original = fields[name]
+            fields[name] = normalize_period(original, default_year)
+            # 📌 "2025.01.02 (목) 14:00~16:00" 의 시간은 날짜 정리 때 빠지므로 운영시간에 원문을 남긴다
+            if name == "기간" and TIME_PATTERN.search(original):
+                fields.setdefault("운영시간", original)
+    if not any(fields.get(name) for name in PERIOD_FIELDS):
+        raise ValueError("no_period")
+    return {name: _clean(fields[name]) for name in CATALOG_FIELDS if fields.get(name)}
+
+
+# ✅ 공지 파일 하나 → (경로, dict 또는 None, 오류 이름 또는 None)
+#    프로세스 풀 워커에서 실행되므로 예외 대신 결과로 돌려준다.
+def parse_notice_file(path):
+    try:
+        with open(path, "rb") as file:
+            raw = file.read()
+        return path, parse_notice(_decode(raw)), None
+    except ValueError as error:
+        return path, None, str(error)
+    except Exception as error:
+        return path, None, type(error).__name__
+
+
+def find_notice_files(directory):
+    paths = []
+    for root, _, names in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in names if name.lower().endswith(NOTICE_EXTENSIONS))
+    return sorted(paths)
+
+
+# ✅ 공지 파일들을 프로세스 풀로 나눠 파싱 (workers=1 이면 현재 프로세스에서)
+def parse_notice_files(paths, workers=None, chunksize=64):
+    if workers == 1 or len(paths) < chunksize:
+        return [parse_notice_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_notice_file, paths, chunksize=chunksize))
+
+
+# 📌 임시 파일에 쓰고 os.replace 로 바꿔서 CatalogReloader 가 반쯤 쓴 JSON 을 읽지 않게
+def write_notice_catalog(path, records):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"프로그램_정보": records}, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+# ✅ 저장된 공지 HTML 디렉터리 → 카탈로그 증분 반영
+#    1) 공지를 프로세스 풀로 파싱해 카탈로그 필드로 정리
+#    2) 기존 카탈로그(existing_sources + output) / 이번 실행 안에서 같은 id 인 프로그램은 건너뜀
+#    3) 새 프로그램만 output 파일 뒤에 붙여 쓰고 (CatalogReloader / CatalogRegistry 가 파일 변경을 보고
+#       그 샤드 인덱스만 다시 만든다) embedding_cache 가 있으면 새 프로그램만 미리 임베딩해 둔다.
+#    반환값은 처리량 / 오류 통계 dict
+def ingest_notices(directory, output=NOTICE_CATALOG_PATH, existing_sources=(), embedding_cache=None, workers=None,
+                   dry_run=False):
+    timings = {}
+    start = time.perf_counter()
+    paths = find_notice_files(directory)
+    with METRICS.span("notice_parse", timings):
+        results = parse_notice_files(paths, workers)
+
+    current = read_program_file(output) if os.path.exists(output) else []
+    known = {program.id for program in load_catalog([path for path in existing_sources if os.path.exists(path)])}
+    known.update(Program.from_dict(record).id for record in current)
+    added_ids = set()
+
+    errors = Counter()
+    duplicates = Counter()
+    added = []
+    for path, record, error in results:
+        if error is not None:
+            errors[error] += 1
+            continue
+        program = Program.from_dict(record, source=os.path.basename(output))
+        if program.id in known:
+            duplicates["catalog"] += 1
+        elif program.id in added_ids:
+            duplicates["notices"] += 1
+        else:
+            added_ids.add(program.id)
+            added.append(program)
+    METRICS.inc("notices_parsed", len(results) - sum(errors.values()))
+    METRICS.inc("notices_added", len(added))
+    METRICS.inc("notice_errors", sum(errors.values()))
+
+    if added and not dry_run:
+        with METRICS.span("notice_write", timings):
+            write_notice_catalog(output, current + [program.to_dict() for program in added])
+        if embedding_cache is not None:
+            with METRICS.span("notice_embed", timings):
+                embedding_cache.embed_programs(added)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "files": len(paths),
+        "parsed": len(results) - sum(errors.values()),
+        "added": len(added),
+        "duplicates": dict(duplicates),
+        "errors": dict(errors),
+        "error_rate": round(sum(errors.values()) / max(len(paths), 1), 4),
+        "notices_per_s": round(len(paths) / elapsed, 1) if elapsed > 0 else None,
+        "timings": {name: round(value, 1) for name, value in timings.items()} | {"total_ms": round(elapsed * 1000, 1)},
+        "output": None if dry_run else output,
+        "added_ids": [program.id for program in added],
+    }
+
+
+def main():
+    from catalog import DEFAULT_SOURCES
+    from embedding_cache import EmbeddingCache, HashingEmbedder
+
+    parser = argparse.ArgumentParser(description="저장된 공지 HTML 페이지 → 비교과 카탈로그 증분 반영 (오프라인)")
+    parser.add_argument("directory", help="공지 HTML 파일(.html / .htm)이 있는 디렉터리")
+    parser.add_argument("--output", default=NOTICE_CATALOG_PATH, help="새 프로그램을 붙여 쓸 카탈로그 JSON")
+    parser.add_argument("--existing", nargs="*", default=list(DEFAULT_SOURCES), help="중복 확인에 쓸 기존 카탈로그")
+    parser.add_argument("--workers", type=int, help="파싱 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--dry-run", action="store_true", help="파일 / 임베딩 캐시에 쓰지 않고 통계만")
+    parser.add_argument("--no-embed", action="store_true", help="새 프로그램 임베딩을 미리 캐시하지 않음")
+    parser.add_argument("--offline", action="store_true", help="OpenAI 대신 로컬 해싱 임베딩 사용")
+    parser.add_argument("--model", default="text-embedding-3-small", help="OpenAI 임베딩 모델 (앱/서버와 같아야 함)")
+    args = parser.parse_args()
+
+    embedding_cache = None
+    if not args.no_embed and not args.dry_run:
+        if args.offline:
+            embedder = HashingEmbedder()
+        else:
+            from dotenv import load_dotenv
+            from langchain_openai import OpenAIEmbeddings
+
+            load_dotenv()
+            embedder = OpenAIEmbeddings(model=args.model)
+        embedding_cache = EmbeddingCache(embedder, model_name=getattr(embedder, "model", args.model))
+
+    report = ingest_notices(
+        args.directory, args.output, args.existing, embedding_cache, args.workers, args.dry_run
+    )
+    report.pop("added_ids")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
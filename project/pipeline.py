@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+
+from engine import RAG_INSTRUCTION, render_template
+from hybrid_retriever import reciprocal_rank_fusion
+from instrumentation import METRICS, record_token_usage
+from intent_router import TEMPLATE
+from prompt_context import build_rag_prompt
+from query_parser import parse_query
+
+logger = logging.getLogger(__name__)
+
+
+# ✅ 동기/비동기 클라이언트를 같은 방식으로 호출
+#    (langchain 객체처럼 a<method> 가 있으면 그걸 쓰고, 없으면 스레드 풀에서 실행)
+async def _call(client, method, *args):
+    async_method = getattr(client, f"a{method}", None)
+    if async_method is not None:
+        return await async_method(*args)
+    return await asyncio.to_thread(getattr(client, method), *args)
+
+
+# ✅ 비동기 검색 + 응답 생성 파이프라인
+#    1) 질의 임베딩(네트워크)과 BM25 검색을 동시에 시작하고
+#    2) 임베딩이 끝나면 바로 벡터 검색 → 두 결과를 RRF 로 합친 뒤
+#    3) 곧바로 LLM 응답 생성을 시작한다.
+#    - 임베딩이 embed_timeout 안에 끝나지 않으면 BM25 결과만으로 진행
+#    - LLM 이 llm_timeout 안에 끝나지 않으면 템플릿 응답으로 대체
+#    (시간 초과된 스레드 호출은 백그라운드에서 끝날 때까지 돌지만 응답을 기다리지는 않는다)
+class AnswerPipeline:
+    def __init__(self, engine, embed_timeout=2.0, llm_timeout=15.0, candidates=20):
+        self.engine = engine
+        self.embed_timeout = embed_timeout
+        self.llm_timeout = llm_timeout
+        self.candidates = candidates
+
+    async def _vector_search(self, snapshot, query, depth, filters):
+        with METRICS.span("embed_query"):
+            query_vector = await _call(self.engine.embedding_cache.embedder, "embed_query", query)
+        with METRICS.span("vector_search"):
+            return query_vector, snapshot.semantic.search_vector(query_vector, depth, filters)
+
+    def _keyword_search(self, snapshot, query, depth, filters):
+        with METRICS.span("keyword_search"):
+            return snapshot.bm25_index.search(query, depth, filters)
+
+    # ✅ (프로그램 목록, 질문 벡터) - 임베딩이 시간 초과 / 실패했으면 질문 벡터는 None
+    async def retrieve(self, snapshot, query, k, filters, timings, fallbacks):
+        depth = max(k, self.candidates)
+        start = time.perf_counter()
+
+        keyword_task = asyncio.create_task(
+            asyncio.to_thread(self._keyword_search, snapshot, query, depth, filters)
+        )
+        vector_task = asyncio.create_task(
+            asyncio.wait_for(self._vector_search(snapshot, query, depth, filters), self.embed_timeout)
+        )
+        keyword_results, vector_results = await asyncio.gather(keyword_task, vector_task, return_exceptions=True)
+        timings["retrieve_ms"] = (time.perf_counter() - start) * 1000
+        METRICS.record_stage("retrieve", timings["retrieve_ms"])
+
+        if isinstance(keyword_results, BaseException):
+            logger.warning("keyword search failed: %s", keyword_results)
+            fallbacks.append("keyword_error")
+            METRICS.inc("fallbacks", reason="keyword_error")
+            keyword_results = []
+        query_vector = None
+        if isinstance(vector_results, asyncio.TimeoutError):
+            fallbacks.append("embed_timeout")
+            METRICS.inc("fallbacks", reason="embed_timeout")
+            vector_results = []
+        elif isinstance(vector_results, BaseException):
+            logger.warning("vector search failed: %s", vector_results)
+            fallbacks.append("embed_error")
+            METRICS.inc("fallbacks", reason="embed_error")
+            vector_results = []
+        else:
+            query_vector, vector_results = vector_results
+        fused = reciprocal_rank_fusion([keyword_results, vector_results], limit=k, rrf_k=snapshot.retriever.rrf_k)
+        return [program for program, _ in fused], query_vector
+
+    async def generate(self, snapshot, query, programs, parsed, route, query_vector, timings, fallbacks):
+        filters = parsed.filters()
+        chat_model = self.engine.chat_model
+        if chat_model is None or not programs or route == TEMPLATE:
+            if chat_model is not None and programs:
+                METRICS.inc("llm_calls_avoided")
+            return render_template(filters, programs), False
+
+        program_ids = [program.id for program in programs]
+        # 📌 응답 캐시는 검색 때 만든 질문 벡터로 유사 질문을 찾는다 (다시 임베딩하지 않음).
+        #    임베딩이 시간 초과됐으면 질문 벡터가 없으므로 정확히 같은 질문만 찾고, 저장할 때도 벡터 없이 저장한다.
+        cached = await asyncio.to_thread(self.engine.answer_cache.get, query, program_ids, query_vector)
+        if cached is not None:
+            return cached, True
+
+        prompt = build_rag_prompt(query, programs, RAG_INSTRUCTION, ranked=True, parsed=parsed)
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(_call(chat_model, "invoke", prompt), self.llm_timeout)
+        except asyncio.TimeoutError:
+            fallbacks.append("llm_timeout")
+            METRICS.inc("fallbacks", reason="llm_timeout")
+            return render_template(filters, programs), False
+        finally:
+            timings["generate_ms"] = (time.perf_counter() - start) * 1000
+            METRICS.record_stage("llm", timings["generate_ms"])
+        record_token_usage(response)
+        # 📌 생성 도중 카탈로그가 바뀌었으면 새 버전 캐시에 이전 검색 결과 기반 응답을 넣지 않는다
+        if snapshot is self.engine.snapshot:
+            await asyncio.to_thread(self.engine.answer_cache.put, query, program_ids, response.content, query_vector)
+        return response.content, False
+
+    # ✅ 질문 → {"answer", "program_ids", "cached", "route", "fallbacks", "timings"}
+    #    profile="cprofile" 이면 이 질문의 프로파일 텍스트를 "profile" 에 같이 돌려준다.
+    async def run(self, query, k=5, profile=None):
+        timings = {}
+        fallbacks = []
+        start = time.perf_counter()
+        with METRICS.trace(query, profile=profile) as trace:
+            snapshot = self.engine.snapshot
+            with METRICS.span("filter", timings):
+                parsed = parse_query(query)
+                route = self.engine.route(parsed)
+            programs, query_vector = await self.retrieve(snapshot, query, k, parsed.filters(), timings, fallbacks)
+            answer, cached = await self.generate(
+                snapshot, query, programs, parsed, route, query_vector, timings, fallbacks
+            )
+            timings["total_ms"] = (time.perf_counter() - start) * 1000
+        result = {
+            "answer": answer,
+            "program_ids": [program.id for program in programs],
+            "cached": cached,
+            "route": route,
+            "fallbacks": fallbacks,
+            "timings": {name: round(value, 3) for name, value in timings.items()},
+        }
+        if profile:
+            result["profile"] = trace.profile
+        return result
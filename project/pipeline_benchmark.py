@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from embedding_cache import HashingEmbedder
+from engine import ChatbotEngine
+from intent_router import TEMPLATE, load_intent_router
+from pipeline import AnswerPipeline
+from relevance_benchmark import BENCHMARK_CASES, percentile
+from streaming import FakeChunk
+
+
+# ✅ 네트워크 지연을 흉내 내는 임베딩 모델 (질의 임베딩에만 delay 초 대기)
+#    카탈로그 임베딩(embed_documents)은 인덱스 준비 단계라 지연 없이 바로 돌려준다.
+class SlowEmbedder:
+    def __init__(self, delay=0.2, dim=256):
+        self.base = HashingEmbedder(dim)
+        self.model = self.base.model
+        self.delay = delay
+
+    def embed_documents(self, texts):
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return self.base.embed_query(text)
+
+
+# ✅ 응답까지 delay 초가 걸리는 가짜 채팅 모델
+class SlowChatModel:
+    def __init__(self, delay=1.0):
+        self.delay = delay
+
+    def invoke(self, prompt):
+        time.sleep(self.delay)
+        return FakeChunk(f"(가짜 응답) 프롬프트 {len(prompt)}자")
+
+
+# ✅ 키워드 검색에 지연을 넣는 래퍼 (키워드 검색이 원격 검색 엔진일 때를 가정)
+class SlowKeywordSearch:
+    def __init__(self, index, delay=0.0):
+        self.index = index
+        self.delay = delay
+
+    def search(self, query, k=10, filters=None):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.index.search(query, k=k, filters=filters)
+
+
+def build_engine(args, cache_dir, intent_router=None):
+    engine = ChatbotEngine(
+        embedder=SlowEmbedder(args.embed_delay),
+        chat_model=SlowChatModel(args.llm_delay),
+        cache_dir=cache_dir,
+        intent_router=intent_router,
+    )
+    snapshot = engine.snapshot
+    snapshot.bm25_index = SlowKeywordSearch(snapshot.bm25_index, args.keyword_delay)
+    snapshot.retriever.lexical = snapshot.bm25_index
+    return engine
+
+
+def summarize(latencies, fallbacks=None):
+    report = {
+        "mean_ms": round(sum(latencies) / len(latencies), 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "max_ms": round(max(latencies), 1),
+    }
+    if fallbacks is not None:
+        report["fallbacks"] = fallbacks
+    return report
+
+
+# 📌 기존 동기 경로: 임베딩 → 키워드 검색 → 벡터 검색 → 응답 생성 순서대로
+def run_sequential(engine, queries):
+    latencies = []
+    routed = 0
+    for query in queries:
+        start = time.perf_counter()
+        result = engine.answer(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        routed += result["route"] == TEMPLATE
+    report = summarize(latencies)
+    if engine.intent_router is not None:
+        report["llm_calls_avoided_share"] = round(routed / len(queries), 3)
+    return report
+
+
+# 📌 비동기 파이프라인: 임베딩 ∥ 키워드 검색, 단계별 시간 제한
+async def run_pipeline(pipeline, queries):
+    latencies = []
+    fallbacks = {}
+    for query in queries:
+        start = time.perf_counter()
+        result = await pipeline.run(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        for name in result["fallbacks"]:
+            fallbacks[name] = fallbacks.get(name, 0) + 1
+    return summarize(latencies, fallbacks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="순차 처리 vs 비동기 파이프라인 응답 지연시간 벤치마크 (가짜 클라이언트)")
+    parser.add_argument("--embed-delay", type=float, default=0.2, help="질의 임베딩 지연(초)")
+    parser.add_argument("--keyword-delay", type=float, default=0.05, help="키워드 검색 지연(초)")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="응답 생성 지연(초)")
+    parser.add_argument("--embed-timeout", type=float, default=2.0)
+    parser.add_argument("--llm-timeout", type=float, default=15.0)
+    parser.add_argument("--queries", type=int, default=len(BENCHMARK_CASES), help="사용할 질문 수")
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    queries = [case["query"] for case in BENCHMARK_CASES[:args.queries]]
+    # 📌 응답 캐시가 서로 영향을 주지 않도록 방식마다 새 엔진(새 캐시 폴더)을 쓴다
+    with tempfile.TemporaryDirectory() as cache_dir:
+        sequential = run_sequential(build_engine(args, cache_dir), queries)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = build_engine(args, cache_dir)
+        pipeline = AnswerPipeline(engine, embed_timeout=args.embed_timeout, llm_timeout=args.llm_timeout)
+        concurrent = asyncio.run(run_pipeline(pipeline, queries))
+    # 📌 의도 분류기로 목록/필터 질문은 LLM 없이 템플릿 응답
+    with tempfile.TemporaryDirectory() as cache_dir:
+        routed = run_sequential(build_engine(args, cache_dir, load_intent_router()), queries)
+
+    report = {
+        "settings": {
+            "embed_delay": args.embed_delay,
+            "keyword_delay": args.keyword_delay,
+            "llm_delay": args.llm_delay,
+            "embed_timeout": args.embed_timeout,
+            "llm_timeout": args.llm_timeout,
+            "queries": len(queries),
+        },
+        "sequential": sequential,
+        "pipeline": concurrent,
+        "sequential_intent_router": routed,
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
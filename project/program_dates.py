@@ -0,0 +1,147 @@
+import calendar
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+DATE_PATTERN = re.compile(r"(\d{4})\s*[.\-/]\s*(\d{1,2})\s*[.\-/]\s*(\d{1,2})")
+# 📌 "2025학년도" 의 "5학년" 을 학년으로 읽지 않도록 앞 숫자 / 뒤 "도" 를 막는다
+GRADE_RANGE_PATTERN = re.compile(r"(?<!\d)(\d)\s*~\s*(\d)\s*학년(?!도)")
+GRADE_LIST_PATTERN = re.compile(r"(?<!\d)(\d(?:\s*,\s*\d)+)\s*학년(?!도)")
+GRADE_SINGLE_PATTERN = re.compile(r"(?<!\d)(\d)\s*학년(?!도)")
+
+
+# ✅ "2025.02.03" → date(2025, 2, 3) (형식이 맞지 않으면 None)
+def parse_date(text):
+    match = DATE_PATTERN.search(text or "")
+    if not match:
+        return None
+    year, month, day = (int(g) for g in match.groups())
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+# ✅ "2025.02.03 ~ 2025.02.28" → (시작일, 종료일), 단일 날짜는 (d, d)
+def parse_period(text):
+    dates = []
+    for match in DATE_PATTERN.finditer(text or ""):
+        year, month, day = (int(g) for g in match.groups())
+        try:
+            dates.append(date(year, month, day))
+        except ValueError:
+            continue
+    if not dates:
+        return None
+    start, end = dates[0], dates[-1]
+    if end < start:
+        start, end = end, start
+    return start, end
+
+
+# ✅ "3~4학년", "3,4학년", "2학년" → {3, 4} / {3, 4} / {2}
+def parse_grades(text):
+    text = text or ""
+    grades = set()
+    for low, high in GRADE_RANGE_PATTERN.findall(text):
+        low, high = int(low), int(high)
+        grades.update(range(min(low, high), max(low, high) + 1))
+    for group in GRADE_LIST_PATTERN.findall(text):
+        grades.update(int(g) for g in re.findall(r"\d", group))
+    for grade in GRADE_SINGLE_PATTERN.findall(text):
+        grades.add(int(grade))
+    return frozenset(grades)
+
+
+# ✅ 특정 연/월의 (1일, 말일)
+def month_bounds(year, month):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+# ✅ 기준일이 속한 주의 (월요일, 일요일)
+def week_bounds(today):
+    start = today - timedelta(days=today.weekday())
+    return start, start + timedelta(days=6)
+
+
+# ✅ (시작일, 종료일) 구간 인덱스 (중심 구간 트리)
+#    - 노드마다 중심 날짜 하나와 그 날짜를 포함하는 구간들을 시작일 순 / 종료일 역순으로 정렬해 두고,
+#      중심보다 완전히 앞선 구간은 왼쪽, 완전히 뒤인 구간은 오른쪽 자식으로 보낸다.
+#    - 겹침 조회는 지나가는 노드마다 bisect 한 번으로 겹치는 구간 조각만 잘라 담으므로
+#      O(log n + 결과 수)이다 (카탈로그 전체를 잘라 교집합하지 않는다).
+#    - 종료일 정렬 목록은 마감 임박 조회(ending_between)에 그대로 쓴다.
+class IntervalIndex:
+    def __init__(self, intervals):
+        # intervals: {프로그램 번호: (시작일, 종료일)}
+        by_end = sorted((end.toordinal(), pid) for pid, (_, end) in intervals.items())
+        self.end_keys = [key for key, _ in by_end]
+        self.end_ids = [pid for _, pid in by_end]
+        self.first_start = min((start.toordinal() for start, _ in intervals.values()), default=None)
+        # 📌 노드: (중심, 시작일 목록, 번호(시작일 순), -종료일 목록, 번호(종료일 역순), 왼쪽, 오른쪽) / 없는 자식은 -1
+        self._nodes = []
+        self._root = self._build(sorted((start.toordinal(), end.toordinal(), pid) for pid, (start, end) in intervals.items()))
+
+    # 📌 items 는 시작일 순 정렬 → 가운데 구간의 시작일을 중심으로 (그 구간이 중심을 포함하므로 노드가 비지 않는다)
+    def _build(self, items):
+        if not items:
+            return -1
+        center = items[len(items) // 2][0]
+        left, here, right = [], [], []
+        for item in items:
+            if item[1] < center:
+                left.append(item)
+            elif item[0] > center:
+                right.append(item)
+            else:
+                here.append(item)
+        by_end = sorted(here, key=lambda item: -item[1])
+        node = len(self._nodes)
+        self._nodes.append(None)
+        self._nodes[node] = (
+            center,
+            [start for start, _, _ in here], [pid for _, _, pid in here],
+            [-end for _, end, _ in by_end], [pid for _, _, pid in by_end],
+            self._build(left), self._build(right),
+        )
+        return node
+
+    def __len__(self):
+        return len(self.end_keys)
+
+    # 📌 [start, end] 구간과 하루라도 겹치는 프로그램 번호
+    def overlapping(self, start, end):
+        start, end = start.toordinal(), end.toordinal()
+        matched = set()
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            center, start_keys, start_ids, end_keys, end_ids, left, right = self._nodes[node]
+            if end < center:
+                # 📌 노드 구간은 모두 중심(> end)까지 이어지므로 시작일이 end 이하인 것만 겹친다
+                matched.update(start_ids[:bisect_right(start_keys, end)])
+                stack.append(left)
+            elif start > center:
+                # 📌 노드 구간은 모두 중심(< start) 전에 시작하므로 종료일이 start 이상인 것만 겹친다
+                matched.update(end_ids[:bisect_right(end_keys, -start)])
+                stack.append(right)
+            else:
+                matched.update(start_ids)
+                stack.append(left)
+                stack.append(right)
+        return matched
+
+    # 📌 종료일이 [start, end] 안에 있는 프로그램 번호 (마감 임박 조회용)
+    def ending_between(self, start, end):
+        low = bisect_left(self.end_keys, start.toordinal())
+        high = bisect_right(self.end_keys, end.toordinal())
+        return set(self.end_ids[low:high])
+
+    # 📌 인덱스에 포함된 연도 범위 (연도 없는 "2월" 질의용)
+    def years(self):
+        if self.first_start is None:
+            return range(0)
+        first = date.fromordinal(self.first_start).year
+        last = date.fromordinal(self.end_keys[-1]).year
+        return range(first, last + 1)
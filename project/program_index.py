@@ -0,0 +1,165 @@
+from datetime import date
+
+from program_dates import IntervalIndex, month_bounds, parse_grades, parse_period, week_bounds
+
+# ✅ 챗봇 스크립트들이 사용하는 키워드 어휘 (chatbot.py/test.py/test6.py + test5.py/test7.py 확장분)
+DEFAULT_KEYWORDS = [
+    "점프업", "점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램",
+    "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강", "취업",
+]
+
+# ✅ 학년 필터로 들어올 수 있는 값 ("1학년" ~ "9학년", "졸업 예정자")
+TARGET_TOKENS = [f"{n}학년" for n in range(1, 10)] + ["졸업 예정자"]
+
+
+# 📌 month_filter / target_filter 는 값 하나("3", "3학년") 또는 여러 개(["3", "4"])를 받는다 (여러 개면 합집합)
+def filter_values(value):
+    return [value] if isinstance(value, (str, int)) else list(value)
+
+
+# ✅ 프로그램 목록을 한 번만 훑어서 만드는 검색 인덱스
+#    - 질의 때마다 program_data 전체를 다시 lower() 하지 않도록 필드를 미리 소문자로 저장
+#    - 키워드 / 학년별로 프로그램 번호 집합(posting list)을, 기간은 정렬된 구간 인덱스를 만들어 두고
+#      검색은 bisect 조회와 집합 교집합으로 처리한다.
+class ProgramIndex:
+    def __init__(self, programs, keywords=DEFAULT_KEYWORDS):
+        # 📌 내부에서는 카탈로그 순서 번호(pid)로 집합 연산을 하고, 밖으로는 프로그램 id를 돌려준다
+        self.programs = list(programs)
+        self.ids = [program.id for program in self.programs]
+        self.positions = {program_id: pid for pid, program_id in enumerate(self.ids)}
+        self.all_ids = frozenset(range(len(self.programs)))
+
+        # 📌 소문자로 변환한 필드 (제목/설명/혜택/신청대상)
+        self.titles = []
+        self.descriptions = []
+        self.benefits = []
+        self.targets = []
+        for program in self.programs:
+            self.titles.append(program.title.lower())
+            self.descriptions.append(program.description.lower())
+            self.benefits.append(program.benefits.lower())
+            self.targets.append(program.target.lower())
+
+        # 📌 키워드 → 프로그램 번호 (제목/설명/혜택 중 하나에 포함되면 매칭)
+        self.keyword_postings = {}
+        for kw in keywords:
+            self._keyword_posting(kw)
+
+        # 📌 "기간"/"신청기간"을 (시작일, 종료일)로 파싱해 구간 인덱스로 저장
+        self.period_ranges = {}
+        self.apply_ranges = {}
+        for pid, program in enumerate(self.programs):
+            period = parse_period(program.period)
+            if period:
+                self.period_ranges[pid] = period
+            apply_period = parse_period(program.apply_period)
+            if apply_period:
+                self.apply_ranges[pid] = apply_period
+        self.period_index = IntervalIndex(self.period_ranges)
+        self.apply_index = IntervalIndex(self.apply_ranges)
+
+        # 📌 학년 → 프로그램 번호 ("3~4학년", "3,4학년" 같은 범위를 학년 집합으로 파싱)
+        self.grade_postings = {}
+        for pid, program in enumerate(self.programs):
+            for grade in parse_grades(program.target):
+                self.grade_postings.setdefault(grade, set()).add(pid)
+
+        # 📌 대상 → 프로그램 번호 ("졸업 예정자"처럼 학년이 아닌 대상은 "신청대상" 포함 여부로 매칭)
+        self.target_postings = {}
+        for token in TARGET_TOKENS:
+            self._target_posting(token)
+
+    def _keyword_posting(self, kw):
+        posting = self.keyword_postings.get(kw)
+        if posting is None:
+            posting = frozenset(
+                pid for pid in range(len(self.programs))
+                if kw in self.descriptions[pid] or kw in self.titles[pid] or kw in self.benefits[pid]
+            )
+            self.keyword_postings[kw] = posting
+        return posting
+
+    def _target_posting(self, token):
+        posting = self.target_postings.get(token)
+        if posting is None:
+            if token.endswith("학년") and token[:-2].isdigit():
+                posting = frozenset(self.grade_postings.get(int(token[:-2]), ()))
+            else:
+                posting = frozenset(pid for pid, target in enumerate(self.targets) if token in target)
+            self.target_postings[token] = posting
+        return posting
+
+    # ✅ 개별 필터 조회 (어휘에 없는 키워드/대상은 처음 한 번만 스캔 후 캐시)
+    def match_keywords(self, keywords):
+        matched = set()
+        for kw in keywords:
+            matched |= self._keyword_posting(kw)
+        return matched
+
+    # 📌 "2월"처럼 연도 없는 월: 카탈로그에 있는 각 연도의 해당 월과 "기간"이 겹치는 프로그램
+    #    ("3월 4월"처럼 여러 달이면 그중 한 달이라도 겹치는 프로그램)
+    def match_month(self, month):
+        matched = set()
+        for value in filter_values(month):
+            value = int(value)
+            if not 1 <= value <= 12:
+                continue
+            for year in self.period_index.years():
+                matched |= self.period_index.overlapping(*month_bounds(year, value))
+        return matched
+
+    # 📌 "2025.02"처럼 연도가 있는 월 목록 중 하나와 "기간"이 겹치는 프로그램
+    def match_period_months(self, tokens):
+        matched = set()
+        for token in tokens:
+            year, _, month = token.partition(".")
+            if not (year.isdigit() and month.isdigit() and 1 <= int(month) <= 12):
+                continue
+            matched |= self.period_index.overlapping(*month_bounds(int(year), int(month)))
+        return matched
+
+    # 📌 "기간"이 [start, end]와 겹치는 프로그램
+    def match_date_range(self, start, end):
+        return self.period_index.overlapping(start, end)
+
+    # 📌 "신청기간" 마감일이 기준일이 속한 주(월~일) 안에 있고 아직 지나지 않은 프로그램
+    def match_deadline_this_week(self, today=None):
+        today = today or date.today()
+        _, week_end = week_bounds(today)
+        return self.apply_index.ending_between(today, week_end)
+
+    # 📌 "1~2학년"처럼 대상이 여러 개면 그중 하나라도 대상인 프로그램
+    def match_target(self, target):
+        matched = set()
+        for token in filter_values(target):
+            matched |= self._target_posting(token)
+        return matched
+
+    # ✅ 필터 조합 검색 → 카탈로그 순서 번호 목록
+    def search_positions(self, month_filter=None, keywords=None, target_filter=None, period_months=None,
+                         date_range=None, deadline_this_week=False, today=None):
+        candidates = self.all_ids
+        if month_filter:
+            candidates = candidates & self.match_month(month_filter)
+        if period_months:
+            candidates = candidates & self.match_period_months(period_months)
+        if date_range:
+            candidates = candidates & self.match_date_range(*date_range)
+        if deadline_this_week:
+            candidates = candidates & self.match_deadline_this_week(today)
+        if keywords:
+            candidates = candidates & self.match_keywords(keywords)
+        if target_filter:
+            candidates = candidates & self.match_target(target_filter)
+        return sorted(candidates)
+
+    # ✅ 필터 조합 검색 → 프로그램 id 목록 (카탈로그 순서 유지)
+    def search_ids(self, *args, **kwargs):
+        return [self.ids[pid] for pid in self.search_positions(*args, **kwargs)]
+
+    # ✅ 필터 조합 검색 → 프로그램 레코드 목록 (카탈로그 순서 유지)
+    def search(self, *args, **kwargs):
+        return [self.programs[pid] for pid in self.search_positions(*args, **kwargs)]
+
+    def get(self, program_id):
+        return self.programs[self.positions[program_id]]
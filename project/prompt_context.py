@@ -0,0 +1,88 @@
+import logging
+import re
+
+from bm25_index import tokenize
+from instrumentation import METRICS
+from query_parser import parse_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 1200
+
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+# ✅ 로컬 토큰 수 추정 (tokenizer 없이 사용)
+#    OpenAI 토크나이저는 한글 한 글자가 대략 1토큰, 그 외 문자는 4글자 정도가 1토큰이다.
+def estimate_tokens(text):
+    hangul = len(HANGUL_PATTERN.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+# ✅ 질문에 필요한 필드 목록 (기본: 제목 + 설명)
+#    질문 유형별 필드는 query_parser.FIELD_WORDS 에서 찾은 것 (parsed 를 넘기면 다시 분석하지 않는다)
+def select_fields(query, parsed=None):
+    parsed = parsed or parse_query(query)
+    fields = ["제목"]
+    for group in parsed.field_groups:
+        fields += group
+    if len(fields) == 1:
+        fields += ["설명", "기간", "혜택"]
+    return fields
+
+
+# ✅ 프로그램 한 건을 한 줄로 직렬화 ("- 제목 | 기간: ... | 혜택: ...")
+def format_program_line(program, fields):
+    parts = [program.title]
+    for name in fields:
+        if name == "제목":
+            continue
+        value = program.get(name, "")
+        if value:
+            parts.append(f"{name}: {value}")
+    return "- " + " | ".join(parts)
+
+
+# ✅ 질문 토큰이 많이 겹치는 프로그램을 앞으로 (점수가 같으면 검색 결과 순서 유지)
+def rank_programs(query, programs):
+    query_tokens = set(tokenize(query))
+    if not query_tokens:
+        return list(programs)
+    scored = []
+    for position, program in enumerate(programs):
+        overlap = len(query_tokens.intersection(tokenize(f"{program.title} {program.description} {program.benefits}")))
+        scored.append((-overlap, position, program))
+    scored.sort(key=lambda item: (item[0], item[1]))
+    return [program for _, _, program in scored]
+
+
+# ✅ RAG 프롬프트에 들어갈 프로그램 목록 만들기
+#    - 질문과 관련도가 높은 프로그램부터 채운다 (ranked=True 면 이미 정렬된 순서를 그대로 사용).
+#    - 질문에 필요한 필드만 한 줄 형식으로 넣고, token_budget 을 넘으면 거기서 자른다.
+#    반환: (컨텍스트 문자열, 포함된 프로그램 수)
+def build_context(query, programs, token_budget=DEFAULT_TOKEN_BUDGET, ranked=False, parsed=None):
+    fields = select_fields(query, parsed)
+    lines = []
+    used = 0
+    for program in (programs if ranked else rank_programs(query, programs)):
+        line = format_program_line(program, fields)
+        cost = estimate_tokens(line) + 1
+        if lines and used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines), len(lines)
+
+
+# ✅ 질문 + 검색 결과 → 최종 프롬프트 (요청별 프롬프트 크기를 로그로 남김)
+def build_rag_prompt(query, programs, instruction, token_budget=DEFAULT_TOKEN_BUDGET, ranked=False, parsed=None):
+    programs = list(programs)
+    context, included = build_context(query, programs, token_budget, ranked, parsed)
+    prompt = f'사용자 질문: "{query}"\n검색된 비교과 프로그램 목록:\n{context}\n\n{instruction}'
+    tokens = estimate_tokens(prompt)
+    METRICS.inc("rag_prompt_tokens_estimated", tokens)
+    logger.info(
+        "rag prompt: %d tokens (추정), 프로그램 %d/%d건 포함, 예산 %d",
+        tokens, included, len(programs), token_budget,
+    )
+    return prompt
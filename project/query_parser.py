@@ -0,0 +1,263 @@
+import json
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+
+from program_dates import parse_grades, parse_period
+from program_index import DEFAULT_KEYWORDS, TARGET_TOKENS, filter_values
+
+# ✅ 질문에 나올 수 있는 다른 표현 → 검색에 쓰는 정규 키워드 / 대상
+#    (정규 키워드 자신은 자동으로 포함된다)
+KEYWORD_SYNONYMS = {
+    "점프업": ["jump up", "jumpup", "jump-up"],
+    "점프업 포인트": ["점프업포인트"],
+    "비교과 포인트": ["비교과포인트"],
+    "멘토링": ["멘토"],
+    "창업": ["스타트업"],
+    "자격증": ["자격 시험", "자격시험"],
+    "취업": ["취직", "구직"],
+}
+# 📌 이 키워드가 나오면 같이 검색할 키워드 ("점프업" → 점프업 관련 키워드 모두)
+KEYWORD_EXPANSIONS = {
+    "점프업": ["점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램"],
+}
+TARGET_SYNONYMS = {
+    "1학년": ["신입생", "새내기"],
+    "졸업 예정자": ["졸업예정자", "졸업반"],
+}
+# 📌 마감을 묻는 표현 / "이번 주" 표현 (둘 다 있으면 이번 주 마감 필터)
+DEADLINE_WORDS = ["마감", "언제까지", "기한"]
+THIS_WEEK_WORDS = ["이번 주", "이번주", "금주"]
+# ✅ 질문 유형별로 프롬프트에 추가로 넣을 필드 → 그 유형을 나타내는 표현 (prompt_context.select_fields)
+FIELD_WORDS = {
+    ("기간", "신청기간"): ["언제", "기간", "날짜", "일정", "마감", "신청", "월", "까지"],
+    ("혜택",): ["포인트", "혜택", "점프업", "인정", "점수"],
+    ("장소",): ["어디", "장소", "온라인", "오프라인"],
+    ("신청대상",): ["대상", "학년", "누가", "졸업", "재학생"],
+    ("문의처",): ["문의", "연락", "전화", "이메일"],
+}
+
+# 📌 Aho-Corasick 로 못 찾는 숫자 패턴은 정규식 한 번으로 (기간 "2025.02.10 ~ 2025.02.20" / 연월 "2025.02" / 월 "2월")
+DATE_PATTERN = re.compile(
+    r"(?P<range>\d{4}\.\d{2}\.\d{2}\s*~\s*\d{4}\.\d{2}\.\d{2})|(?P<year_month>\d{4}\.\d{2})|(?P<month>\d{1,2})월"
+)
+VOCABULARY_ENV = "CHATBOT_QUERY_VOCABULARY"
+
+
+# ✅ Aho-Corasick 문자열 매칭 오토마톤
+#    표현 수와 상관없이 질문을 한 글자씩 한 번만 훑어서 들어 있는 표현을 모두(겹치는 것 포함) 찾는다.
+#    실패 링크를 미리 따라가 전이표를 채워 두므로(DFA) 질의 때는 글자마다 dict 조회 한 번이다.
+class AhoCorasick:
+    def __init__(self, patterns):
+        # 📌 상태마다 다음 글자 → 상태, 이 상태에서 끝나는 (표현 길이, payload 목록)
+        goto = [{}]
+        output = [[]]
+        for pattern, payloads in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append((len(pattern), payloads))
+
+        # 📌 BFS 순서로 실패 상태의 전이 / 출력을 물려받는다 (부모가 먼저 완성되므로 한 번에 채워진다)
+        fail = [0] * len(goto)
+        queue = deque()
+        for next_state in goto[0].values():
+            queue.append(next_state)
+        while queue:
+            state = queue.popleft()
+            inherited = goto[fail[state]]
+            for char, next_state in list(goto[state].items()):
+                fail[next_state] = inherited.get(char, 0)
+                queue.append(next_state)
+            output[state] = output[state] + output[fail[state]]
+            for char, next_state in inherited.items():
+                goto[state].setdefault(char, next_state)
+        self._goto = goto
+        self._output = output
+
+    # ✅ 텍스트 → (시작 위치, 끝 위치, payload 목록) 을 끝 위치 순서로
+    def finditer(self, text):
+        goto = self._goto
+        output = self._output
+        state = 0
+        for end, char in enumerate(text, start=1):
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for length, payloads in output[state]:
+                    yield end - length, end, payloads
+
+
+def _inside_number(text, start, end):
+    return text[start].isdigit() and ((start > 0 and text[start - 1].isdigit()) or text[end:end + 1] == "도")
+
+
+# ✅ 월 / 대상 집합 → 정렬된 목록 (필터 dict / 응답 제목이 집합 순서에 따라 달라지지 않게)
+def sorted_months(months):
+    return sorted(filter_values(months), key=int)
+
+
+def sorted_targets(targets):
+    order = {token: i for i, token in enumerate(TARGET_TOKENS)}
+    return sorted(filter_values(targets), key=lambda token: (order.get(token, len(order)), token))
+
+
+# ✅ 응답 제목용 표기 ("3월, 4월" / "1학년, 2학년")
+def month_label(months):
+    return ", ".join(f"{month}월" for month in sorted_months(months))
+
+
+def target_label(targets):
+    return ", ".join(sorted_targets(targets))
+
+
+# ✅ 질문 하나를 한 번 분석한 결과 (검색 필터 / 응답 제목 / 프롬프트 필드 선택이 모두 이걸 같이 쓴다)
+@dataclass(slots=True)
+class ParsedQuery:
+    text: str
+    normalized: str
+    keywords: list = field(default_factory=list)
+    months: frozenset = frozenset()
+    period_months: list = field(default_factory=list)
+    date_range: tuple = None
+    targets: frozenset = frozenset()
+    deadline: bool = False
+    this_week: bool = False
+    field_groups: list = field(default_factory=list)
+
+    @property
+    def deadline_this_week(self):
+        return self.deadline and self.this_week
+
+    # ✅ ProgramIndex.search_positions / SemanticSearchEngine.search 에 그대로 넘길 수 있는 dict
+    #    월 / 대상이 여러 개면 목록으로 넘기고, 인덱스는 그 값들의 posting 합집합으로 찾는다.
+    def filters(self):
+        filters = {}
+        if self.months:
+            filters["month_filter"] = sorted_months(self.months)
+        if self.date_range:
+            filters["date_range"] = self.date_range
+        elif self.period_months:
+            filters["period_months"] = list(self.period_months)
+        if self.keywords:
+            filters["keywords"] = list(self.keywords)
+        if self.targets:
+            filters["target_filter"] = sorted_targets(self.targets)
+        if self.deadline_this_week:
+            filters["deadline_this_week"] = True
+        return filters
+
+
+# ✅ 키워드 / 동의어 사전을 오토마톤 하나로 컴파일해 두고 질문마다 한 번 훑는 파서
+#    vocabulary 는 {"keywords": [...], "keyword_synonyms": {...}, "keyword_expansions": {...},
+#    "target_synonyms": {...}, "deadline_words": [...], "this_week_words": [...]} 형식 (빠진 항목은 기본값)
+class QueryParser:
+    def __init__(self, vocabulary=None):
+        vocabulary = vocabulary or {}
+        self.keywords = list(vocabulary.get("keywords", DEFAULT_KEYWORDS))
+        self.expansions = vocabulary.get("keyword_expansions", KEYWORD_EXPANSIONS)
+        # 📌 키워드는 사전 순서대로 돌려준다 (응답 제목 / 캐시 키가 질문 속 순서에 따라 달라지지 않게)
+        self._keyword_order = {keyword: i for i, keyword in enumerate(self.keywords)}
+        for keyword, expanded in self.expansions.items():
+            for extra in expanded:
+                self._keyword_order.setdefault(extra, len(self._keyword_order))
+
+        patterns = {}
+
+        def add(surface, payload):
+            patterns.setdefault(" ".join(surface.lower().split()), []).append(payload)
+
+        keyword_synonyms = vocabulary.get("keyword_synonyms", KEYWORD_SYNONYMS)
+        for keyword in self.keywords:
+            for surface in [keyword] + list(keyword_synonyms.get(keyword, [])):
+                add(surface, ("keyword", keyword))
+        target_synonyms = vocabulary.get("target_synonyms", TARGET_SYNONYMS)
+        for target in TARGET_TOKENS:
+            for surface in [target] + list(target_synonyms.get(target, [])):
+                add(surface, ("target", target))
+        for surface in vocabulary.get("deadline_words", DEADLINE_WORDS):
+            add(surface, ("deadline", True))
+        for surface in vocabulary.get("this_week_words", THIS_WEEK_WORDS):
+            add(surface, ("this_week", True))
+        self.field_groups = list(FIELD_WORDS)
+        for group, words in FIELD_WORDS.items():
+            for surface in words:
+                add(surface, ("field", group))
+        # 📌 숫자가 보였는지도 같은 패스에서 표시해 두고, 숫자가 없는 질문은 날짜 정규식을 건너뛴다
+        for digit in "0123456789":
+            add(digit, ("digit", True))
+        self.automaton = AhoCorasick(patterns)
+
+    # ✅ 질문 → ParsedQuery (소문자 + 공백 하나로 정리한 뒤 오토마톤 한 번 + 날짜 정규식 한 번)
+    def parse(self, query):
+        normalized = " ".join((query or "").lower().split())
+        parsed = ParsedQuery(text=query, normalized=normalized)
+
+        keywords = set()
+        targets = set()
+        groups = set()
+        has_digit = False
+        for start, end, payloads in self.automaton.finditer(normalized):
+            for kind, value in payloads:
+                if kind == "keyword":
+                    keywords.add(value)
+                    keywords.update(self.expansions.get(value, ()))
+                elif kind == "target":
+                    # 📌 "2025학년도" 안의 "5학년" 은 대상이 아니다 (program_dates.GRADE_*_PATTERN 과 같은 규칙)
+                    if _inside_number(normalized, start, end):
+                        continue
+                    # 📌 "1학년이나 2학년"처럼 대상이 여러 번 나오면 모두 대상
+                    targets.add(value)
+                elif kind == "deadline":
+                    parsed.deadline = True
+                elif kind == "this_week":
+                    parsed.this_week = True
+                elif kind == "digit":
+                    has_digit = True
+                else:
+                    groups.add(value)
+        parsed.keywords = sorted(keywords, key=lambda keyword: self._keyword_order.get(keyword, len(self._keyword_order)))
+        parsed.field_groups = [group for group in self.field_groups if group in groups]
+
+        months = set()
+        if has_digit:
+            # 📌 "1~2학년" / "3,4학년" 은 오토마톤이 마지막 "2학년" / "4학년" 만 찾으므로 학년 범위 / 목록을 펼쳐서 더한다
+            targets.update(f"{grade}학년" for grade in parse_grades(normalized) if 1 <= grade <= 9)
+            for match in DATE_PATTERN.finditer(normalized):
+                if match.group("range"):
+                    parsed.date_range = parsed.date_range or parse_period(match.group("range"))
+                elif match.group("year_month"):
+                    parsed.period_months.append(match.group("year_month"))
+                else:
+                    months.add(str(int(match.group("month"))))
+        parsed.months = frozenset(months)
+        parsed.targets = frozenset(targets)
+        return parsed
+
+
+# ✅ 사전 파일(JSON) → QueryParser (CHATBOT_QUERY_VOCABULARY 환경 변수로 기본 파서 사전을 바꿀 수 있다)
+def load_parser(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return QueryParser(json.load(file))
+
+
+_default_parser = None
+
+
+def default_parser():
+    global _default_parser
+    if _default_parser is None:
+        path = os.getenv(VOCABULARY_ENV)
+        _default_parser = load_parser(path) if path else QueryParser()
+    return _default_parser
+
+
+# ✅ 질문 → ParsedQuery (메시지마다 한 번 부르고 결과를 검색 / 응답 생성 단계에 넘긴다)
+def parse_query(query, parser=None):
+    return (parser or default_parser()).parse(query)
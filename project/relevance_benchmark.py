@@ -0,0 +1,139 @@
+import argparse
+import json
+import statistics
+import time
+
+from bm25_index import BM25Index
+from catalog import load_catalog
+from embedding_cache import EmbeddingCache, HashingEmbedder
+from hybrid_retriever import HybridRetriever, KeywordRetriever
+from program_index import ProgramIndex
+from semantic_search import SemanticSearchEngine
+
+# ✅ 오프라인 검색 품질 측정용 질문 목록 (programs.json / education_programs.json 기준 정답 제목)
+BENCHMARK_CASES = [
+    {
+        "query": "NCS 필기 시험 준비 교육",
+        "filters": {"keywords": ["ncs"]},
+        "expected": ["동계방학 NCS 필기 마스터 교육", "2024 동계방학 NCS 필기전형 마스터 교육", "동계방학 NCS 모의고사"],
+    },
+    {
+        "query": "3월 멘토링 프로그램",
+        "filters": {"month_filter": "3", "keywords": ["멘토링"]},
+        "expected": ["2025-1학기 신입생 전공탐색 멘토링 프로그램(멘토)", "2025-1학기 신입생 전공탐색 멘토링 프로그램(멘티)"],
+    },
+    {
+        "query": "면접 준비 특강",
+        "filters": {"keywords": ["특강"]},
+        "expected": ["2024학년도 동계방학 집중 취업 특강 3차(면접 커뮤니케이션 전략)"],
+    },
+    {
+        "query": "자기소개서 작성 특강",
+        "filters": {"keywords": ["특강"]},
+        "expected": ["2024학년도 동계방학 집중 취업 특강 1차(자기소개서)"],
+    },
+    {
+        "query": "공기업 취업 캠프",
+        "filters": {},
+        "expected": ["2024학년도 공기업 취업타파 캠프"],
+    },
+    {
+        "query": "자격증 과정",
+        "filters": {"keywords": ["자격증"]},
+        "expected": ["경영지도사(생산관리) 자격증 과정"],
+    },
+    {
+        "query": "3학년 일경험 프로그램",
+        "filters": {"target_filter": "3학년"},
+        "expected": ["일경험 프로그램(1일 4H, 총 40H)", "일경험 프로그램(1일 8H, 총 80H)"],
+    },
+    {
+        "query": "승무원 캠프",
+        "filters": {},
+        "expected": ["2024학년도 동계방학 아시아나 항공 승무원 캠프"],
+    },
+    {
+        "query": "동영상 편집 배우기",
+        "filters": {},
+        "expected": ["CAPCUT을 활용한 동영상 편집 및 영상 만들기"],
+    },
+    {
+        "query": "영어 교사 임용 시험 특강",
+        "filters": {"keywords": ["특강"]},
+        "expected": ["예비 영어 교사 임용 2차 시험 준비 전략 특강"],
+    },
+    {
+        "query": "취업 상담 컨설팅",
+        "filters": {"keywords": ["취업"]},
+        "expected": ["JJ 취업컨설팅 Day(2월)"],
+    },
+    {
+        "query": "현직자 직무 부트캠프",
+        "filters": {},
+        "expected": ["2024 JJ 현직자 직무부트캠프(온라인 일경험)_2월"],
+    },
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+# ✅ 검색기 하나에 대해 recall@k / MRR / 지연시간(ms) 측정
+def evaluate(retriever, cases, k=5):
+    recalls = []
+    reciprocal_ranks = []
+    latencies = []
+    for case in cases:
+        expected = set(case["expected"])
+        start = time.perf_counter()
+        results = retriever.search(case["query"], k=k, filters=case.get("filters"))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        titles = [program.title for program, _ in results]
+        recalls.append(len(expected & set(titles)) / len(expected))
+        first_hit = next((rank for rank, title in enumerate(titles, start=1) if title in expected), None)
+        reciprocal_ranks.append(1.0 / first_hit if first_hit else 0.0)
+    return {
+        f"recall@{k}": round(statistics.mean(recalls), 4),
+        "mrr": round(statistics.mean(reciprocal_ranks), 4),
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p95_ms": round(percentile(latencies, 95), 3),
+    }
+
+
+def build_retrievers(programs, embedder):
+    program_index = ProgramIndex(programs)
+    semantic = SemanticSearchEngine(program_index, EmbeddingCache(embedder, path=":memory:"))
+    keyword = KeywordRetriever(program_index)
+    bm25 = BM25Index(program_index)
+    return {
+        "keyword": keyword,
+        "bm25": bm25,
+        "semantic": semantic,
+        "hybrid": HybridRetriever(bm25, semantic),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비교과 프로그램 검색 품질/지연시간 오프라인 벤치마크")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    # 📌 네트워크 없이 돌 수 있도록 결정적 임베딩 모델 사용
+    retrievers = build_retrievers(load_catalog(), HashingEmbedder())
+    report = {name: evaluate(retriever, BENCHMARK_CASES, k=args.k) for name, retriever in retrievers.items()}
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from bm25_index import BM25Index
+from catalog import load_catalog
+from embedding_cache import EmbeddingCache, HashingEmbedder
+from program_dates import parse_period
+from program_index import ProgramIndex
+from relevance_benchmark import percentile
+from semantic_search import SemanticSearchEngine
+from synthetic_catalog import write_catalog
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+# ✅ 검색 종류별로 돌려볼 질의 (ProgramIndex 필터 / BM25 / 벡터 검색)
+QUERY_CASES = {
+    "keyword": [{"keywords": ["ncs"]}, {"keywords": ["멘토링"]}, {"keywords": ["특강", "취업"]}],
+    "date": [{"month_filter": "2"}, {"period_months": ["2025.03"]}, {"date_range": parse_period("2025.01.01 ~ 2025.01.31")}],
+    "grade": [{"target_filter": "3학년"}, {"target_filter": "졸업 예정자"}, {"target_filter": "1학년", "month_filter": "3"}],
+}
+TEXT_QUERIES = ["면접 준비 특강", "창업 경진대회 나가고 싶어요", "방학 때 들을 수 있는 자격증 과정", "영상 편집 배우기"]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _latency(func, cases, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for case in cases:
+            start = time.perf_counter()
+            func(case)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(percentile(latencies, 50), 4), "p95_ms": round(percentile(latencies, 95), 4)}
+
+
+# ✅ 카탈로그 읽기 → ProgramIndex → BM25 → 임베딩 + 행렬 (단계별 소요시간)
+def build_all(path):
+    timings = {}
+    programs, timings["load_s"] = _timed(load_catalog, [path])
+    program_index, timings["program_index_s"] = _timed(ProgramIndex, programs)
+    bm25_index, timings["bm25_index_s"] = _timed(BM25Index, program_index)
+    embedding_cache = EmbeddingCache(HashingEmbedder(), path=":memory:")
+    semantic, timings["semantic_build_s"] = _timed(SemanticSearchEngine, program_index, embedding_cache)
+    return (programs, program_index, bm25_index, semantic), timings
+
+
+# ✅ 단계별로 새로 늘어난 메모리(MB) — tracemalloc 이 느리므로 시간 측정과 따로 한 번 더 만든다
+#    임베딩 계산은 추적 밖에서 미리 해 두고, 추적 중에는 정규화된 행렬이 차지하는 크기만 잰다.
+def measure_memory(path):
+    embedding_cache = EmbeddingCache(HashingEmbedder(), path=":memory:")
+    matrix = embedding_cache.embed_programs(load_catalog([path]))
+    gc.collect()
+    tracemalloc.start()
+    memory = {}
+    before = tracemalloc.get_traced_memory()[0]
+    programs = load_catalog([path])
+    after = tracemalloc.get_traced_memory()[0]
+    memory["catalog_mb"] = after - before
+    before = after
+    program_index = ProgramIndex(programs)
+    after = tracemalloc.get_traced_memory()[0]
+    memory["program_index_mb"] = after - before
+    before = after
+    bm25_index = BM25Index(program_index)
+    after = tracemalloc.get_traced_memory()[0]
+    memory["bm25_index_mb"] = after - before
+    before = after
+    semantic = SemanticSearchEngine(program_index, embedding_cache, matrix=matrix)
+    after = tracemalloc.get_traced_memory()[0]
+    memory["semantic_mb"] = after - before
+    memory["peak_mb"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del programs, program_index, bm25_index, semantic
+    return {name: round(value / 1024 / 1024, 3) for name, value in memory.items()}
+
+
+def measure_build_and_queries(path, repeat):
+    (programs, program_index, bm25_index, semantic), timings = build_all(path)
+    result = {"build": {name: round(value, 4) for name, value in timings.items()}}
+
+    result["query"] = {
+        name: _latency(lambda case: program_index.search_positions(**case), cases, repeat)
+        for name, cases in QUERY_CASES.items()
+    }
+    result["query"]["bm25"] = _latency(lambda query: bm25_index.search(query, k=5), TEXT_QUERIES, repeat)
+    result["query"]["semantic"] = _latency(lambda query: semantic.search(query, k=5), TEXT_QUERIES, repeat)
+    result["query"]["semantic_filtered"] = _latency(
+        lambda query: semantic.search(query, k=5, filters={"target_filter": "3학년"}), TEXT_QUERIES, repeat
+    )
+    result["matrix_mb"] = round(semantic.matrix.nbytes / 1024 / 1024, 3)
+    return result
+
+
+def run_size(n, repeat, memory=True, seed=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_catalog(os.path.join(tmp, f"synthetic_{n}.json"), n, seed)
+        result = {"programs": n, "file_mb": round(os.path.getsize(path) / 1024 / 1024, 3)}
+        result.update(measure_build_and_queries(path, repeat))
+        if memory:
+            result["memory"] = measure_memory(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 카탈로그 크기별 로딩/인덱스 생성/검색 지연시간/메모리 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=20, help="질의 종류별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 메모리 측정 생략 (빠름)")
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장 (리비전끼리 비교용)")
+    args = parser.parse_args()
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "embedder": HashingEmbedder().model,
+        "results": [],
+    }
+    for n in args.sizes:
+        result = run_size(n, args.repeat, not args.no_memory, args.seed)
+        report["results"].append(result)
+        print(f"✅ {n}건: build {result['build']}", flush=True)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
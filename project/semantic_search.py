@@ -0,0 +1,140 @@
+import numpy as np
+
+# ✅ search(..., filters=...) 에 넘길 수 있는 필터 이름 (ProgramIndex.search_positions 인자와 같음)
+FILTER_NAMES = ("month_filter", "keywords", "target_filter", "period_months", "date_range", "deadline_this_week")
+
+
+# ✅ 행 단위 L2 정규화 (코사인 유사도를 내적 한 번으로 계산하기 위해)
+def normalize_rows(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ✅ 메모리 위의 임베딩 행렬로 하는 의미 검색
+#    - 카탈로그 순서대로 정규화된 float32 행렬을 한 번 만들어 두고
+#    - 질의 벡터와 내적 → argpartition 으로 상위 k개만 정렬한다.
+#    - 월/학년/키워드 필터는 ProgramIndex 에서 후보를 뽑아 boolean mask 로 먼저 거른다.
+#    - normalized=True 면 이미 정규화된 float32 행렬(예: index_artifact 의 memmap)을 복사 없이 그대로 쓴다.
+#    - store(MmapEmbeddingStore)를 넘기면 행렬을 만들지 않고 워커끼리 공유하는 메모리 맵 파일에서 점수를 계산한다.
+#    - ann_nprobe 를 주면 IVF 근사 검색(ann_index)으로 후보를 줄인 뒤 원래 벡터로 다시 정렬한다.
+#      previous_ann(이전 snapshot 의 인덱스)을 넘기면 군집을 다시 학습하지 않고 바뀐 프로그램만 넣는다.
+class SemanticSearchEngine:
+    def __init__(self, program_index, embedding_cache, matrix=None, normalized=False, store=None,
+                 ann_nprobe=None, previous_ann=None):
+        self.index = program_index
+        self.embedding_cache = embedding_cache
+        self.store = store
+        self.ann = None
+        if store is not None:
+            # 📌 카탈로그 순서와 저장소 행 순서가 다르면 점수를 카탈로그 순서로 바꿀 행 번호
+            self._store_rows = store.rows_for(program_index.ids)
+            self.matrix = store.matrix
+        else:
+            if matrix is None:
+                matrix = embedding_cache.embed_programs(program_index.programs)
+            if not len(program_index.programs):
+                self.matrix = np.zeros((0, 0), np.float32)
+            elif normalized:
+                self.matrix = matrix
+            else:
+                self.matrix = normalize_rows(matrix)
+        if ann_nprobe and self.matrix.size:
+            self._build_ann(ann_nprobe, previous_ann)
+
+    def _build_ann(self, nprobe, previous):
+        from ann_index import IVFIndex
+
+        ids = self.store.ids if self.store is not None else self.index.ids
+        if previous is not None:
+            self.ann = previous.copy()
+            self.ann.nprobe = nprobe
+            self.ann.sync(ids, self.matrix)
+        else:
+            self.ann = IVFIndex.build(ids, self.matrix, nprobe=nprobe)
+        # 📌 ANN 행 번호 → 카탈로그 위치 (카탈로그에 없는 행은 -1)
+        self._ann_positions = np.fromiter(
+            (self.index.positions.get(program_id, -1) for program_id in self.ann.ids), dtype=np.int64, count=len(self.ann.ids)
+        )
+
+    # 📌 필터에 맞는 프로그램만 True 인 mask (필터가 없으면 None)
+    def filter_mask(self, filters):
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        if not filters:
+            return None
+        unknown = set(filters) - set(FILTER_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 필터: {', '.join(sorted(unknown))}")
+        mask = np.zeros(len(self.index.programs), dtype=bool)
+        mask[self.index.search_positions(**filters)] = True
+        return mask
+
+    def _top_k(self, scores, k, mask):
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(mask.sum()))
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.index.programs[pid], float(scores[pid])) for pid in top]
+
+    # ✅ 질의 하나 → [(프로그램, 점수), ...] (점수 내림차순, 최대 k개)
+    def search(self, query, k=5, filters=None):
+        if not self.matrix.size:
+            return []
+        return self.search_vector(self.embedding_cache.embed_query(query), k, filters)
+
+    # 📌 정규화된 질의 행렬 → [질의 수, 프로그램 수] 점수 (카탈로그 순서)
+    def _scores(self, query_matrix):
+        if self.store is None:
+            return query_matrix @ self.matrix.T
+        scores = self.store.scores_batch(query_matrix)
+        return scores if self._store_rows is None else scores[:, self._store_rows]
+
+    # 📌 카탈로그 위치 몇 개만 정확한 코사인 점수 계산 (ANN 후보 다시 정렬용)
+    def _exact_scores(self, query, positions):
+        if self.store is None:
+            return self.matrix[positions] @ query
+        rows = positions if self._store_rows is None else self._store_rows[positions]
+        return self.store.scores_rows(query, rows)
+
+    # 📌 ANN 후보 → 정확한 점수로 다시 정렬한 상위 k개 (필터가 있으면 후보가 모자랄 수 있어 쓰지 않는다)
+    def _ann_search(self, query, k):
+        rows, _ = self.ann.candidates(query, limit=max(k, self.ann.rerank))
+        positions = self._ann_positions[rows]
+        positions = positions[positions >= 0]
+        scores = self._exact_scores(query, positions)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(self.index.programs[positions[i]], float(scores[i])) for i in order]
+
+    # ✅ 이미 임베딩한 질의 벡터로 검색 (임베딩 호출을 따로 비동기로 돌릴 때 사용)
+    def search_vector(self, query_vector, k=5, filters=None):
+        if not self.matrix.size:
+            return []
+        query_matrix = normalize_rows(query_vector)
+        mask = self.filter_mask(filters)
+        if self.ann is not None and mask is None:
+            return self._ann_search(query_matrix[0], k)
+        return self._top_k(self._scores(query_matrix)[0], k, mask)
+
+    # ✅ 질의 여러 개를 행렬곱 한 번으로 점수 계산 (같은 필터 적용)
+    def search_batch(self, queries, k=5, filters=None):
+        if not self.matrix.size or not queries:
+            return [[] for _ in queries]
+        return self.search_vectors(self.embedding_cache.embedder.embed_documents(list(queries)), k, filters)
+
+    # ✅ 이미 임베딩한 질의 여러 개로 검색 (샤드마다 임베딩을 다시 하지 않도록 catalog_registry 에서 사용)
+    def search_vectors(self, query_vectors, k=5, filters=None):
+        if not self.matrix.size or not len(query_vectors):
+            return [[] for _ in range(len(query_vectors))]
+        query_matrix = normalize_rows(query_vectors)
+        mask = self.filter_mask(filters)
+        if self.ann is not None and mask is None:
+            return [self._ann_search(query, k) for query in query_matrix]
+        scores = self._scores(query_matrix)
+        return [self._top_k(row, k, mask) for row in scores]
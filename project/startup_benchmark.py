@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ✅ 스크립트들이 맨 위에서 import 하던 무거운 라이브러리
+#    (측정용 자식 프로세스가 이 모듈을 import 하므로 이 파일 맨 위에서는 표준 라이브러리만 import 한다)
+HEAVY_MODULES = ["numpy", "streamlit", "langchain", "langchain_openai", "chromadb", "sklearn"]
+
+
+# 📌 새 프로세스에서 모듈 하나 import 시간 (설치되어 있지 않으면 None)
+def _child_import(module):
+    start = time.perf_counter()
+    try:
+        __import__(module)
+    except ImportError:
+        return {"module": module, "import_s": None}
+    return {"module": module, "import_s": time.perf_counter() - start}
+
+
+# 📌 새 프로세스에서 엔진 만들기 + 첫 키워드 / 첫 의미 검색까지
+def _child_engine(sources, cache_dir, artifact_path):
+    start = time.perf_counter()
+    from engine import ChatbotEngine
+
+    imported = time.perf_counter()
+    engine = ChatbotEngine(sources, cache_dir=cache_dir, artifact_path=artifact_path)
+    ready = time.perf_counter()
+    engine.snapshot.program_index.search(keywords=["특강"])
+    keyword = time.perf_counter()
+    engine.search("면접 준비 특강")
+    semantic = time.perf_counter()
+    return {
+        "import_s": imported - start,
+        "engine_s": ready - imported,
+        "first_keyword_s": keyword - ready,
+        "first_search_s": semantic - keyword,
+        "total_s": semantic - start,
+    }
+
+
+def _run_child(args):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", *args], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _median(runs, key):
+    return round(statistics.median(run[key] for run in runs), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import / 시작 시간 측정 (JSON 에서 새로 만들기 vs 미리 만든 인덱스 파일)")
+    parser.add_argument("--programs", type=int, default=0, help="가짜 카탈로그 크기 (0 이면 실제 JSON 파일 사용)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, *rest = args.child
+        if mode == "import":
+            result = _child_import(rest[0])
+        else:
+            sources, cache_dir, artifact_path = json.loads(rest[0]), rest[1], rest[2] or None
+            result = _child_engine(sources, cache_dir, artifact_path)
+        print(json.dumps(result))
+        return
+
+    from catalog import DEFAULT_SOURCES
+    from catalog_reloader import build_snapshot
+    from embedding_cache import EmbeddingCache, HashingEmbedder
+    from index_artifact import write_artifact
+    from synthetic_catalog import write_catalog
+
+    report = {"imports": {}, "startup": {}}
+    for module in HEAVY_MODULES:
+        runs = [_run_child(["import", module]) for _ in range(args.repeat)]
+        report["imports"][module] = None if runs[0]["import_s"] is None else _median(runs, "import_s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = list(DEFAULT_SOURCES)
+        if args.programs:
+            sources = [write_catalog(os.path.join(tmp, "synthetic.json"), args.programs)]
+        # 📌 임베딩은 두 방식 모두 디스크 캐시에서 읽도록 미리 채워 두고 인덱스 파일을 만든다
+        embedding_cache = EmbeddingCache(HashingEmbedder(), path=os.path.join(tmp, "embedding_cache.sqlite3"))
+        artifact_path = os.path.join(tmp, "catalog_index.bin")
+        write_artifact(artifact_path, build_snapshot(sources, embedding_cache), sources, embedding_cache.model_name)
+        embedding_cache.close()
+
+        for name, path in (("json", ""), ("artifact", artifact_path)):
+            runs = [_run_child(["engine", json.dumps(sources), tmp, path]) for _ in range(args.repeat)]
+            report["startup"][name] = {key: _median(runs, key) for key in runs[0]}
+        report["programs"] = args.programs or "catalog"
+        report["artifact_mb"] = round(os.path.getsize(artifact_path) / 1024 / 1024, 3)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from instrumentation import METRICS, record_token_usage
+
+
+# ✅ 응답 생성 취소 신호 (사용자가 새 메시지를 보내면 이전 생성을 멈추는 데 사용)
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+# ✅ ChatOpenAI.stream 이 돌려주는 chunk 와 같은 모양 (content 속성)
+class FakeChunk:
+    def __init__(self, content):
+        self.content = content
+
+
+# ✅ 네트워크 없이 스트리밍 동작을 확인하기 위한 가짜 채팅 모델
+#    미리 정한 응답을 chunk_size 글자씩 delay 초 간격으로 흘려보낸다.
+class FakeStreamingChatModel:
+    def __init__(self, response="안녕하세요! 비교과 프로그램을 안내해 드릴게요.", chunk_size=4, delay=0.0):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        for i in range(0, len(self.response), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield FakeChunk(self.response[i:i + self.chunk_size])
+
+    def invoke(self, prompt):
+        return FakeChunk("".join(chunk.content for chunk in self.stream(prompt)))
+
+
+# ✅ 채팅 모델 응답을 토큰 단위로 흘려보내는 generator (st.write_stream 에 그대로 넘길 수 있음)
+#    - cancel_token 이 취소되면 그 자리에서 멈추고 모델 스트림도 닫는다.
+#    - 끝까지 받은 경우에만 on_complete(전체 응답) 를 호출한다 (응답 캐시 저장 등).
+#    - 첫 토큰까지 시간(llm_first_token)과 전체 스트리밍 시간(llm_stream)을 METRICS 에 남긴다.
+def stream_answer(chat_model, prompt, cancel_token=None, on_complete=None):
+    start = time.perf_counter()
+    stream = chat_model.stream(prompt)
+    parts = []
+    try:
+        for chunk in stream:
+            if cancel_token is not None and cancel_token.cancelled:
+                METRICS.inc("llm_cancelled")
+                return
+            record_token_usage(chunk)
+            text = getattr(chunk, "content", chunk)
+            if not text:
+                continue
+            if not parts:
+                METRICS.record_stage("llm_first_token", (time.perf_counter() - start) * 1000)
+            parts.append(text)
+            yield text
+    finally:
+        METRICS.record_stage("llm_stream", (time.perf_counter() - start) * 1000)
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    if on_complete is not None and not (cancel_token is not None and cancel_token.cancelled):
+        on_complete("".join(parts))
+
+
+# ✅ 세션마다 하나의 진행 중인 생성만 유지: 새 토큰을 만들면서 이전 토큰은 취소
+def replace_cancel_token(session_state, key="cancel_token"):
+    previous = session_state.get(key)
+    if previous is not None:
+        previous.cancel()
+    token = CancelToken()
+    session_state[key] = token
+    return token
@@ -0,0 +1,167 @@
+import argparse
+import html
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# ✅ 실제 공지와 비슷한 모양의 가짜 비교과 프로그램을 만들기 위한 재료
+DEPARTMENTS = [
+    "대학일자리플러스센터", "교수학습개발원", "창업지원단", "RC교육원", "국제교류원", "학생상담센터",
+    "경영학과", "컴퓨터공학과", "영어교육과", "간호학과", "항공서비스학과", "문헌정보학과", "스마트미디어학과",
+]
+TOPICS = [
+    ("NCS 필기 마스터 교육", "NCS 직업기초능력 필기시험 대비 문제풀이 및 해설 강의."),
+    ("취업 특강", "현직자 초청 직무 소개 및 입사지원서 작성 전략 특강."),
+    ("면접 컨설팅", "모의면접과 1:1 피드백을 통한 면접 역량 강화 프로그램."),
+    ("자기소개서 클리닉", "전문 컨설턴트의 자기소개서 첨삭 및 작성 요령 안내."),
+    ("전공탐색 멘토링", "선배 멘토와 함께 전공 로드맵을 설계하는 멘토링 프로그램."),
+    ("창업 아이디어 경진대회", "팀별 창업 아이템 발굴 및 사업계획서 발표 경진대회."),
+    ("자격증 과정", "국가공인 자격증 취득을 위한 단기 집중 과정."),
+    ("직무 부트캠프", "현직자와 함께하는 직무별 실무 프로젝트 부트캠프."),
+    ("글로벌 어학 캠프", "원어민 강사와 함께하는 집중 회화 캠프."),
+    ("학습법 워크숍", "시간관리와 노트정리 등 자기주도 학습 전략 워크숍."),
+    ("동영상 편집 실습", "CAPCUT 을 활용한 숏폼 영상 기획 및 편집 실습."),
+    ("심리검사 및 상담", "MBTI / 진로적성 검사 해석과 개인 상담."),
+]
+SEASONS = ["동계방학", "하계방학", "1학기", "2학기"]
+BENEFITS = [
+    "재맞고 점프업 포인트 {n}시간 인정", "비교과 포인트 {n}점 부여", "수료증 발급", "우수자 장학금 지급",
+    "점프업 자기주도형 포인트 {n}점", "미정 (확인 필요)",
+]
+TARGETS = [
+    "전학년 재학생", "1~2학년 재학생", "3~4학년 재학생", "3,4학년 재학생", "4학년 및 졸업 예정자",
+    "신입생", "{dept} 재학생", "졸업유예자 포함 재학생",
+]
+BUILDINGS = ["스타센터", "진리관", "예술관", "공학관", "학생회관", "중앙도서관", "온라인(ZOOM)"]
+# 📌 공지 페이지에서 쓰는 항목 이름 (catalog 필드 이름과 다른 경우가 많다)
+NOTICE_LABELS = [
+    ("프로그램 소개", "설명"), ("접수기간", "신청기간"), ("운영기간", "기간"), ("장소", "장소"),
+    ("특전", "혜택"), ("모집대상", "신청대상"), ("문의", "문의처"),
+]
+NOTICE_LAYOUTS = ["table", "dl", "text"]
+WEEKDAYS = "월화수목금토일"
+
+
+def _format_day(day):
+    return day.strftime("%Y.%m.%d")
+
+
+# ✅ 프로그램 한 건 (programs.json 과 같은 한국어 필드)
+def synthetic_program(rng, number, start_year=2024):
+    department = rng.choice(DEPARTMENTS)
+    topic, description = rng.choice(TOPICS)
+    season = rng.choice(SEASONS)
+    year = start_year + rng.randint(0, 1)
+
+    start = date(year, rng.randint(1, 12), rng.randint(1, 28))
+    end = start + timedelta(days=rng.choice([0, 0, 2, 4, 13, 27, 60]))
+    apply_start = start - timedelta(days=rng.randint(7, 30))
+    apply_end = start - timedelta(days=rng.randint(1, 6))
+    period = _format_day(start) if start == end else f"{_format_day(start)} ~ {_format_day(end)}"
+
+    return {
+        "제목": f"{year}학년도 {season} {department} {topic} {number}차",
+        "설명": f"{department} 주관. {description}",
+        "신청기간": f"{_format_day(apply_start)} ~ {_format_day(apply_end)}",
+        "기간": period,
+        "장소": f"{rng.choice(BUILDINGS)} {rng.randint(1, 5)}{rng.randint(0, 3)}{rng.randint(0, 9)}호",
+        "혜택": rng.choice(BENEFITS).format(n=rng.randint(1, 10)),
+        "신청대상": rng.choice(TARGETS).format(dept=department),
+        "문의처": f"063-220-{rng.randint(2000, 3999)}",
+    }
+
+
+# ✅ n 건짜리 가짜 카탈로그 (seed 가 같으면 항상 같은 결과)
+def generate_programs(n, seed=0):
+    rng = random.Random(seed)
+    return [synthetic_program(rng, number) for number in range(1, n + 1)]
+
+
+# ✅ load_catalog 로 바로 읽을 수 있는 형식({"프로그램_정보": [...]})으로 저장
+def write_catalog(path, n, seed=0):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"프로그램_정보": generate_programs(n, seed)}, file, ensure_ascii=False)
+    return path
+
+
+# ✅ 게시판 공지 페이지 모양 (표 / 정의 목록 / 본문 글머리 세 가지)
+def _notice_body(program, layout):
+    fields = [(label, program[key]) for label, key in NOTICE_LABELS]
+    if layout == "table":
+        rows = "".join(f"<tr><th>{label}</th><td>{html.escape(value)}</td></tr>" for label, value in fields)
+        return f"<table class=\"view-table\"><tbody>{rows}</tbody></table>"
+    if layout == "dl":
+        items = "".join(f"<dt>{label}</dt><dd>{html.escape(value)}</dd>" for label, value in fields)
+        return f"<dl class=\"info\">{items}</dl>"
+    # 📌 본문형 공지는 소개 문단을 항목 없이 맨 앞에 쓴다
+    lines = "".join(f"<p>□ {label} : {html.escape(value)}</p>" for label, value in fields[1:])
+    return f"<div class=\"view-con\"><p>{html.escape(program['설명'])}</p>{lines}</div>"
+
+
+# 📌 본문 글머리 공지는 날짜를 "2025. 2. 3.(월)" 처럼 쓰고 끝 날짜의 연도를 생략하는 경우가 많다
+def _spoken_period(text):
+    parts = text.split(" ~ ")
+    days = [date(*(int(g) for g in part.split("."))) for part in parts]
+    spoken = [f"{days[0].year}. {days[0].month}. {days[0].day}.({WEEKDAYS[days[0].weekday()]})"]
+    spoken += [f"{day.month}. {day.day}.({WEEKDAYS[day.weekday()]})" for day in days[1:]]
+    return " ~ ".join(spoken)
+
+
+def notice_html(program, layout, posted):
+    if layout == "text":
+        program = dict(program, 기간=_spoken_period(program["기간"]), 신청기간=_spoken_period(program["신청기간"]))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"{charset}\">"
+        f"<title>{html.escape(program['제목'])} | 공지사항 | 전주대학교</title>"
+        "<script>var menu = 'notice';</script></head><body>"
+        "<div class=\"board-view\">"
+        f"<h3 class=\"view-title\">{html.escape(program['제목'])}</h3>"
+        f"<ul class=\"view-info\"><li>작성일 : {posted}</li><li>조회수 : 123</li></ul>"
+        f"{_notice_body(program, layout)}"
+        "</div></body></html>"
+    )
+
+
+# ✅ 저장된 공지 HTML 파일 n 개 (notice_ingest 벤치마크용)
+#    일부는 EUC-KR(cp949)로 저장하고, duplicate_share 비율은 같은 프로그램 공지를 한 번 더,
+#    broken_share 비율은 제목 / 날짜가 없는 깨진 페이지로 만든다.
+def write_notice_pages(directory, n, seed=0, duplicate_share=0.05, broken_share=0.02):
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    programs = []
+    for number in range(1, n + 1):
+        path = os.path.join(directory, f"notice_{number:06d}.html")
+        if rng.random() < broken_share:
+            page = "<html><head><meta charset=\"{charset}\"></head><body><p>페이지를 찾을 수 없습니다.</p></body></html>"
+        else:
+            if programs and rng.random() < duplicate_share:
+                program = rng.choice(programs)
+            else:
+                program = synthetic_program(rng, number)
+                programs.append(program)
+            posted = program["신청기간"].split(" ~ ")[0]
+            page = notice_html(program, rng.choice(NOTICE_LAYOUTS), posted)
+        encoding = "cp949" if rng.random() < 0.2 else "utf-8"
+        with open(path, "wb") as file:
+            file.write(page.replace("{charset}", "euc-kr" if encoding == "cp949" else "utf-8").encode(encoding))
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 비교과 프로그램 카탈로그 생성")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--output", default="synthetic_programs.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--notices", metavar="DIR", help="JSON 대신 저장된 공지 HTML 페이지를 DIR 에 만들기")
+    args = parser.parse_args()
+    if args.notices:
+        write_notice_pages(args.notices, args.count, args.seed)
+        print(f"✅ 공지 {args.count}건 → {args.notices}")
+        return
+    write_catalog(args.output, args.count, args.seed)
+    print(f"✅ {args.count}건 → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 import os
-import json
 import streamlit as st
-import re  
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from dotenv import load_dotenv
+from catalog_registry import CatalogRegistry
+from conversation_memory import ConversationMemory
+from query_parser import QueryParser, month_label, target_label
 
 load_dotenv()
 
@@ -19,88 +19,53 @@ st.write("✅ Streamlit이 정상적으로 실행되고 있습니다!")
 st.title("🎓 전주대학교 비교과 챗봇")
 st.write("전주대학교 비교과 프로그램에 대해 질문하세요!")
 
-# 세션 상태 강제 초기화 (에러 방지)
-if "messages" not in st.session_state:
-    st.session_state["messages"] = []
+# ✅ 대화 기록 (최근 메시지만 원문으로 두고 밀려난 메시지는 요약 / markdown 한 덩어리로 보관)
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory()
 
-# JSON 데이터 로드 함수
-@st.cache_data
-def load_program_data():
-    file_path = r"C:\Users\user\Desktop\Github\prjRepo_JJU\project\programs.json"
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
+# ✅ 카탈로그 로더 (JSON 파일이 바뀌면 백그라운드에서 인덱스를 다시 만들어 통째로 교체 → 앱 재시작 불필요)
+@st.cache_resource
+def load_catalog_reloader():
+    # 📌 부서별 샤드(본부: programs.json + programs_fixed.json / 학과: education_programs.json)를 묶은 카탈로그
+    return CatalogRegistry().start()
 
-        # JSON 키 자동 감지
-        possible_keys = ["프로그램_정보", "비교과_프로그램", "프로그램"]
-        for key in possible_keys:
-            if key in data:
-                return data[key]
+try:
+    # 📌 이번 실행(rerun) 동안에는 처음 잡은 snapshot 하나만 사용 (중간에 교체돼도 섞이지 않음)
+    catalog_snapshot = load_catalog_reloader().snapshot
+except Exception as e:
+    st.error(f"❌ JSON 로드 오류: {str(e)}")
+    st.stop()
 
-        return []
-    except Exception as e:
-        st.error(f"❌ JSON 로드 오류: {str(e)}")
-        return []
+program_data = catalog_snapshot.programs
+program_index = catalog_snapshot.program_index
+bm25_index = catalog_snapshot.bm25_index  # BM25 전문 검색 인덱스 (필터 키워드가 없는 질문용)
 
-program_data = load_program_data()
-
-# ✅ 질문에서 키워드 추출 함수
-def extract_filters(query):
-    query_lower = query.lower()
-
-    # 특정 월 필터 (ex: "2월", "3월")
-    month_match = re.search(r"(\d{1,2})월", query_lower)
-    month_filter = month_match.group(1) if month_match else None
-
-    # 특정 키워드 감지 (점프업, NCS 등)
-    keywords = ["점프업 포인트", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강"]
-    matched_keywords = [kw for kw in keywords if kw in query_lower]
-
-    # 특정 대상 필터 (ex: "3학년", "1학년", "졸업 예정자")
-    target_match = re.search(r"(\d학년|졸업 예정자)", query_lower)
-    target_filter = target_match.group(1) if target_match else None
-
-    return month_filter, matched_keywords, target_filter
+# ✅ 질문 분석기 (이 화면에서 쓰는 키워드로 사전을 한 번 컴파일해 두고 메시지마다 한 번만 분석)
+#    월 / 키워드(동의어 포함) / 대상(학년)을 한 번에 찾아 ParsedQuery 로 돌려준다.
+query_parser = QueryParser({"keywords": ["점프업 포인트", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강"]})
 
 # ✅ 비교과 프로그램 검색 함수
-def find_program(query):
-    month_filter, matched_keywords, target_filter = extract_filters(query)
-    results = []
-
-    for program in program_data:
-        title = program.get("제목", "").lower()
-        description = program.get("설명", "").lower()
-        period = program.get("기간", "").lower()
-        benefits = program.get("혜택", "").lower()
-        target = program.get("신청대상", "").lower()
+def find_program(parsed):
+    month_filter, matched_keywords, target_filter = parsed.months, parsed.keywords, parsed.targets
 
-        # "기간" 필드에서 특정 월이 포함된지 확인
-        if month_filter and not re.search(rf"{month_filter}\.", period):  
-            continue  # 특정 월이 포함되지 않으면 필터링
+    # 📌 조건이 하나도 없는 질문은 BM25 전문 검색으로 관련도 순 상위 프로그램 반환
+    if not (month_filter or matched_keywords or target_filter):
+        return [program for program, _ in bm25_index.search(parsed.text, k=5)]
 
-        # 특정 키워드 필터링
-        if matched_keywords and not any(kw in description or kw in title or kw in benefits for kw in matched_keywords):
-            continue
-
-        # 특정 대상(학년) 필터링
-        if target_filter and target_filter not in target:
-            continue
-
-        results.append(program)
-
-    return results
+    # 📌 미리 만든 인덱스에서 월 / 키워드 / 대상(학년) 조건을 교집합으로 조회
+    return program_index.search(month_filter=month_filter, keywords=matched_keywords, target_filter=target_filter)
 
 # 응답 메시지 동적 생성 함수
-def generate_response(query, results):
-    month_filter, matched_keywords, target_filter = extract_filters(query)
+def generate_response(parsed, results):
+    month_filter, matched_keywords, target_filter = parsed.months, parsed.keywords, parsed.targets
 
     # 질문 유형에 따른 맞춤형 제목 설정
     if matched_keywords:
         response_title = f"**📌 {' '.join(matched_keywords)} 관련 프로그램입니다:**"
     elif target_filter:
-        response_title = f"**📌 {target_filter} 대상 추천 비교과 프로그램입니다:**"
+        response_title = f"**📌 {target_label(target_filter)} 대상 추천 비교과 프로그램입니다:**"
     elif month_filter:
-        response_title = f"**📌 {month_filter}월 진행되는 비교과 프로그램입니다:**"
+        response_title = f"**📌 {month_label(month_filter)} 진행되는 비교과 프로그램입니다:**"
     else:
         response_title = "**📌 추천 비교과 프로그램입니다:**"
 
@@ -122,26 +87,30 @@ def generate_response(query, results):
 chat_container = st.container()
 
 # 대화 기록 표시
-for msg in st.session_state["messages"]:
+# 📌 오래된 대화는 미리 만들어 둔 markdown 한 덩어리로 출력
+memory = st.session_state["memory"]
+if memory.archived_markdown:
+    with chat_container:
+        with st.expander(f"이전 대화 {memory.archived_count}개"):
+            st.markdown(memory.archived_markdown)
+
+for role, content in memory.recent:
     with chat_container:
-        if isinstance(msg, HumanMessage):
-            with st.chat_message("user"):
-                st.write(msg.content)
-        elif isinstance(msg, AIMessage):
-            with st.chat_message("assistant"):
-                st.write(msg.content)
+        with st.chat_message("user" if role == "human" else "assistant"):
+            st.write(content)
 
 # 사용자 입력
 user_input = st.chat_input("비교과 프로그램에 대해 질문하세요!")
 
 if user_input:
-    st.session_state["messages"].append(HumanMessage(content=user_input))
+    memory.add_user(user_input)
 
     # 검색 실행
-    program_results = find_program(user_input)
-    response_content = generate_response(user_input, program_results)
+    parsed_query = query_parser.parse(user_input)
+    program_results = find_program(parsed_query)
+    response_content = generate_response(parsed_query, program_results)
 
-    st.session_state["messages"].append(AIMessage(content=response_content))
+    memory.add_ai(response_content)
 
     # 채팅 UI 즉시 갱신
     with chat_container:
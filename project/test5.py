@@ -1,18 +1,38 @@
 import os
-import json
+import logging
 import streamlit as st
-import numpy as np
-import re
-from datetime import datetime
-from langchain.schema import HumanMessage, AIMessage
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from dotenv import load_dotenv
+from answer_cache import AnswerCache
+from catalog import PROJECT_DIR
+from catalog_reloader import CatalogReloader
+from conversation_memory import ConversationMemory
+from engine import render_template
+from instrumentation import METRICS
+from intent_router import TEMPLATE, load_intent_router
+from lazy import LazyObject
+from prompt_context import build_rag_prompt
+from query_parser import parse_query
+from streaming import replace_cancel_token, stream_answer
 
 # ✅ 환경 변수 로드
 load_dotenv()
 
-# ✅ OpenAI GPT 모델 초기화
-chat_model = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
+# ✅ 요청별 프롬프트 크기 로그 출력
+logging.basicConfig(level=logging.INFO)
+
+# ✅ OpenAI GPT 모델 (첫 응답 생성 때 langchain_openai 를 import 해서 만든다 → 화면이 먼저 뜬다)
+def create_chat_model():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model_name="gpt-4o", temperature=0.1)
+
+chat_model = LazyObject(create_chat_model)
+
+# ✅ 질문 의도 분류기 (인덱스로 정확히 답할 수 있는 목록/필터 질문은 GPT 없이 템플릿으로 답한다)
+@st.cache_resource
+def load_router():
+    return load_intent_router()
+
+intent_router = load_router()
 
 # ✅ Streamlit UI 설정 (여백을 최소화)
 st.set_page_config(page_title="전주대학교 비교과 챗봇 💬", page_icon="🤖", layout="wide")
@@ -37,103 +57,104 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# ✅ 세션 상태 초기화 (대화 내역 저장)
-if "messages" not in st.session_state:
-    st.session_state["messages"] = [
-        AIMessage(content="안녕하세요! 저는 전주대학교 비교과 챗봇입니다. 😊 궁금한 점을 물어보세요!")
-    ]
+# ✅ 세션 상태 초기화 (대화 내역 저장: 최근 메시지만 원문으로 두고 밀려난 메시지는 markdown 한 덩어리로 보관)
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory()
+    st.session_state["memory"].add_ai("안녕하세요! 저는 전주대학교 비교과 챗봇입니다. 😊 궁금한 점을 물어보세요!")
+memory = st.session_state["memory"]
+
+# ✅ 카탈로그 로더 (파일 경로별로 하나, 파일이 바뀌면 백그라운드에서 인덱스를 다시 만들어 통째로 교체)
+@st.cache_resource
+def load_catalog_reloader(file_path):
+    return CatalogReloader([file_path]).start()
+
+# ✅ JSON 파일 경로 입력 받기 (기본값: 이 폴더의 programs.json)
+file_path = st.text_input("📂 JSON 파일 경로를 입력하세요:", os.path.join(PROJECT_DIR, "programs.json"))
+
+# ✅ LLM 응답 캐시 (카탈로그 내용이 바뀌면 이전 버전 응답은 조회되지 않음)
+#    📌 파일 경로별 로더마다 캐시(SQLite 연결)를 하나만 만들고, 카탈로그가 바뀌면 로더 리스너로 버전만 바꾼다
+@st.cache_resource
+def load_answer_cache(file_path):
+    catalog_reloader = load_catalog_reloader(file_path)
+    answer_cache = AnswerCache(catalog_reloader.snapshot.version)
+    catalog_reloader.add_listener(lambda snapshot: answer_cache.set_catalog_version(snapshot.version))
+    return answer_cache
 
-# ✅ JSON 데이터 로드 함수 (파일 경로 직접 입력)
-@st.cache_data
-def load_program_data(file_path):
+if file_path:
     if not os.path.exists(file_path):
         st.error(f"❌ JSON 파일을 찾을 수 없습니다: {file_path}")
-        return []
-
+        st.stop()
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        possible_keys = ["프로그램_정보", "비교과_프로그램", "프로그램"]
-        for key in possible_keys:
-            if key in data:
-                return data[key]
-
-        st.error("❌ JSON 데이터에서 프로그램 정보를 찾을 수 없습니다.")
-        return []
+        # 📌 이번 실행(rerun) 동안에는 처음 잡은 snapshot 하나만 사용 (중간에 교체돼도 섞이지 않음)
+        catalog_snapshot = load_catalog_reloader(file_path).snapshot
     except Exception as e:
         st.error(f"❌ JSON 로드 오류: {str(e)}")
-        return []
+        st.stop()
 
-# ✅ JSON 파일 경로 입력 받기
-file_path = st.text_input("📂 JSON 파일 경로를 입력하세요:", r"C:\Users\user\Desktop\Github\prjRepo_JJU\project\programs.json")
-
-if file_path:
-    program_data = load_program_data(file_path)
+    program_data = catalog_snapshot.programs
+    if not program_data:
+        st.error("❌ JSON 데이터에서 프로그램 정보를 찾을 수 없습니다.")
+    program_index = catalog_snapshot.program_index
+    answer_cache = load_answer_cache(file_path)
 
 # ✅ 채팅 UI (이전 대화 내역 표시)
+if memory.archived_markdown:
+    with st.expander(f"이전 대화 {memory.archived_count}개"):
+        st.markdown(memory.archived_markdown)
 st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-for message in st.session_state["messages"]:
-    role_class = "user" if isinstance(message, HumanMessage) else "assistant"
-    st.markdown(f'<div class="chat-message {role_class}">{message.content}</div>', unsafe_allow_html=True)
+for role, content in memory.recent:
+    role_class = "user" if role == "human" else "assistant"
+    st.markdown(f'<div class="chat-message {role_class}">{content}</div>', unsafe_allow_html=True)
 st.markdown('</div>', unsafe_allow_html=True)
 
-# ✅ 질문에서 키워드 및 필터링 조건 추출 (점프업 관련 키워드 확장)
-def extract_filters(query):
-    query_lower = query.lower()
-
-    # 특정 월 필터 (ex: "2월", "3월")
-    month_match = re.findall(r"(\d{4}\.\d{2})", query_lower)
-
-    # 특정 키워드 감지 (점프업 포함 확장)
-    keywords = ["점프업", "점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강", "취업"]
-    matched_keywords = [kw for kw in keywords if kw in query_lower]
-
-    # "점프업"이 포함되면 관련된 모든 항목 검색
-    if "점프업" in query_lower:
-        matched_keywords.extend(["점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램"])
-
-    return month_match, matched_keywords
-
 # ✅ 비교과 프로그램 검색 함수
-def find_program(query):
-    month_match, matched_keywords = extract_filters(query)
-    results = []
+#    질문 분석(query_parser)은 메시지마다 한 번만 하고, 그 결과의 월 / 연도 있는 월 / 키워드(점프업 관련 확장 포함)
+#    조건을 인덱스에서 교집합으로 조회
+def search_filters(parsed):
+    return {"month_filter": parsed.months, "period_months": parsed.period_months, "keywords": parsed.keywords}
 
-    for program in program_data:
-        title = program.get("제목", "").lower()
-        description = program.get("설명", "").lower()
-        period = program.get("기간", "").lower()
-        benefits = program.get("혜택", "").lower()
+def find_program(parsed):
+    return program_index.search(**search_filters(parsed))
 
-        # 특정 월 포함 필터링
-        if month_match and not any(month in period for month in month_match):
-            continue  
-
-        # 특정 키워드 필터링 (점프업 관련 키워드 포함)
-        if matched_keywords and not any(kw in description or kw in title or kw in benefits for kw in matched_keywords):
-            continue
-
-        results.append(program)
-
-    return results
+# 📌 템플릿 응답은 검색 결과를 그대로 "조건에 맞는 목록"으로 보여주므로, 질문의 조건(대상 / 마감 등)을
+#    이 검색이 모두 적용했을 때만 템플릿으로 보낸다. 하나라도 빠졌으면 LLM 이 결과를 걸러서 답한다.
+def answers_all_filters(parsed):
+    applied = {name for name, value in search_filters(parsed).items() if value}
+    return set(parsed.filters()) <= applied
 
 # ✅ RAG 기반 응답 생성 함수 (GPT가 JSON 데이터를 기반으로 답변 생성)
-def generate_rag_response(query):
-    results = find_program(query)
+#    응답은 토큰 단위 generator 로 돌려주고, 끝까지 생성된 응답만 캐시에 저장한다.
+def generate_rag_response(parsed, cancel_token=None):
+    query = parsed.text
+    results = find_program(parsed)
+
+    # 📌 목록/필터 질문은 검색 결과 그대로 템플릿 응답 (네트워크 호출 없음)
+    if results and intent_router is not None and answers_all_filters(parsed) and intent_router.route(parsed) == TEMPLATE:
+        METRICS.inc("llm_calls_avoided")
+        return iter([render_template(parsed.filters(), results)])
 
     if results:
-        gpt_prompt = f"""
-        사용자 질문: "{query}"
-        검색된 비교과 프로그램 목록:
-        {json.dumps(results, indent=2, ensure_ascii=False)}
-        
-        위 정보를 바탕으로 사용자가 이해하기 쉽게 설명해줘.
-        """
-        response = chat_model.invoke(gpt_prompt)
-        return response.content
+        # 📌 같은 질문 + 같은 검색 결과에 대한 응답이 캐시에 있으면 LLM 호출 생략
+        program_ids = [p.id for p in results]
+        cached = answer_cache.get(query, program_ids)
+        if cached is not None:
+            return iter([cached])
+
+        # 📌 질문에 필요한 필드만 한 줄 형식으로, 토큰 예산 안에서 관련도 높은 프로그램부터 포함
+        gpt_prompt = build_rag_prompt(query, results, "위 정보를 바탕으로 사용자가 이해하기 쉽게 설명해줘.", parsed=parsed)
+        # 📌 생성 도중 카탈로그가 바뀌었으면 새 버전 캐시에 이전 검색 결과 기반 응답을 넣지 않는다
+        def save_answer(answer):
+            if answer_cache.catalog_version == catalog_snapshot.version:
+                answer_cache.put(query, program_ids, answer)
+
+        return stream_answer(
+            chat_model,
+            gpt_prompt,
+            cancel_token=cancel_token,
+            on_complete=save_answer,
+        )
     else:
-        return "⚠️ 관련된 비교과 프로그램을 찾을 수 없습니다. 다시 검색해 주세요!"
+        return iter(["⚠️ 관련된 비교과 프로그램을 찾을 수 없습니다. 다시 검색해 주세요!"])
 
 # ✅ 사용자 입력 (채팅 인터페이스)
 with st.form(key="chat_form", clear_on_submit=True):
@@ -142,13 +163,21 @@ with st.form(key="chat_form", clear_on_submit=True):
 
 if submit_button and user_input:
     # ✅ 사용자 메시지를 세션 상태에 추가
-    st.session_state["messages"].append(HumanMessage(content=user_input))
+    memory.add_user(user_input)
+
+    # ✅ 새 메시지가 들어오면 이전에 생성 중이던 응답은 취소
+    cancel_token = replace_cancel_token(st.session_state)
 
-    # ✅ OpenAI 모델을 사용하여 응답 생성
-    response_content = generate_rag_response(user_input)
+    # ✅ OpenAI 모델을 사용하여 응답 생성 (토큰이 도착하는 대로 말풍선에 출력)
+    st.markdown(f'<div class="chat-message user">{user_input}</div>', unsafe_allow_html=True)
+    response_placeholder = st.empty()
+    response_content = ""
+    for token in generate_rag_response(parse_query(user_input), cancel_token):
+        response_content += token
+        response_placeholder.markdown(f'<div class="chat-message assistant">{response_content}</div>', unsafe_allow_html=True)
 
     # ✅ AI 응답을 세션 상태에 추가
-    st.session_state["messages"].append(AIMessage(content=response_content))
+    memory.add_ai(response_content)
 
     # ✅ UI 업데이트 (새로운 메시지 즉시 적용)
     st.rerun()
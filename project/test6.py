@@ -1,128 +1,84 @@
 import os
-import json
-import re  
-import chromadb
 import streamlit as st
-from langchain.schema import HumanMessage, AIMessage
-from langchain_openai import OpenAIEmbeddings
 from dotenv import load_dotenv
-
+from catalog_registry import CatalogRegistry
+from conversation_memory import ConversationMemory
+from debug_panel import render_debug_panel, session_trace
+from embedding_cache import EmbeddingCache
+from instrumentation import METRICS
+from lazy import LazyObject
+from query_parser import QueryParser, month_label, target_label
 # ✅ 환경 변수 로드
 load_dotenv()
 
 # ✅ OpenAI API 키
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# ✅ ChromaDB 초기화
-chroma_client = chromadb.PersistentClient(path="./chroma_db")
-collection = chroma_client.get_or_create_collection(name="programs")
+# ✅ OpenAI Embeddings 설정 (캐시에 없는 텍스트를 처음 임베딩할 때 만들어짐)
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+def create_embed_model():
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+embed_model = LazyObject(create_embed_model)
+
+# ✅ 디스크 임베딩 캐시 (새로 추가되거나 내용이 바뀐 프로그램만 임베딩 API 호출)
+@st.cache_resource
+def load_embedding_cache():
+    return EmbeddingCache(embed_model, model_name=EMBEDDING_MODEL)
 
-# ✅ OpenAI Embeddings 설정
-embed_model = OpenAIEmbeddings()
+embedding_cache = load_embedding_cache()
 
 # ✅ Streamlit UI 설정
 st.set_page_config(page_title="전주대학교 비교과 챗봇", page_icon="🎓", layout="centered")
 st.title("🎓 전주대학교 비교과 챗봇")
 st.write("전주대학교 비교과 프로그램에 대해 질문하세요!")
 
-# ✅ 세션 상태 초기화 (에러 방지)
-if "messages" not in st.session_state:
-    st.session_state["messages"] = []
-
-# ✅ JSON 데이터 로드
-@st.cache_data
-def load_program_data():
-    file_path = r"C:\Users\user\Desktop\Github\prjRepo_JJU\project\programs.json"
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        possible_keys = ["프로그램_정보", "비교과_프로그램", "프로그램"]
-        for key in possible_keys:
-            if key in data:
-                return data[key]
-
-        return []
-    except Exception as e:
-        st.error(f"❌ JSON 로드 오류: {str(e)}")
-        return []
-
-program_data = load_program_data()
-
-# ✅ ChromaDB에 데이터 추가 함수
-def add_data_to_chroma():
-    existing_items = collection.get()
-    if existing_items and "ids" in existing_items and existing_items["ids"]:
-        collection.delete(ids=existing_items["ids"])  # 저장된 데이터가 있을 경우에만 삭제 수행
-
-    for program in program_data:
-        doc_id = program.get("제목", "Unknown")
-        content = f"{program.get('제목', '')} {program.get('설명', '')} {program.get('혜택', '')}"
-        vector = embed_model.embed_query(content)
-
-        # ✅ metadata에서 리스트 값을 문자열로 변환
-        processed_metadata = {}
-        for key, value in program.items():
-            if isinstance(value, list):  
-                processed_metadata[key] = ", ".join(value)  # 리스트를 문자열로 변환
-            else:
-                processed_metadata[key] = value 
-
-        collection.add(ids=[doc_id], embeddings=[vector], metadatas=[processed_metadata])
-
-add_data_to_chroma()  # 데이터 삽입
-
-# ✅ 질문에서 키워드 추출
-def extract_filters(query):
-    query_lower = query.lower()
-    month_match = re.search(r"(\d{1,2})월", query_lower)
-    month_filter = month_match.group(1) if month_match else None
-    keywords = ["점프업 포인트", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강"]
-    matched_keywords = [kw for kw in keywords if kw in query_lower]
-    target_match = re.search(r"(\d학년|졸업 예정자)", query_lower)
-    target_filter = target_match.group(1) if target_match else None
-
-    return month_filter, matched_keywords, target_filter
-
-# ✅ 벡터 검색 기반 프로그램 추천
-def search_similar_programs(query):
-    query_vector = embed_model.embed_query(query)
-    results = collection.query(query_embeddings=[query_vector], n_results=3)
-    return results["metadatas"][0] if "metadatas" in results else []
-
-# ✅ 키워드 기반 검색
-def find_program(query):
-    month_filter, matched_keywords, target_filter = extract_filters(query)
-    results = []
-
-    for program in program_data:
-        title = program.get("제목", "").lower()
-        description = program.get("설명", "").lower()
-        period = program.get("기간", "").lower()
-        benefits = program.get("혜택", "").lower()
-        target = program.get("신청대상", "").lower()
-
-        if month_filter and not re.search(rf"{month_filter}\.", period):  
-            continue
-        if matched_keywords and not any(kw in description or kw in title or kw in benefits for kw in matched_keywords):
-            continue
-        if target_filter and target_filter not in target:
-            continue
-
-        results.append(program)
-
-    return results
+# ✅ 대화 기록 (최근 메시지만 원문으로 두고 밀려난 메시지는 요약 / markdown 한 덩어리로 보관)
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory()
+
+# ✅ 카탈로그 로더 (JSON 파일이 바뀌면 백그라운드에서 인덱스를 다시 만들어 통째로 교체 → 앱 재시작 불필요)
+@st.cache_resource
+def load_catalog_reloader():
+    # 📌 부서별 샤드(본부: programs.json + programs_fixed.json / 학과: education_programs.json)를 묶은 카탈로그
+    return CatalogRegistry(embedding_cache=embedding_cache).start()
+
+try:
+    # 📌 이번 실행(rerun) 동안에는 처음 잡은 snapshot 하나만 사용 (중간에 교체돼도 섞이지 않음)
+    catalog_snapshot = load_catalog_reloader().snapshot
+except Exception as e:
+    st.error(f"❌ JSON 로드 오류: {str(e)}")
+    st.stop()
+
+program_data = catalog_snapshot.programs
+
+# ✅ 질문 분석기 (이 화면에서 쓰는 키워드로 사전을 한 번 컴파일해 두고 메시지마다 한 번만 분석)
+query_parser = QueryParser({"keywords": ["점프업 포인트", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강"]})
+
+# 📌 분석 결과 중 이 화면에서 쓰는 월 / 키워드 / 대상 조건
+def search_filters(parsed):
+    return {"month_filter": parsed.months, "keywords": parsed.keywords, "target_filter": parsed.targets}
+
+# ✅ 하이브리드 검색 (월 / 키워드 / 대상 조건으로 후보를 거른 뒤 BM25 결과 + 벡터 결과를 순위 기반으로 합치고
+#    id 기준으로 중복 제거)
+hybrid_retriever = catalog_snapshot.retriever
+
+def search_programs(parsed, k=5):
+    with METRICS.span("retrieve"):
+        return [program for program, _ in hybrid_retriever.search(parsed.text, k=k, filters=search_filters(parsed))]
 
 # ✅ 응답 생성 함수
-def generate_response(query, results):
-    month_filter, matched_keywords, target_filter = extract_filters(query)
+def generate_response(parsed, results):
+    month_filter, matched_keywords, target_filter = parsed.months, parsed.keywords, parsed.targets
 
     if matched_keywords:
         response_title = f"**📌 {' '.join(matched_keywords)} 관련 프로그램입니다:**"
     elif target_filter:
-        response_title = f"**📌 {target_filter} 대상 추천 비교과 프로그램입니다:**"
+        response_title = f"**📌 {target_label(target_filter)} 대상 추천 비교과 프로그램입니다:**"
     elif month_filter:
-        response_title = f"**📌 {month_filter}월 진행되는 비교과 프로그램입니다:**"
+        response_title = f"**📌 {month_label(month_filter)} 진행되는 비교과 프로그램입니다:**"
     else:
         response_title = "**📌 추천 비교과 프로그램입니다:**"
 
@@ -142,30 +98,41 @@ def generate_response(query, results):
 # ✅ 채팅 UI
 chat_container = st.container()
 
-for msg in st.session_state["messages"]:
+# 📌 오래된 대화는 미리 만들어 둔 markdown 한 덩어리로 출력
+memory = st.session_state["memory"]
+if memory.archived_markdown:
     with chat_container:
-        if isinstance(msg, HumanMessage):
-            with st.chat_message("user"):
-                st.write(msg.content)
-        elif isinstance(msg, AIMessage):
-            with st.chat_message("assistant"):
-                st.write(msg.content)
+        with st.expander(f"이전 대화 {memory.archived_count}개"):
+            st.markdown(memory.archived_markdown)
+
+for role, content in memory.recent:
+    with chat_container:
+        with st.chat_message("user" if role == "human" else "assistant"):
+            st.write(content)
 
 # ✅ 사용자 입력
 user_input = st.chat_input("비교과 프로그램에 대해 질문하세요!")
 
 if user_input:
-    st.session_state["messages"].append(HumanMessage(content=user_input))
+    memory.add_user(user_input)
+
+    # 📌 검색 / 응답 생성 단계별 시간은 사이드바 디버그 패널에 기록
+    with session_trace(user_input):
+        # 📌 질문은 한 번만 분석하고 검색 / 응답 제목에 같이 사용
+        with METRICS.span("filter"):
+            parsed_query = query_parser.parse(user_input)
+        final_results = search_programs(parsed_query)
 
-    similar_results = search_similar_programs(user_input)
-    keyword_results = find_program(user_input)
-    final_results = similar_results + keyword_results
+        with METRICS.span("render"):
+            response_content = generate_response(parsed_query, final_results)
 
-    response_content = generate_response(user_input, final_results)
-    st.session_state["messages"].append(AIMessage(content=response_content))
+    memory.add_ai(response_content)
 
     with chat_container:
         with st.chat_message("user"):
             st.write(user_input)
         with st.chat_message("assistant"):
             st.write(response_content)
+
+# ✅ 사이드바: 최근 질문들의 단계별 소요시간 (스크립트 끝에서 그려야 방금 질문까지 포함)
+render_debug_panel()
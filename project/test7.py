@@ -1,20 +1,45 @@
 import os
-import json
+import logging
 import streamlit as st
-import numpy as np
-import re
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv
+from answer_cache import AnswerCache
+from catalog_registry import CatalogRegistry
+from conversation_memory import ConversationMemory
+from debug_panel import render_debug_panel, session_trace
+from embedding_cache import EmbeddingCache
+from engine import render_template
+from instrumentation import METRICS
+from intent_router import TEMPLATE, load_intent_router
+from lazy import LazyObject
+from prompt_context import build_rag_prompt
+from query_parser import parse_query
+from streaming import FakeStreamingChatModel, replace_cancel_token, stream_answer
 
 # .env 파일 로드
 load_dotenv()
 
+# ✅ 요청별 프롬프트 크기 로그 출력
+logging.basicConfig(level=logging.INFO)
+
 # 환경 변수에서 API 키 가져오기
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-# ✅ OpenAI GPT 모델 초기화
-chat_model = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
+# ✅ OpenAI GPT 모델 초기화 (첫 응답 생성 때 만들어짐)
+#    (FAKE_LLM=1 이면 네트워크 없이 가짜 스트리밍 모델 사용)
+def create_chat_model():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model_name="gpt-4o", temperature=0.1)
+
+if os.getenv("FAKE_LLM"):
+    chat_model = FakeStreamingChatModel(delay=0.05)
+else:
+    chat_model = LazyObject(create_chat_model)
+
+# ✅ 질문 의도 분류기 (인덱스로 정확히 답할 수 있는 목록/필터 질문은 GPT 없이 템플릿으로 답한다)
+@st.cache_resource
+def load_router():
+    return load_intent_router()
+
+intent_router = load_router()
 
 # ✅ Streamlit UI 설정
 st.set_page_config(page_title="전주대학교 비교과 챗봇", page_icon="🎓", layout="centered")
@@ -22,143 +47,159 @@ st.title("🎓 전주대학교 비교과 챗봇")
 st.write("전주대학교 비교과 프로그램에 대해 질문하세요!")
 
 # ✅ 세션 상태 초기화 (KeyError 방지)
-if "messages" not in st.session_state:
-    st.session_state["messages"] = []
-
-# ✅ JSON 데이터 로드 함수
-@st.cache_data
-def load_program_data():
-    file_path = r"C:\Users\user\Desktop\Github\prjRepo_JJU\project\programs.json"
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        possible_keys = ["프로그램_정보", "비교과_프로그램", "프로그램"]
-        for key in possible_keys:
-            if key in data:
-                return data[key]
-
-        return []
-    except Exception as e:
-        st.error(f"❌ JSON 로드 오류: {str(e)}")
-        return []
-
-program_data = load_program_data()
-
-# ✅ OpenAI 임베딩 모델 사용
-embeddings_model = OpenAIEmbeddings(model="text-embedding-3-small")
-
-# ✅ JSON 데이터를 벡터화하여 저장 (임베딩으로 저장)
-@st.cache_data
-def create_embeddings(data):
-    if not data:
-        return np.array([])
-    texts = [f"{item['제목']} {item['설명']} {item.get('신청대상', '')} {item.get('혜택', '')}" for item in data]
-    embeddings = embeddings_model.embed_documents(texts)
-    return np.array(embeddings)
-
-program_embeddings = create_embeddings(program_data)
-
-# ✅ 키워드 및 필터링 조건 추출
-def extract_filters(query):
-    query_lower = query.lower()
-
-    # 특정 월 필터 (ex: "2월", "3월")
-    month_match = re.findall(r"(\d{4}\.\d{2})", query_lower)
-
-    # 특정 기간 필터 (ex: "2025.02.10 ~ 2025.02.20")
-    date_range_match = re.search(r"(\d{4}\.\d{2}\.\d{2})\s*~\s*(\d{4}\.\d{2}\.\d{2})", query_lower)
-
-    # 특정 키워드 감지
-    keywords = ["점프업", "점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램", "비교과 포인트", "ncs", "멘토링", "창업", "자격증", "특강", "취업"]
-    matched_keywords = [kw for kw in keywords if kw in query_lower]
-
-    # "점프업"이 포함되면 관련된 모든 항목을 검색하도록 설정
-    if "점프업" in query_lower:
-        matched_keywords.extend(["점프업 포인트", "점프업 자기주도형 포인트", "점프업 프로그램"])
-
-    # 특정 대상 필터 (ex: "3학년", "1학년", "졸업 예정자")
-    target_match = re.search(r"(\d학년|졸업 예정자)", query_lower)
-    target_filter = target_match.group(1) if target_match else None
-
-    return month_match, date_range_match, matched_keywords, target_filter
-
-# ✅ 비교과 프로그램 검색 함수
-def find_program(query):
-    month_match, date_range_match, matched_keywords, target_filter = extract_filters(query)
-    results = []
-
-    for program in program_data:
-        title = program.get("제목", "").lower()
-        description = program.get("설명", "").lower()
-        period = program.get("기간", "").lower()
-        benefits = program.get("혜택", "").lower()
-        target = program.get("신청대상", "").lower()
-
-        # 특정 월 포함 필터링
-        if month_match and not any(month in period for month in month_match):
-            continue  
-
-        # 특정 키워드 필터링
-        if matched_keywords and not any(kw in description or kw in title or kw in benefits for kw in matched_keywords):
-            continue
-
-        # 특정 대상(학년) 필터링
-        if target_filter and target_filter not in target:
-            continue
-
-        results.append(program)
-
-    return results
+#    최근 메시지만 원문으로 유지하고 오래된 대화는 요약 + 미리 만든 markdown 으로 보관
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory()
+
+# ✅ OpenAI 임베딩 모델 사용 (캐시에 없는 텍스트를 처음 임베딩할 때 만들어짐)
+def create_embeddings_model():
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model="text-embedding-3-small")
+
+embeddings_model = LazyObject(create_embeddings_model)
+
+# ✅ 디스크 임베딩 캐시 (새로 추가되거나 내용이 바뀐 프로그램만 임베딩 API 호출)
+@st.cache_resource
+def load_embedding_cache():
+    return EmbeddingCache(embeddings_model, model_name="text-embedding-3-small")
+
+embedding_cache = load_embedding_cache()
+
+# ✅ 카탈로그 로더 (JSON 파일이 바뀌면 백그라운드에서 인덱스와 바뀐 프로그램 임베딩만 다시 만들어 통째로 교체)
+@st.cache_resource
+def load_catalog_reloader():
+    # 📌 부서별 샤드(본부: programs.json + programs_fixed.json / 학과: education_programs.json)를 묶은 카탈로그
+    return CatalogRegistry(embedding_cache=embedding_cache).start()
+
+try:
+    # 📌 이번 실행(rerun) 동안에는 처음 잡은 snapshot 하나만 사용 (중간에 교체돼도 섞이지 않음)
+    catalog_snapshot = load_catalog_reloader().snapshot
+except Exception as e:
+    st.error(f"❌ JSON 로드 오류: {str(e)}")
+    st.stop()
+
+program_data = catalog_snapshot.programs
+program_index = catalog_snapshot.program_index
+
+# ✅ JSON 데이터를 벡터화한 임베딩 행렬 위에서 동작하는 의미 검색 엔진
+search_engine = catalog_snapshot.semantic
+
+# ✅ LLM 응답 캐시 (정확히 같은 질문 → 임베딩 유사도 순으로 조회, 카탈로그가 바뀌면 이전 버전 응답은 조회되지 않음)
+#    유사 질문 비교에는 검색 때 만든 질문 벡터를 넘겨 쓰므로 캐시가 따로 임베딩 API 를 부르지 않는다.
+#    📌 캐시(SQLite 연결)는 하나만 만들고, 카탈로그가 바뀌면 로더 리스너로 버전만 바꾼다 (engine.py 와 같은 방식)
+@st.cache_resource
+def load_answer_cache():
+    catalog_reloader = load_catalog_reloader()
+    answer_cache = AnswerCache(catalog_reloader.snapshot.version)
+    catalog_reloader.add_listener(lambda snapshot: answer_cache.set_catalog_version(snapshot.version))
+    return answer_cache
+
+answer_cache = load_answer_cache()
+
+# ✅ 비교과 프로그램 검색 함수 (필터로 후보를 거른 뒤 질문과 의미가 가까운 순으로 k개)
+#    질문 분석(query_parser)은 메시지마다 한 번만 하고 그 결과를 넘겨받는다.
+#    📌 필터 조건이 하나도 없는 질문은 유사도가 MIN_SIMILARITY 미만인 프로그램을 버린다
+#       (의미 검색은 항상 상위 k개를 돌려주므로, 자르지 않으면 관련 없는 질문에도 "검색 결과"가 생긴다)
+MIN_SIMILARITY = 0.3
+
+def find_program(parsed, query_vector, k=10):
+    # 특정 월 / 기간 / 마감 / 키워드 / 대상(학년) 조건은 검색 엔진의 사전 필터로 전달
+    #    (템플릿 응답은 이 결과를 조건에 맞는 목록으로 보여주므로 parsed.filters() 의 조건을 빠짐없이 넘긴다)
+    filters = {
+        "month_filter": parsed.months,
+        "period_months": parsed.period_months,
+        "date_range": parsed.date_range,
+        "deadline_this_week": parsed.deadline_this_week,
+        "keywords": parsed.keywords,
+        "target_filter": parsed.targets,
+    }
+    min_score = float("-inf") if any(filters.values()) else MIN_SIMILARITY
+    with METRICS.span("retrieve"):
+        return [program for program, score in search_engine.search_vector(query_vector, k, filters) if score >= min_score]
 
 # ✅ RAG 기반 응답 생성 함수 (GPT가 JSON 데이터를 기반으로 응답 생성)
-def generate_rag_response(query):
-    results = find_program(query)
+#    응답은 토큰 단위 generator 로 돌려주고, 끝까지 생성된 응답만 캐시에 저장한다.
+def generate_rag_response(parsed, cancel_token=None, history=None):
+    query = parsed.text
+    query_vector = embedding_cache.embed_query(query)
+    results = find_program(parsed, query_vector)
+
+    # 📌 "3월 NCS 특강 뭐 있어?" 같은 목록/필터 질문은 검색 결과 그대로 템플릿 응답 (네트워크 호출 없음)
+    if results and intent_router is not None and intent_router.route(parsed) == TEMPLATE:
+        METRICS.inc("llm_calls_avoided")
+        return iter([render_template(parsed.filters(), results)])
+
+    # 📌 같은(또는 거의 같은) 질문 + 같은 검색 결과에 대한 응답이 캐시에 있으면 LLM 호출 생략
+    #    이전 대화가 있으면 응답이 그 대화에 따라 달라지므로("그거 언제까지야?") 캐시를 조회 / 저장하지 않는다.
+    program_ids = [p.id for p in results]
+    use_cache = not history
+    if use_cache:
+        with METRICS.span("answer_cache"):
+            cached = answer_cache.get(query, program_ids, query_vector)
+        if cached is not None:
+            return iter([cached])
 
     if results:
-        gpt_prompt = f"""
-        사용자 질문: "{query}"
-        검색된 비교과 프로그램 목록:
-        {json.dumps(results, indent=2, ensure_ascii=False)}
-        
-        위 정보를 바탕으로 사용자에게 적절한 답변을 만들어줘.
-        """
+        # 📌 질문에 필요한 필드만 한 줄 형식으로, 토큰 예산 안에서 관련도 높은 프로그램부터 포함
+        gpt_prompt = build_rag_prompt(query, results, "위 정보를 바탕으로 사용자에게 적절한 답변을 만들어줘.", ranked=True, parsed=parsed)
     else:
         gpt_prompt = f"""
         사용자 질문: "{query}"
         관련된 비교과 프로그램이 데이터에 명확히 없습니다. 하지만 유사한 정보를 제공할 수 있도록 최선을 다할게요.
         """
 
-    response = chat_model.invoke(gpt_prompt)
-    return response.content
+    # 📌 생성 도중 카탈로그가 바뀌었으면 새 버전 캐시에 이전 검색 결과 기반 응답을 넣지 않는다
+    def save_answer(answer):
+        if use_cache and answer_cache.catalog_version == catalog_snapshot.version:
+            answer_cache.put(query, program_ids, answer, query_vector)
+
+    return stream_answer(
+        chat_model,
+        (history or []) + [("human", gpt_prompt)],
+        cancel_token=cancel_token,
+        on_complete=save_answer,
+    )
 
 # ✅ 채팅 UI
 chat_container = st.container()
 
 # ✅ 대화 기록 표시
-for msg in st.session_state["messages"]:
+memory = st.session_state["memory"]
+
+# 📌 오래된 대화는 미리 만들어 둔 markdown 한 덩어리로 출력
+if memory.archived_markdown:
+    with chat_container:
+        with st.expander(f"이전 대화 {memory.archived_count}개"):
+            st.markdown(memory.archived_markdown)
+
+for role, content in memory.recent:
     with chat_container:
-        if isinstance(msg, HumanMessage):
-            with st.chat_message("user"):
-                st.write(msg.content)
-        elif isinstance(msg, AIMessage):
-            with st.chat_message("assistant"):
-                st.write(msg.content)
+        with st.chat_message("user" if role == "human" else "assistant"):
+            st.write(content)
 
 # ✅ 사용자 입력
 user_input = st.chat_input("비교과 프로그램에 대해 질문하세요!")
 
 if user_input:
-    st.session_state["messages"].append(HumanMessage(content=user_input))
+    # ✅ 모델에 넘길 이전 대화 (요약 + 토큰 예산 안의 최근 메시지)
+    history = memory.messages_for_model()
+    memory.add_user(user_input)
 
-    # ✅ GPT를 활용하여 JSON 데이터 기반 응답 생성
-    response_content = generate_rag_response(user_input)
+    # ✅ 새 메시지가 들어오면 이전에 생성 중이던 응답은 취소
+    cancel_token = replace_cancel_token(st.session_state)
 
-    st.session_state["messages"].append(AIMessage(content=response_content))
-
-    # ✅ 채팅 UI 즉시 갱신
     with chat_container:
         with st.chat_message("user"):
             st.write(user_input)
-        with st.chat_message("assistant"):
-            st.write(response_content)
+
+        # ✅ GPT를 활용하여 JSON 데이터 기반 응답 생성 (토큰이 도착하는 대로 말풍선에 출력)
+        #    검색 → 캐시 → 첫 토큰 → 스트리밍 끝까지 단계별 시간을 사이드바 디버그 패널에 기록
+        with st.chat_message("assistant"), session_trace(user_input):
+            with METRICS.span("filter"):
+                parsed_query = parse_query(user_input)
+            response_content = st.write_stream(generate_rag_response(parsed_query, cancel_token, history))
+
+    memory.add_ai(response_content)
+
+# ✅ 사이드바: 최근 질문들의 단계별 소요시간 (스크립트 끝에서 그려야 방금 질문까지 포함)
+render_debug_panel()
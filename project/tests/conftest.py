@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 📌 project/ 의 평평한 모듈(catalog_registry 등)을 테스트에서 바로 import 할 수 있게
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from catalog_registry import CatalogRegistry
+from catalog_reloader import CatalogReloader
+from synthetic_catalog import generate_programs
+
+QUERIES = ["멘토링", "취업 특강", "창업 캠프", "자격증 준비", "점프업 포인트", "면접 컨설팅", "ncs 직업기초능력"]
+
+
+def _write(path, programs):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"프로그램_정보": programs}, file, ensure_ascii=False)
+    return str(path)
+
+
+def _ranking(results):
+    return [(program.id, round(score, 4)) for program, score in results]
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("catalog")
+    programs = generate_programs(300, seed=7)
+    # 📌 크기가 아주 다른 샤드 세 개 (notices 처럼 작은 샤드가 있으면 샤드별 idf 가 크게 달라진다)
+    return {
+        "central": _write(directory / "central.json", programs[:240]),
+        "education": _write(directory / "education.json", programs[240:292]),
+        "notices": _write(directory / "notices.json", programs[292:]),
+    }
+
+
+@pytest.fixture(scope="module")
+def unsharded(catalog):
+    return CatalogReloader(list(catalog.values())).snapshot
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_sharded_bm25_top_k_matches_unsharded(catalog, unsharded, query):
+    registry = CatalogRegistry({name: [path] for name, path in catalog.items()})
+    sharded = registry.snapshot.bm25_index.search(query, k=10)
+    assert _ranking(sharded) == _ranking(unsharded.bm25_index.search(query, k=10))
+
+
+# 📌 같은 카탈로그를 다르게 나눠도 상위 k개는 같다
+@pytest.mark.parametrize("query", QUERIES)
+def test_sharded_bm25_top_k_does_not_depend_on_split(catalog, unsharded, query):
+    paths = list(catalog.values())
+    registry = CatalogRegistry({"first": paths[:1], "rest": paths[1:]})
+    assert _ranking(registry.snapshot.bm25_index.search(query, k=10)) == _ranking(unsharded.bm25_index.search(query, k=10))
+
+
+def test_sharded_bm25_filters_match_unsharded(catalog, unsharded):
+    registry = CatalogRegistry({name: [path] for name, path in catalog.items()})
+    filters = {"target_filter": ["3학년", "4학년"]}
+    sharded = registry.snapshot.bm25_index.search("취업 특강", k=10, filters=filters)
+    assert _ranking(sharded) == _ranking(unsharded.bm25_index.search("취업 특강", k=10, filters=filters))